@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import json
-import sqlite3
 from datetime import datetime, timedelta, timezone
 
 import pandas as pd
@@ -20,12 +19,13 @@ from app.tabs import brief as brief_tab
 from app.tabs import markets as markets_tab
 from app.tabs import narrative as narrative_tab
 from core import config
+from core.db import get_connection
 
 st.set_page_config(page_title="LeakSearcher", layout="wide")
 
 
-def _connect():
-    return sqlite3.connect(config.DB_PATH)
+def _connect(readonly: bool = True):
+    return get_connection(readonly=readonly)
 
 
 @st.cache_data(ttl=60)
@@ -51,11 +51,11 @@ def load_features():
 @st.cache_data(ttl=30)
 def load_events(limit: int = 500):
     with _connect() as conn:
-        query = f"SELECT * FROM events ORDER BY ts DESC LIMIT {limit}"
+        query = f"SELECT * FROM events ORDER BY ts_epoch DESC LIMIT {int(limit)}"
         df = pd.read_sql_query(query, conn)
     if df.empty:
         return df
-    df["ts"] = pd.to_datetime(df["ts"])
+    df["ts"] = pd.to_datetime(df["ts_epoch"], unit="s", utc=True)
     return df
 
 
@@ -99,24 +99,22 @@ def _coverage(df_events: pd.DataFrame) -> pd.DataFrame:
 
 
 def _update_anomaly(row_id: int, status: str):
-    with _connect() as conn:
+    with _connect(readonly=False) as conn:
         conn.execute(
             "UPDATE anomalies SET verified_status = ? WHERE rowid = ?",
             (status, row_id),
         )
-        conn.commit()
     load_anomalies.clear()
 
 
 def _add_note(sector: str, text: str):
     if not text.strip():
         return
-    with _connect() as conn:
+    with _connect(readonly=False) as conn:
         conn.execute(
             "INSERT INTO notes (ts, sector, text) VALUES (?, ?, ?)",
             (datetime.now(timezone.utc).isoformat(), sector, text.strip()),
         )
-        conn.commit()
 
 
 scores = load_scores()
@@ -2,16 +2,14 @@
 
 from __future__ import annotations
 
-import sqlite3
-
 import pandas as pd
 import streamlit as st
 
-from core import config
+from core.db import get_connection
 
 
 def _load_briefs():
-    with sqlite3.connect(config.DB_PATH) as conn:
+    with get_connection(readonly=True) as conn:
         df = pd.read_sql_query("SELECT * FROM briefs", conn)
     if df.empty:
         return df
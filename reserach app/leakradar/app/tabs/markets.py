@@ -2,17 +2,15 @@
 
 from __future__ import annotations
 
-import sqlite3
-
 import pandas as pd
 import streamlit as st
 
-from core import config
+from core.db import get_connection
 from core.markets import sector_pulse, top_movers
 
 
 def _sparkline_data():
-    with sqlite3.connect(config.DB_PATH) as conn:
+    with get_connection(readonly=True) as conn:
         df = pd.read_sql_query("SELECT ts, sector, symbol, metric, value FROM market_events", conn)
     if df.empty:
         return pd.DataFrame()
@@ -1,65 +1,188 @@
-"""ArXiv RSS collector for AI signals."""
+"""ArXiv API harvester for AI signals.
+
+Papers from the tracked categories are harvested incrementally from the
+arXiv API (submittedDate range, paged with ``start``) into
+``arxiv_papers``, keyed by arXiv id so cross-listed papers count once. The
+next run starts ``LOOKBACK_DAYS`` before the newest stored ``published``
+time: a paper only appears in the API once it is announced, which can be
+days after its submission date, and the overlap is already stored.
+"""
 
 from __future__ import annotations
 
+import re
 from datetime import datetime, timedelta, timezone
-from time import sleep
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
 
 import feedparser
 
 from collectors.base import checksum_payload, persist_rows
+from collectors.registry import collector, cursor
+from core import http_cache
+from core.db import get_connection
 
-FEEDS = [
-    "https://export.arxiv.org/rss/cs.AI",
-    "https://export.arxiv.org/rss/cs.LG",
-    "https://export.arxiv.org/rss/cs.CL",
-]
+API_URL = "https://export.arxiv.org/api/query"
+CATEGORIES = ["cs.AI", "cs.LG", "cs.CL"]
+ENTITY = "arxiv:" + "+".join(CATEGORIES)
+PAGE_SIZE = 200
+MAX_PAGES = 50
+BOOTSTRAP_DAYS = 2
+# Holds, weekend batches and index lag between submission and announcement.
+LOOKBACK_DAYS = 3
 
 CONFIDENCE = 0.9
-PARSE_VERSION = "arxiv_rss_v1"
+PARSE_VERSION = "arxiv_api_v1"
+
+_ID_RE = re.compile(r"abs/(.+?)(?:v\d+)?$")
+
+
+def _feed_entries(resp) -> dict:
+    feed = feedparser.parse(resp.content)
+    entries = [
+        {
+            "id": entry.get("id"),
+            "title": entry.get("title"),
+            "link": entry.get("link"),
+            "published_parsed": list(entry["published_parsed"][:6]) if entry.get("published_parsed") else None,
+            "categories": [tag.get("term") for tag in entry.get("tags", []) if tag.get("term")],
+        }
+        for entry in feed.get("entries", [])
+    ]
+    return {"entries": entries}
 
 
 def _parse_feed(url: str) -> dict:
-    return feedparser.parse(url)
+    fetched = http_cache.fetch(url, _feed_entries, variant=PARSE_VERSION)
+    return fetched.parsed or {"entries": [], "status": fetched.status}
 
 
-def collect():
-    rows = []
-    for url in FEEDS:
-        feed = _parse_feed(url)
-        entries = feed.get("entries", [])
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(days=1)
-        recent = []
+def _query_url(since: datetime, until: datetime, start: int) -> str:
+    cats = " OR ".join(f"cat:{cat}" for cat in CATEGORIES)
+    window = f"submittedDate:[{since:%Y%m%d%H%M} TO {until:%Y%m%d%H%M}]"
+    params = {
+        "search_query": f"({cats}) AND {window}",
+        "start": start,
+        "max_results": PAGE_SIZE,
+        "sortBy": "submittedDate",
+        "sortOrder": "ascending",
+    }
+    return f"{API_URL}?{urlencode(params)}"
+
+
+def _paper_id(entry: Dict) -> Optional[str]:
+    for value in (entry.get("id"), entry.get("link")):
+        match = _ID_RE.search(value or "")
+        if match:
+            return match.group(1)
+    return None
+
+
+def _watermark(now: datetime) -> datetime:
+    stored = cursor("arxiv").get("last_published")
+    if stored:
+        return datetime.fromisoformat(stored)
+    # Databases that predate the cursor still have the papers themselves.
+    with get_connection(readonly=True) as conn:
+        row = conn.execute("SELECT MAX(published) FROM arxiv_papers").fetchone()
+    if row[0]:
+        return datetime.fromisoformat(row[0])
+    return now - timedelta(days=BOOTSTRAP_DAYS)
+
+
+def _harvest(since: datetime, until: datetime, seen_at: str) -> List[Dict]:
+    """Page through the window and store unseen papers; returns the new ones."""
+    new: List[Dict] = []
+    for page in range(MAX_PAGES):
+        entries = _parse_feed(_query_url(since, until, page * PAGE_SIZE)).get("entries", [])
+        papers = []
         for entry in entries:
+            paper_id = _paper_id(entry)
             published = entry.get("published_parsed")
-            if not published:
+            if not paper_id or not published:
                 continue
             published_dt = datetime(*published[:6], tzinfo=timezone.utc)
-            if published_dt >= cutoff:
-                recent.append(
-                    {
-                        "title": entry.get("title"),
-                        "link": entry.get("link"),
-                        "published": published_dt.isoformat(),
-                    }
+            papers.append(
+                {
+                    "arxiv_id": paper_id,
+                    "published": published_dt.isoformat(),
+                    "published_day": published_dt.date().isoformat(),
+                    "categories": ",".join(entry.get("categories") or []),
+                    "title": entry.get("title"),
+                    "link": entry.get("link"),
+                }
+            )
+        with get_connection() as conn:
+            for paper in papers:
+                cur = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO arxiv_papers
+                    (arxiv_id, published, published_day, categories, title, first_seen)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        paper["arxiv_id"],
+                        paper["published"],
+                        paper["published_day"],
+                        paper["categories"],
+                        paper["title"],
+                        seen_at,
+                    ),
                 )
-        payload = {"feed_url": url, "recent_samples": recent[:5], "total_recent": len(recent)}
-        rows.append(
-            {
-                "ts": now.isoformat(),
-                "sector": "ai",
-                "entity": url,
-                "metric": "new_papers",
-                "value": float(len(recent)),
-                "payload": payload,
-                "source_url": url,
-                "parse_version": PARSE_VERSION,
-                "checksum": checksum_payload(payload),
-                "license": "arXiv",
-                "confidence": CONFIDENCE,
+                if cur.rowcount:
+                    new.append(paper)
+        # A short page is the last one.
+        if len(entries) < PAGE_SIZE:
+            break
+    return new
+
+
+@collector("arxiv", order=10)
+def collect():
+    now = datetime.now(timezone.utc)
+    watermark = _watermark(now)
+    new = _harvest(watermark - timedelta(days=LOOKBACK_DAYS), now, now.isoformat())
+    if new:
+        # Late announcements inside the lookback must not move the watermark back.
+        latest = max(paper["published"] for paper in new)
+        cursor("arxiv").set("last_published", max(latest, watermark.isoformat()))
+
+    by_day: Dict[str, List[Dict]] = {}
+    for paper in new:
+        by_day.setdefault(paper["published_day"], []).append(paper)
+    rows = []
+    with get_connection(readonly=True) as conn:
+        for day, papers in sorted(by_day.items()):
+            # The value is only this run's unseen papers, so a day's events (and
+            # its events_daily sum) add up to its unique count across reruns.
+            total = conn.execute(
+                "SELECT COUNT(*) FROM arxiv_papers WHERE published_day = ?", (day,)
+            ).fetchone()[0]
+            payload = {
+                "day": day,
+                "categories": CATEGORIES,
+                "unique_papers": total,
+                "new_this_run": len(papers),
+                "recent_samples": [
+                    {"id": p["arxiv_id"], "title": p["title"], "link": p["link"]} for p in papers[:5]
+                ],
             }
-        )
-        sleep(0.5)
+            rows.append(
+                {
+                    "ts": f"{day}T00:00:00+00:00",
+                    "sector": "ai",
+                    "entity": ENTITY,
+                    "metric": "new_papers",
+                    "value": float(len(papers)),
+                    "payload": payload,
+                    "source_url": API_URL,
+                    "parse_version": PARSE_VERSION,
+                    "checksum": checksum_payload(payload),
+                    "license": "arXiv",
+                    "confidence": CONFIDENCE,
+                }
+            )
+    if not rows:
+        return {"inserted": 0, "quarantined": 0, "skipped": "no_new_papers"}
     inserted, quarantined = persist_rows("arxiv", rows)
     return {"inserted": inserted, "quarantined": quarantined}
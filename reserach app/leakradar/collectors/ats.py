@@ -0,0 +1,97 @@
+"""Greenhouse / Lever job board adapters.
+
+Both vendors publish public JSON boards, so careers entries tagged
+``type: greenhouse|lever`` get real postings instead of keyword hits.
+Posting ids are kept per board in ``ats_postings``; each run's set is
+diffed against the previous one to report new and closed postings.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core import http_cache
+from core.db import get_connection
+
+GREENHOUSE_URL = "https://boards-api.greenhouse.io/v1/boards/{board}/jobs"
+LEVER_URL = "https://api.lever.co/v0/postings/{board}"
+
+# Board token/company slug from a public careers URL, when no explicit "board".
+_BOARD_PATTERNS = {
+    "greenhouse": re.compile(r"(?:job-)?boards(?:-api)?\.greenhouse\.io/(?:v1/boards/)?([\w-]+)"),
+    "lever": re.compile(r"(?:jobs|api)\.lever\.co/(?:v0/postings/)?([\w-]+)"),
+}
+
+
+@dataclass
+class PostingDiff:
+    board: str
+    open: Dict[str, str] = field(default_factory=dict)
+    new: List[str] = field(default_factory=list)
+    closed: List[str] = field(default_factory=list)
+
+
+def _greenhouse(resp) -> Dict[str, str]:
+    return {str(job["id"]): job.get("title") or "" for job in resp.json().get("jobs", [])}
+
+
+def _lever(resp) -> Dict[str, str]:
+    return {str(job["id"]): job.get("text") or "" for job in resp.json()}
+
+
+ADAPTERS: Dict[str, Tuple[str, Dict[str, str], Callable]] = {
+    "greenhouse": (GREENHOUSE_URL, {}, _greenhouse),
+    "lever": (LEVER_URL, {"mode": "json"}, _lever),
+}
+
+
+def board_for(entry: Dict) -> Optional[str]:
+    kind = entry.get("type")
+    if kind not in ADAPTERS:
+        return None
+    if entry.get("board"):
+        return entry["board"]
+    match = _BOARD_PATTERNS[kind].search(entry.get("url", ""))
+    return match.group(1) if match else None
+
+
+def fetch_postings(kind: str, board: str) -> Tuple[Optional[int], Optional[Dict[str, str]], str]:
+    """Return (status, {posting_id: title} or None, api url) for one board."""
+    url_template, params, parse = ADAPTERS[kind]
+    url = url_template.format(board=board)
+    try:
+        fetched = http_cache.fetch(url, parse, params=params or None, timeout=20)
+    except Exception:
+        return None, None, url
+    return fetched.status, fetched.parsed if fetched.status == 200 else None, url
+
+
+def record_postings(board: str, postings: Dict[str, str], now: Optional[str] = None) -> PostingDiff:
+    """Upsert this run's open postings and close the ones that disappeared."""
+    now = now or datetime.now(timezone.utc).isoformat()
+    with get_connection() as conn:
+        previous = {
+            row[0]
+            for row in conn.execute(
+                "SELECT posting_id FROM ats_postings WHERE board = ? AND open = 1", (board,)
+            )
+        }
+        current = set(postings)
+        conn.executemany(
+            """
+            INSERT INTO ats_postings (board, posting_id, title, first_seen, last_seen, open)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT(board, posting_id) DO UPDATE SET
+                title = excluded.title, last_seen = excluded.last_seen, open = 1
+            """,
+            [(board, posting_id, title, now, now) for posting_id, title in postings.items()],
+        )
+        closed = sorted(previous - current)
+        conn.executemany(
+            "UPDATE ats_postings SET open = 0 WHERE board = ? AND posting_id = ?",
+            [(board, posting_id) for posting_id in closed],
+        )
+    return PostingDiff(board=board, open=postings, new=sorted(current - previous), closed=closed)
@@ -4,11 +4,55 @@ from __future__ import annotations
 
 import hashlib
 import json
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from core import db
-from core.validate import validate_event
+from core import archive, blobs, db
+from core.validate import epoch_day, ts_epoch, validate_event
+
+BASE_COLUMNS: Tuple[str, ...] = (
+    "ts",
+    "source",
+    "sector",
+    "entity",
+    "metric",
+    "value",
+    "payload",
+    "source_url",
+    "fetched_at",
+    "parse_version",
+    "checksum",
+    "license",
+    "confidence",
+)
+# Event rows reference their body in the payloads table instead of storing it inline.
+EVENT_COLUMNS: Tuple[str, ...] = tuple(col for col in BASE_COLUMNS if col != "payload") + (
+    "payload_ref",
+    "event_day",
+    "ts_epoch",
+)
+QUARANTINE_COLUMNS: Tuple[str, ...] = BASE_COLUMNS + ("error",)
+DEDUP_KEY: Tuple[str, ...] = ("source", "entity", "metric", "checksum", "event_day")
+
+
+def _insert_sql(table: str, columns: Sequence[str], verb: str = "INSERT") -> str:
+    placeholders = ", ".join("?" for _ in columns)
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+# Rows identical on DEDUP_KEY hit ux_events_dedup and are skipped; their
+# fetched_at is refreshed instead so collector health still sees the run.
+EVENTS_INSERT = _insert_sql("events", EVENT_COLUMNS, verb="INSERT OR IGNORE")
+EVENTS_TOUCH = (
+    "UPDATE events SET fetched_at = ? WHERE "
+    + " AND ".join(f"{col} = ?" for col in DEDUP_KEY)
+    + " AND fetched_at < ?"
+)
+QUARANTINE_INSERT = _insert_sql("events_quarantine", QUARANTINE_COLUMNS)
+
+BULK_CHUNK_SIZE = 5000
 
 
 def checksum_payload(payload: Dict) -> str:
@@ -16,56 +60,172 @@ def checksum_payload(payload: Dict) -> str:
     return hashlib.sha1(blob).hexdigest()
 
 
-def persist_rows(source: str, rows: Iterable[Dict]) -> Tuple[int, int]:
-    inserted = 0
-    quarantined = 0
+def _prepare_row(
+    source: str, row: Dict, fetched_at: str, now: Optional[datetime] = None
+) -> Tuple[Dict, Optional[str]]:
+    """Normalize a collector row and validate it; returns (row, error)."""
+    row = dict(row)
+    row.setdefault("source", source)
+    row.setdefault("fetched_at", fetched_at)
+    if isinstance(row.get("payload"), (dict, list)):
+        # Canonical form so identical payloads share one blob (ref == checksum_payload).
+        row["payload"] = json.dumps(row["payload"], sort_keys=True)
+    ok, error = validate_event(row, now)
+    if not ok:
+        row["error"] = error
+        return row, error
+    # NULLs never compare equal in ux_events_dedup: a missing entity is stored
+    # as '' and a missing checksum is derived from the row's content.
+    if row.get("entity") is None:
+        row["entity"] = ""
+    if row.get("checksum") is None:
+        row["checksum"] = checksum_payload({"value": row.get("value"), "payload": row.get("payload")})
+    epoch = ts_epoch(row["ts"])
+    row["ts_epoch"] = epoch
+    row["event_day"] = epoch_day(epoch)
+    if row.get("payload") is not None:
+        row["payload_ref"] = blobs.payload_ref(row["payload"])
+    return row, error
+
+
+def _begin(conn) -> int:
+    """Open a write transaction and return the current max event id.
+
+    Rows with ``id`` above the returned watermark are exactly the ones this
+    transaction inserts, which is what ``_roll_up`` folds into ``events_daily``.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+
+def _roll_up(conn, watermark: int) -> None:
+    conn.execute(db.ROLLUP_UPSERT, (watermark,))
+
+
+def _touch_params(row: Dict) -> tuple:
+    fetched_at = row["fetched_at"]
+    return (fetched_at, *map(row.get, DEDUP_KEY), fetched_at)
+
+
+@dataclass
+class IngestReport:
+    source: str
+    inserted: int = 0
+    quarantined: int = 0
+    skipped: int = 0
+    elapsed_secs: float = 0.0
+
+    def __iter__(self):
+        # Keeps ``inserted, quarantined = persist_rows(...)`` working.
+        return iter((self.inserted, self.quarantined))
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.quarantined + self.skipped
+
+    @property
+    def rows_per_sec(self) -> float:
+        if self.elapsed_secs <= 0:
+            return 0.0
+        return self.total / self.elapsed_secs
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "inserted": self.inserted,
+            "quarantined": self.quarantined,
+            "skipped": self.skipped,
+            "elapsed_secs": round(self.elapsed_secs, 4),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+def persist_rows(source: str, rows: Iterable[Dict]) -> IngestReport:
+    """Write rows one at a time; duplicates of existing or archived events are skipped."""
+    started = time.perf_counter()
+    report = IngestReport(source=source)
     now = datetime.now(timezone.utc).isoformat()
+    prepared = [_prepare_row(source, row, now) for row in rows]
+    valid = [row for row, error in prepared if error is None]
+    archived = {id(valid[pos]) for pos in archive.archived_rows(valid)}
     with db.get_connection() as conn:
-        for row in rows:
-            row = dict(row)
-            row.setdefault("source", source)
-            row.setdefault("fetched_at", now)
-            if isinstance(row.get("payload"), (dict, list)):
-                row["payload"] = json.dumps(row["payload"])
-            ok, error = validate_event(row)
-            target = "events" if ok else "events_quarantine"
-            if not ok:
-                row["error"] = error
-                quarantined += 1
+        watermark = _begin(conn)
+        for row, error in prepared:
+            if id(row) in archived:
+                report.skipped += 1
+            elif error is None:
+                blobs.put(conn, row.get("payload"))
+                cur = conn.execute(EVENTS_INSERT, [row.get(col) for col in EVENT_COLUMNS])
+                if cur.rowcount:
+                    report.inserted += 1
+                else:
+                    conn.execute(EVENTS_TOUCH, _touch_params(row))
+                    report.skipped += 1
             else:
-                inserted += 1
-            columns = [
-                "ts",
-                "source",
-                "sector",
-                "entity",
-                "metric",
-                "value",
-                "payload",
-                "source_url",
-                "fetched_at",
-                "parse_version",
-                "checksum",
-                "license",
-                "confidence",
-            ]
-            params = [row.get(col) for col in columns]
-            if target == "events":
-                conn.execute(
-                    """
-                    INSERT INTO events (ts, source, sector, entity, metric, value, payload,
-                    source_url, fetched_at, parse_version, checksum, license, confidence)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    params,
-                )
-            else:
-                conn.execute(
-                    """
-                    INSERT INTO events_quarantine (ts, source, sector, entity, metric, value, payload,
-                    source_url, fetched_at, parse_version, checksum, license, confidence, error)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    params + [row.get("error")],
-                )
-    return inserted, quarantined
+                conn.execute(QUARANTINE_INSERT, [row.get(col) for col in QUARANTINE_COLUMNS])
+                report.quarantined += 1
+        if report.inserted:
+            _roll_up(conn, watermark)
+    report.elapsed_secs = time.perf_counter() - started
+    return report
+
+
+def _chunks(items: List[tuple], size: int) -> Iterable[List[tuple]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def ingest_rows(source: str, rows: Iterable[Dict], chunk_size: int = BULK_CHUNK_SIZE) -> IngestReport:
+    """Bulk variant of ``persist_rows``.
+
+    The whole batch is validated up front and split into accepted/quarantined
+    parameter lists, which are then written with chunked ``executemany`` inside
+    a single transaction. Exact duplicates, including ones already moved to the
+    archive, are counted in ``skipped``; newly
+    inserted rows are folded into ``events_daily`` before commit.
+    """
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    fetched_at = now.isoformat()
+    accepted: List[tuple] = []
+    touches: List[tuple] = []
+    rejected: List[tuple] = []
+    kept: List[Dict] = []
+    texts: Dict[str, str] = {}
+    for row in rows:
+        row, error = _prepare_row(source, row, fetched_at, now)
+        if error is None:
+            if row.get("payload_ref"):
+                texts[row["payload_ref"]] = row["payload"]
+            accepted.append(tuple(map(row.get, EVENT_COLUMNS)))
+            touches.append(_touch_params(row))
+            kept.append(row)
+        else:
+            rejected.append(tuple(map(row.get, QUARANTINE_COLUMNS)))
+    archived = archive.archived_rows(kept)
+    del kept
+    if archived:
+        accepted = [item for pos, item in enumerate(accepted) if pos not in archived]
+        touches = [item for pos, item in enumerate(touches) if pos not in archived]
+
+    inserted = 0
+    with db.get_connection() as conn:
+        watermark = _begin(conn)
+        blobs.put_many(conn, texts)
+        for chunk, touch_chunk in zip(_chunks(accepted, chunk_size), _chunks(touches, chunk_size)):
+            written = conn.executemany(EVENTS_INSERT, chunk).rowcount
+            if written < len(chunk):
+                conn.executemany(EVENTS_TOUCH, touch_chunk)
+            inserted += written
+        for chunk in _chunks(rejected, chunk_size):
+            conn.executemany(QUARANTINE_INSERT, chunk)
+        if inserted:
+            _roll_up(conn, watermark)
+
+    return IngestReport(
+        source=source,
+        inserted=inserted,
+        quarantined=len(rejected),
+        skipped=len(accepted) - inserted + len(archived),
+        elapsed_secs=time.perf_counter() - started,
+    )
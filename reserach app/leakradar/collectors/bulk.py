@@ -0,0 +1,129 @@
+"""Streaming readers for large bulk exports (JSON array, NDJSON, CSV; optionally gzipped).
+
+Records are yielded one at a time together with the byte offset just past
+them in the (decompressed) stream, so callers can persist progress and resume
+with ``iter_records(path, offset)`` without holding the file in memory.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+READ_CHUNK = 1 << 16
+FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+_GZIP_MAGIC = b"\x1f\x8b"
+_WHITESPACE = " \t\r\n\ufeff"
+_SEPARATORS = _WHITESPACE + ","
+
+
+def detect_format(path: Path) -> str:
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes.pop()
+    fmt = FORMATS.get(suffixes[-1]) if suffixes else None
+    if fmt is None:
+        raise ValueError(f"unknown bulk format for {path.name}")
+    return fmt
+
+
+def open_stream(path: Path) -> BinaryIO:
+    """Binary handle over the file contents; gzip is detected by magic bytes.
+
+    Offsets are positions in the decompressed stream; seeking a gzip stream
+    forward decompresses up to the offset rather than buffering it.
+    """
+    with open(path, "rb") as probe:
+        gzipped = probe.read(2) == _GZIP_MAGIC
+    return gzip.open(path, "rb") if gzipped else open(path, "rb")
+
+
+def _byte_len(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _json_array(fh: BinaryIO, offset: int) -> Iterator[Tuple[Dict, int]]:
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    fh.seek(offset)
+    buf, consumed, eof = "", offset, False
+    # Resumed offsets always point just past an element, inside the array.
+    opened = offset > 0
+    while True:
+        stripped = buf.lstrip(_SEPARATORS if opened else _WHITESPACE)
+        consumed += _byte_len(buf[: len(buf) - len(stripped)])
+        buf = stripped
+        if buf and not opened:
+            if buf[0] != "[":
+                raise ValueError("bulk JSON must be an array of records")
+            buf, consumed, opened = buf[1:], consumed + 1, True
+            continue
+        if buf.startswith("]"):
+            return
+        if buf:
+            try:
+                record, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value running to the end of the buffer may still be cut off.
+                if end < len(buf) or eof:
+                    consumed += _byte_len(buf[:end])
+                    buf = buf[end:]
+                    yield record, consumed
+                    continue
+        if eof:
+            if buf:
+                raise ValueError("truncated JSON array")
+            return
+        chunk = fh.read(READ_CHUNK)
+        eof = not chunk
+        buf += text.decode(chunk, final=eof)
+
+
+def _ndjson(fh: BinaryIO, offset: int) -> Iterator[Tuple[Dict, int]]:
+    fh.seek(offset)
+    for line in fh:
+        offset += len(line)
+        line = line.strip()
+        if line:
+            yield json.loads(line), offset
+
+
+def _csv(fh: BinaryIO, offset: int) -> Iterator[Tuple[Dict, int]]:
+    fh.seek(0)
+    header = fh.readline()
+    if not header.strip():
+        return
+    columns = next(csv.reader([header.decode("utf-8-sig")]))
+    offset = max(offset, len(header))
+    fh.seek(offset)
+    pending = ""
+    for line in fh:
+        offset += len(line)
+        pending += line.decode("utf-8")
+        # An odd number of quotes means a quoted field continues on the next line.
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if record.strip():
+            values = next(csv.reader(io.StringIO(record)))
+            yield dict(zip(columns, values)), offset
+    if pending.strip():
+        raise ValueError("truncated CSV record")
+
+
+_READERS = {"json": _json_array, "ndjson": _ndjson, "csv": _csv}
+
+
+def iter_records(path: Path, offset: int = 0, fmt: Optional[str] = None) -> Iterator[Tuple[Dict, int]]:
+    """Yield ``(record, end_offset)`` from ``offset`` onward."""
+    reader = _READERS[fmt or detect_format(path)]
+    with open_stream(path) as fh:
+        yield from reader(fh, offset)
@@ -1,44 +1,155 @@
-"""ClinicalTrials.gov recruiting oncology collector."""
+"""ClinicalTrials.gov recruiting trials collector (API v2).
+
+Each sector/condition query is paged through ``nextPageToken``. The first
+run loads the recruiting set; later runs pull only studies updated since
+the newest stored ``last_update`` (any status, so trials that stop
+recruiting drop out). Counts are exact over ``ct_trials`` for the
+currently configured conditions; a sector whose sync failed is recorded
+with a non-200 ``http_status`` so validation quarantines it.
+"""
 
 from __future__ import annotations
 
 from datetime import datetime, timezone
-
-import requests
+from typing import Dict, Iterator, List, Optional
 
 from collectors.base import checksum_payload, persist_rows
+from collectors.registry import collector, cursor
+from core import config, http_client
+from core.db import get_connection
 
-API_URL = (
-    "https://clinicaltrials.gov/api/query/study_fields?"
-    "expr=oncology&recr=Recruiting&min_rnk=1&max_rnk=100"
-    "&fields=NCTId,BriefTitle,Phase,EnrollmentCount,LastUpdateSubmitDate"
-)
+API_URL = "https://clinicaltrials.gov/api/v2/studies"
+FIELDS = "NCTId,BriefTitle,OverallStatus,LastUpdatePostDate"
+PAGE_SIZE = 1000
+RECRUITING = "RECRUITING"
 
 CONFIDENCE = 0.9
-PARSE_VERSION = "ctgov_v1"
+PARSE_VERSION = "ctgov_v2"
+# Recorded as ``http_status`` when no response arrived (network error, open
+# circuit, spent deadline); any non-200 status is quarantined.
+NO_RESPONSE = 0
 
 
-def collect():
-    now = datetime.now(timezone.utc).isoformat()
-    try:
-        resp = requests.get(API_URL, timeout=30)
-        status = resp.status_code
-        data = resp.json() if status == 200 else {}
-    except Exception as exc:
-        status = None
-        data = {"error": str(exc)}
-
-    studies = (
-        data.get("StudyFieldsResponse", {}).get("StudyFields", []) if isinstance(data, dict) else []
-    )
-    payload = {"sample": studies[:5], "count": len(studies)}
-
-    row = {
+class FetchError(Exception):
+    def __init__(self, status: Optional[int], message: str = ""):
+        super().__init__(message or f"http {status}")
+        self.status = status
+
+
+def _iter_studies(params: Dict[str, str]) -> Iterator[Dict]:
+    """Yield study records page by page, following ``nextPageToken``."""
+    params = {**params, "fields": FIELDS, "pageSize": PAGE_SIZE, "sort": "LastUpdatePostDate:asc"}
+    while True:
+        try:
+            resp = http_client.get(API_URL, params=params, timeout=30)
+        except Exception as exc:
+            raise FetchError(NO_RESPONSE, str(exc)) from exc
+        if resp.status_code != 200:
+            raise FetchError(resp.status_code)
+        data = resp.json()
+        for study in data.get("studies", []):
+            protocol = study.get("protocolSection", {})
+            status = protocol.get("statusModule", {})
+            yield {
+                "nct_id": protocol.get("identificationModule", {}).get("nctId"),
+                "title": protocol.get("identificationModule", {}).get("briefTitle"),
+                "status": status.get("overallStatus"),
+                "last_update": status.get("lastUpdatePostDateStruct", {}).get("date"),
+            }
+        token = data.get("nextPageToken")
+        if not token:
+            return
+        params["pageToken"] = token
+
+
+def _cursor_key(sector: str, condition: str) -> str:
+    return f"last_update:{sector}:{condition}"
+
+
+def _watermark(sector: str, condition: str) -> Optional[str]:
+    stored = cursor("clinicaltrials").get(_cursor_key(sector, condition))
+    if stored:
+        return stored
+    with get_connection(readonly=True) as conn:
+        row = conn.execute(
+            "SELECT MAX(last_update) FROM ct_trials WHERE sector = ? AND condition = ?", (sector, condition)
+        ).fetchone()
+    return row[0]
+
+
+def _query(condition: str, since: Optional[str]) -> Dict[str, str]:
+    params = {"query.cond": condition}
+    if since:
+        params["filter.advanced"] = f"AREA[LastUpdatePostDate]RANGE[{since},MAX]"
+    else:
+        params["filter.overallStatus"] = RECRUITING
+    return params
+
+
+def _sync_condition(sector: str, condition: str) -> List[Dict]:
+    """Fetch changed studies for one query and upsert them; returns the changes."""
+    since = _watermark(sector, condition)
+    # Materialised before writing so a failed page leaves the store untouched.
+    changed = [study for study in _iter_studies(_query(condition, since)) if study["nct_id"]]
+    with get_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO ct_trials (nct_id, sector, condition, status, last_update, title)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(nct_id, sector, condition) DO UPDATE SET
+                status = excluded.status, last_update = excluded.last_update, title = excluded.title
+            """,
+            [
+                (s["nct_id"], sector, condition, s["status"], s["last_update"], s["title"])
+                for s in changed
+            ],
+        )
+    latest = max((s["last_update"] for s in changed if s["last_update"]), default=None)
+    if latest and latest > (since or ""):
+        cursor("clinicaltrials").set(_cursor_key(sector, condition), latest)
+    return changed
+
+
+def _recruiting_count(sector: str, conditions: List[str]) -> int:
+    """Distinct recruiting trials under ``conditions``; dropped conditions no longer count."""
+    placeholders = ", ".join("?" for _ in conditions)
+    with get_connection(readonly=True) as conn:
+        return conn.execute(
+            f"""
+            SELECT COUNT(DISTINCT nct_id) FROM ct_trials
+            WHERE sector = ? AND status = ? AND condition IN ({placeholders})
+            """,
+            (sector, RECRUITING, *conditions),
+        ).fetchone()[0]
+
+
+def _sector_row(sector: str, conditions: List[str], now: str) -> Dict:
+    status: Optional[int] = 200
+    changed: List[Dict] = []
+    error = None
+    for condition in conditions:
+        try:
+            changed.extend(_sync_condition(sector, condition))
+        except FetchError as exc:
+            status, error = exc.status, str(exc)
+            break
+    recruiting = _recruiting_count(sector, conditions)
+    payload = {
+        "conditions": conditions,
+        "count": recruiting,
+        "changed": len(changed),
+        "sample": [
+            {"nct_id": s["nct_id"], "title": s["title"]} for s in changed if s["status"] == RECRUITING
+        ][:5],
+    }
+    if error:
+        payload["error"] = error
+    return {
         "ts": now,
-        "sector": "biotech",
+        "sector": sector,
         "entity": "clinicaltrials.gov",
         "metric": "recruiting_trials",
-        "value": float(len(studies)),
+        "value": float(recruiting),
         "payload": payload,
         "source_url": API_URL,
         "parse_version": PARSE_VERSION,
@@ -47,5 +158,15 @@ def collect():
         "confidence": CONFIDENCE,
         "http_status": status,
     }
-    inserted, quarantined = persist_rows("clinicaltrials", [row])
+
+
+@collector("clinicaltrials", order=20)
+def collect():
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        _sector_row(sector, conditions, now)
+        for sector, conditions in config.TRIAL_CONDITIONS.items()
+        if conditions
+    ]
+    inserted, quarantined = persist_rows("clinicaltrials", rows)
     return {"inserted": inserted, "quarantined": quarantined}
@@ -0,0 +1,132 @@
+"""Lightweight HTML text helpers for page-scraping collectors."""
+
+from __future__ import annotations
+
+from collections import deque
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Below this many distinct keywords, per-keyword str.count (C loops) beats a
+# pure-Python automaton walk over the page; above it the single pass wins.
+AUTOMATON_MIN_KEYWORDS = 64
+TITLE_TAGS = frozenset({"h1", "h2", "a"})
+_FEED_CHUNK = 16_384
+
+
+class KeywordMatcher:
+    """Case-insensitive multi-keyword counter compiled once per keyword list.
+
+    ``count`` equals ``sum(text.lower().count(k.lower()) for k in keywords)``:
+    occurrences of one keyword never overlap each other, but different
+    keywords may overlap (``"ml"`` inside ``"ml engineer"`` counts for both).
+    Large keyword lists are matched in one pass with an Aho-Corasick automaton.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.weights: Dict[str, int] = {}
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if keyword:
+                self.weights[keyword] = self.weights.get(keyword, 0) + 1
+        self.keywords: List[str] = list(self.weights)
+        self._delta: List[Dict[str, int]] = []
+        self._out: List[Tuple[int, ...]] = []
+        if len(self.keywords) >= AUTOMATON_MIN_KEYWORDS:
+            self._compile()
+
+    def _compile(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for idx, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state].append(idx)
+        # Fold failure links into a full transition table so the scan is one
+        # dict lookup per character.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state].extend(out[fail[state]])
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(nxt)
+        self._delta = delta
+        self._out = [tuple(ids) for ids in out]
+
+    def count(self, text: str) -> int:
+        text = text.lower()
+        if not self._delta:
+            return sum(text.count(keyword) * weight for keyword, weight in self.weights.items())
+        delta, out = self._delta, self._out
+        lengths = [len(keyword) for keyword in self.keywords]
+        next_free = [0] * len(self.keywords)
+        hits = [0] * len(self.keywords)
+        state = 0
+        for pos, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            for idx in out[state]:
+                start = pos - lengths[idx] + 1
+                if start >= next_free[idx]:
+                    hits[idx] += 1
+                    next_free[idx] = pos + 1
+        return sum(hits[idx] * self.weights[keyword] for idx, keyword in enumerate(self.keywords))
+
+
+class _TitleParser(HTMLParser):
+    def __init__(self, limit: int, tags: Sequence[str]):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.tags = frozenset(tags)
+        self.started: List[List[str]] = []
+        self.closed: List[bool] = []
+        self.open: List[Tuple[str, int]] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.started) >= self.limit and all(self.closed[: self.limit])
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.tags and len(self.started) < self.limit:
+            self.open.append((tag, len(self.started)))
+            self.started.append([])
+            self.closed.append(False)
+
+    def handle_endtag(self, tag):
+        for pos in range(len(self.open) - 1, -1, -1):
+            if self.open[pos][0] == tag:
+                self.closed[self.open[pos][1]] = True
+                del self.open[pos]
+                break
+
+    def handle_data(self, data):
+        piece = data.strip()
+        if piece:
+            for _, idx in self.open:
+                self.started[idx].append(piece)
+
+
+def extract_titles(html: str, limit: int = 5, tags: Sequence[str] = TITLE_TAGS) -> List[str]:
+    """Text of the first ``limit`` title-like elements, streaming (no DOM).
+
+    Matches ``[el.get_text(strip=True) for el in soup.find_all(tags)][:limit]``
+    on well-formed markup and stops reading once those elements are closed.
+    """
+    parser = _TitleParser(limit, tags)
+    for start in range(0, len(html), _FEED_CHUNK):
+        parser.feed(html[start : start + _FEED_CHUNK])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return ["".join(pieces) for pieces in parser.started[:limit]]
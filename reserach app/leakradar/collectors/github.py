@@ -3,19 +3,31 @@
 from __future__ import annotations
 
 import csv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
-
-import requests
+from typing import Dict, List, Optional, Tuple
 
 from collectors.base import checksum_payload, persist_rows
+from collectors.registry import collector
+from core import config, deadline, http_cache, http_client
 from core.config import BASE_DIR, GITHUB_TOKEN
 
 REPOS_PATH = BASE_DIR / "tracked" / "repos.csv"
 PARSE_VERSION = "github_api_v1"
+GRAPHQL_PARSE_VERSION = "github_graphql_v1"
 API_BASE = "https://api.github.com"
 
+REPO_FIELDS = """
+    nameWithOwner
+    stargazerCount
+    forkCount
+    licenseInfo { name }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    releases { totalCount }
+"""
+
 
 def _headers():
     headers = {"Accept": "application/vnd.github+json"}
@@ -36,71 +48,190 @@ def _load_repos() -> List[Dict[str, str]]:
         return list(reader)
 
 
-def collect():
-    rows = []
-    confidence = _confidence()
-    headers = _headers()
-    for row in _load_repos():
-        owner = row.get("owner", "")
-        repo_name = row.get("repo")
-        if "/" in owner and not repo_name:
-            owner, repo_name = owner.split("/", 1)
-        url = f"{API_BASE}/repos/{owner}/{repo_name}"
-        now = datetime.now(timezone.utc).isoformat()
-        releases_count = 0.0
-        try:
-            resp = requests.get(url, headers=headers, timeout=30)
-            status = resp.status_code
-            data = resp.json() if status == 200 else {}
-            rel_resp = requests.get(
-                f"{url}/releases", headers=headers, params={"per_page": 100}, timeout=30
-            )
-            if rel_resp.status_code == 200:
-                releases_count = float(len(rel_resp.json()))
-        except Exception as exc:
-            status = None
-            data = {"error": str(exc)}
-            releases_count = 0.0
-        payload = data if isinstance(data, dict) else {"note": "non-json"}
-        stars = float(payload.get("stargazers_count", 0) or 0)
-        base_payload = {
-            "repo": payload.get("full_name"),
-            "stars": stars,
-            "forks": payload.get("forks_count"),
-            "open_issues": payload.get("open_issues_count"),
-        }
-        rows.append(
-            {
-                "ts": now,
-                "sector": row.get("sector", "ai"),
-                "entity": payload.get("full_name", f"{owner}/{repo_name}"),
-                "metric": "stars",
-                "value": stars,
-                "payload": base_payload,
-                "source_url": url,
-                "parse_version": PARSE_VERSION,
-                "checksum": checksum_payload(base_payload),
-                "license": payload.get("license", {}).get("name") if isinstance(payload.get("license"), dict) else None,
-                "confidence": confidence,
-                "http_status": status,
-            }
+def _repo_name(entry: Dict[str, str]) -> Tuple[str, Optional[str]]:
+    owner = entry.get("owner", "")
+    repo_name = entry.get("repo")
+    if "/" in owner and not repo_name:
+        owner, repo_name = owner.split("/", 1)
+    return owner, repo_name
+
+
+def _fetch_repo(owner: str, repo_name: Optional[str], headers: Dict[str, str]) -> Dict:
+    url = f"{API_BASE}/repos/{owner}/{repo_name}"
+    now = datetime.now(timezone.utc).isoformat()
+    releases_count = 0.0
+    try:
+        repo = http_cache.fetch(url, lambda resp: resp.json(), headers=headers, timeout=30)
+        status = repo.status
+        data = repo.parsed if status == 200 else {}
+        releases = http_cache.fetch(
+            f"{url}/releases",
+            lambda resp: len(resp.json()),
+            headers=headers,
+            params={"per_page": 100},
+            timeout=30,
         )
-        release_payload = {"repo": payload.get("full_name"), "releases_estimate": releases_count}
-        rows.append(
-            {
-                "ts": now,
-                "sector": row.get("sector", "ai"),
-                "entity": payload.get("full_name", f"{owner}/{repo_name}"),
-                "metric": "releases",
-                "value": releases_count,
-                "payload": release_payload,
-                "source_url": url,
-                "parse_version": PARSE_VERSION,
-                "checksum": checksum_payload(release_payload),
-                "license": payload.get("license", {}).get("name") if isinstance(payload.get("license"), dict) else None,
-                "confidence": confidence,
-                "http_status": status,
-            }
+        if releases.status == 200:
+            releases_count = float(releases.parsed)
+    except Exception as exc:
+        status = None
+        data = {"error": str(exc)}
+        releases_count = 0.0
+    return {"url": url, "ts": now, "status": status, "data": data, "releases_count": releases_count}
+
+
+def _graphql_query(batch: List[Tuple[str, Optional[str]]]) -> Tuple[str, Dict[str, str]]:
+    """One aliased ``repository`` lookup per repo; names travel as variables."""
+    params = []
+    selections = []
+    variables: Dict[str, str] = {}
+    for idx, (owner, repo_name) in enumerate(batch):
+        params.append(f"$o{idx}: String!, $n{idx}: String!")
+        selections.append(f"r{idx}: repository(owner: $o{idx}, name: $n{idx}) {{{REPO_FIELDS}}}")
+        variables[f"o{idx}"] = owner
+        variables[f"n{idx}"] = repo_name or ""
+    query = f"query({', '.join(params)}) {{\n" + "\n".join(selections) + "\n}"
+    return query, variables
+
+
+def _from_graphql(owner: str, repo_name: Optional[str], node: Optional[Dict], now: str) -> Dict:
+    """Map a GraphQL ``repository`` node onto the REST-shaped result ``_build_rows`` expects."""
+    url = f"{API_BASE}/repos/{owner}/{repo_name}"
+    result = {"url": url, "ts": now, "parse_version": GRAPHQL_PARSE_VERSION}
+    if node is None:
+        return {**result, "status": 404, "data": {}, "releases_count": 0.0}
+    data = {
+        "full_name": node["nameWithOwner"],
+        "stargazers_count": node["stargazerCount"],
+        "forks_count": node["forkCount"],
+        # REST open_issues_count includes open pull requests.
+        "open_issues_count": node["issues"]["totalCount"] + node["pullRequests"]["totalCount"],
+        "license": node["licenseInfo"],
+    }
+    return {**result, "status": 200, "data": data, "releases_count": float(node["releases"]["totalCount"])}
+
+
+def _fetch_graphql(batch: List[Tuple[str, Optional[str]]], headers: Dict[str, str]) -> Optional[List[Dict]]:
+    """Fetch a batch of repos in one GraphQL request; ``None`` means fall back to REST."""
+    query, variables = _graphql_query(batch)
+    now = datetime.now(timezone.utc).isoformat()
+    try:
+        resp = http_client.post(
+            f"{API_BASE}/graphql", headers=headers, json={"query": query, "variables": variables}, timeout=30
         )
+        if resp.status_code != 200:
+            return None
+        data = resp.json().get("data")
+    except Exception:
+        return None
+    if not isinstance(data, dict):
+        return None
+    # Unknown repos come back as null aliases (with a NOT_FOUND entry in "errors").
+    return [
+        _from_graphql(owner, repo_name, data.get(f"r{idx}"), now)
+        for idx, (owner, repo_name) in enumerate(batch)
+    ]
+
+
+def _build_rows(entry: Dict[str, str], owner: str, repo_name: Optional[str], fetched: Dict, confidence: float) -> List[Dict]:
+    url = fetched["url"]
+    now = fetched["ts"]
+    parse_version = fetched.get("parse_version", PARSE_VERSION)
+    status = fetched["status"]
+    releases_count = fetched["releases_count"]
+    data = fetched["data"]
+    payload = data if isinstance(data, dict) else {"note": "non-json"}
+    stars = float(payload.get("stargazers_count", 0) or 0)
+    base_payload = {
+        "repo": payload.get("full_name"),
+        "stars": stars,
+        "forks": payload.get("forks_count"),
+        "open_issues": payload.get("open_issues_count"),
+    }
+    license_name = payload.get("license", {}).get("name") if isinstance(payload.get("license"), dict) else None
+    entity = payload.get("full_name", f"{owner}/{repo_name}")
+    release_payload = {"repo": payload.get("full_name"), "releases_estimate": releases_count}
+    return [
+        {
+            "ts": now,
+            "sector": entry.get("sector", "ai"),
+            "entity": entity,
+            "metric": "stars",
+            "value": stars,
+            "payload": base_payload,
+            "source_url": url,
+            "parse_version": parse_version,
+            "checksum": checksum_payload(base_payload),
+            "license": license_name,
+            "confidence": confidence,
+            "http_status": status,
+        },
+        {
+            "ts": now,
+            "sector": entry.get("sector", "ai"),
+            "entity": entity,
+            "metric": "releases",
+            "value": releases_count,
+            "payload": release_payload,
+            "source_url": url,
+            "parse_version": parse_version,
+            "checksum": checksum_payload(release_payload),
+            "license": license_name,
+            "confidence": confidence,
+            "http_status": status,
+        },
+    ]
+
+
+def _fetch_rest(entries, headers: Dict[str, str], concurrency: Optional[int]) -> List[Dict]:
+    workers = max(1, concurrency or config.GITHUB_CONCURRENCY)
+
+    def fetch(item):
+        _, owner, repo_name = item
+        return _fetch_repo(owner, repo_name, headers)
+
+    if workers == 1 or len(entries) <= 1:
+        return [fetch(item) for item in entries]
+    with ThreadPoolExecutor(max_workers=min(workers, len(entries))) as pool:
+        return list(pool.map(deadline.propagate(fetch), entries))
+
+
+def fetch_rows(concurrency: Optional[int] = None, use_graphql: Optional[bool] = None) -> List[Dict]:
+    """Fetch every tracked repo and return event rows in ``repos.csv`` order.
+
+    With a token (and ``GITHUB_GRAPHQL`` on) repos are read in aliased GraphQL
+    batches of ``GITHUB_GRAPHQL_BATCH``, which also gives the true release
+    count instead of REST's first page of 100. Batches the GraphQL endpoint
+    rejects, and every repo when there is no token, go through REST on a
+    bounded thread pool (``GITHUB_CONCURRENCY``); ``concurrency=1`` reproduces
+    the old strictly sequential behaviour.
+    """
+    confidence = _confidence()
+    headers = _headers()
+    entries = [(entry, *_repo_name(entry)) for entry in _load_repos()]
+    if use_graphql is None:
+        use_graphql = bool(GITHUB_TOKEN) and config.GITHUB_GRAPHQL
+
+    results: List[Optional[Dict]] = [None] * len(entries)
+    if use_graphql:
+        size = max(1, config.GITHUB_GRAPHQL_BATCH)
+        for start in range(0, len(entries), size):
+            batch = [(owner, repo_name) for _, owner, repo_name in entries[start : start + size]]
+            fetched = _fetch_graphql(batch, headers)
+            if fetched is not None:
+                results[start : start + len(fetched)] = fetched
+    pending = [idx for idx, result in enumerate(results) if result is None]
+    for idx, fetched in zip(pending, _fetch_rest([entries[idx] for idx in pending], headers, concurrency)):
+        results[idx] = fetched
+
+    rows: List[Dict] = []
+    for (entry, owner, repo_name), fetched in zip(entries, results):
+        rows.extend(_build_rows(entry, owner, repo_name, fetched, confidence))
+    return rows
+
+
+@collector("github", order=40)
+def collect(concurrency: Optional[int] = None):
+    rows = fetch_rows(concurrency)
     inserted, quarantined = persist_rows("github", rows)
     return {"inserted": inserted, "quarantined": quarantined}
@@ -1,17 +1,35 @@
-"""Grant collector using sample JSON (swap with USAspending/NIH when ready)."""
+"""Grant collector: the bundled sample JSON, or a streamed USAspending/NIH bulk export."""
 
 from __future__ import annotations
 
+import hashlib
 import json
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Iterable, Optional
 
-from collectors.base import checksum_payload, persist_rows
+from collectors import bulk
+from collectors.base import checksum_payload, ingest_rows, persist_rows
+from collectors.registry import collector, cursor
+from core import config, validate
 from core.config import BASE_DIR
+from core.db import get_connection
 
 SAMPLE_PATH = BASE_DIR / "tracked" / "samples" / "grants.json"
 PARSE_VERSION = "grants_v1"
 
+# Bulk exports name the same things differently (USAspending columns are
+# snake_case, NIH RePORTER upper-case); the first present field wins.
+PROGRAM_FIELDS = ("program", "cfda_title", "assistance_listing_title", "awarding_agency_name", "ic_name")
+AMOUNT_FIELDS = ("amount", "federal_action_obligation", "total_obligated_amount", "award_amount", "total_cost")
+URL_FIELDS = ("url", "usaspending_permalink")
+# A record's own identity and date, so re-reading it lands on the same dedup
+# key instead of counting it again under today's date.
+ID_FIELDS = ("assistance_transaction_unique_key", "award_id", "id", "application_id", "fain")
+DATE_FIELDS = ("action_date", "award_date", "award_notice_date", "date")
+# Leading bytes fingerprinted to tell an appended or touched file from a replaced one.
+HEAD_BYTES = 1 << 16
+
 
 def _load_samples():
     if SAMPLE_PATH.exists():
@@ -19,25 +37,126 @@ def _load_samples():
     return []
 
 
-def collect():
+def _first(grant: Dict, names: Iterable[str]):
+    for name in names:
+        for key in (name, name.upper()):
+            value = grant.get(key)
+            if value not in (None, ""):
+                return value
+    return None
+
+
+def _amount(value) -> Optional[float]:
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # Left as None so validation quarantines the record.
+        return None
+
+
+def _action_ts(grant: Dict) -> Optional[str]:
+    value = _first(grant, DATE_FIELDS)
+    epoch = validate.ts_epoch(str(value)) if value is not None else None
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def _grant_row(grant: Dict, now: str) -> Dict:
+    """Event row for one grant; ``now`` is only used when it carries no action date."""
+    payload = grant
+    value = _amount(_first(grant, AMOUNT_FIELDS))
+    identity = _first(grant, ID_FIELDS)
+    return {
+        "ts": _action_ts(grant) or now,
+        "sector": grant.get("sector", "ai"),
+        "entity": _first(grant, PROGRAM_FIELDS),
+        "metric": "grants",
+        "value": value,
+        "payload": payload,
+        "source_url": _first(grant, URL_FIELDS),
+        "parse_version": PARSE_VERSION,
+        "checksum": checksum_payload({"id": str(identity), "amount": value} if identity else payload),
+        "license": grant.get("license"),
+        "confidence": 0.6,
+    }
+
+
+def _signature(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _head(path: Path, size: int) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha1(fh.read(min(size, HEAD_BYTES))).hexdigest()
+
+
+def _resume_offset(state, key: str, path: Path, signature: str) -> int:
+    """Stored offset if ``path`` is the file it was reached in, or only grew since; else 0."""
+    stored = state.get(f"file:{key}")
+    offset = int(state.get(f"offset:{key}") or 0)
+    if stored == signature:
+        return offset
+    size = int(signature.split(":")[0])
+    old_size = int(stored.split(":")[0]) if stored else -1
+    head = state.get(f"head:{key}")
+    grown = 0 <= old_size <= size and head == _head(path, old_size)
+    state.set(f"file:{key}", signature)
+    state.set(f"head:{key}", _head(path, size))
+    if grown:
+        return offset
+    state.set(f"offset:{key}", 0)
+    return 0
+
+
+def load_bulk(path: Path, chunk_size: Optional[int] = None, fmt: Optional[str] = None) -> Dict:
+    """Stream ``path`` into events in chunks of ``chunk_size`` records.
+
+    The byte offset after each chunk is saved in the ``grants`` cursor in the
+    same transaction as its rows, so an interrupted load resumes where it
+    stopped. A file that was only appended to or touched keeps its offset; a
+    replaced file is read from the start, and records already ingested from
+    it dedup on their award id and action date.
+    """
+    chunk_size = chunk_size or config.GRANTS_BULK_CHUNK
+    state = cursor("grants")
+    key = str(Path(path).resolve())
+    offset = _resume_offset(state, key, path, _signature(path))
+
+    now = datetime.now(timezone.utc).isoformat()
+    totals = {"inserted": 0, "quarantined": 0, "records": 0}
     rows = []
+    end = offset
+
+    def flush():
+        with get_connection():
+            report = ingest_rows("grants", rows, chunk_size=chunk_size)
+            state.set(f"offset:{key}", end)
+        totals["inserted"] += report.inserted
+        totals["quarantined"] += report.quarantined
+        totals["records"] += len(rows)
+        rows.clear()
+
+    for grant, end in bulk.iter_records(Path(path), offset, fmt):
+        rows.append(_grant_row(grant, now))
+        if len(rows) >= chunk_size:
+            flush()
+    if rows:
+        flush()
+    if not totals["records"]:
+        return {"inserted": 0, "quarantined": 0, "skipped": "no_new_records"}
+    totals["offset"] = end
+    return totals
+
+
+@collector("grants", order=50)
+def collect():
+    if config.GRANTS_BULK_PATH:
+        return load_bulk(Path(config.GRANTS_BULK_PATH))
     now = datetime.now(timezone.utc).isoformat()
-    for grant in _load_samples():
-        payload = grant
-        rows.append(
-            {
-                "ts": now,
-                "sector": grant.get("sector", "ai"),
-                "entity": grant.get("program"),
-                "metric": "grants",
-                "value": float(grant.get("amount", 0)),
-                "payload": payload,
-                "source_url": grant.get("url"),
-                "parse_version": PARSE_VERSION,
-                "checksum": checksum_payload(payload),
-                "license": grant.get("license"),
-                "confidence": 0.6,
-            }
-        )
+    rows = [_grant_row(grant, now) for grant in _load_samples()]
     inserted, quarantined = persist_rows("grants", rows)
     return {"inserted": inserted, "quarantined": quarantined}
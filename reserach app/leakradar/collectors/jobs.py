@@ -5,15 +5,20 @@ from __future__ import annotations
 import hashlib
 import json
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence
 
-import requests
-from bs4 import BeautifulSoup
-
+from collectors import ats
 from collectors.base import checksum_payload, persist_rows
+from collectors.extract import KeywordMatcher, extract_titles
+from collectors.registry import collector
+from core import blobs, http_cache
 from core.config import BASE_DIR
+from core.db import get_connection
 
 CAREERS_PATH = BASE_DIR / "tracked" / "careers.json"
 PARSE_VERSION = "jobs_v1"
+ATS_PARSE_VERSION = "jobs_ats_v1"
 
 
 def _load_careers():
@@ -28,38 +33,139 @@ def _confidence(kind: str) -> float:
     return 0.8
 
 
-def _fetch(url: str):
+@lru_cache(maxsize=64)
+def _matcher(keywords: tuple) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def _count_keywords(html: str, keywords):
+    return _matcher(tuple(keywords)).count(html)
+
+
+def _previous_payloads(urls: Iterable[str]) -> Dict[str, dict]:
+    """Latest stored jobs payload per careers URL."""
+    urls = list(urls)
+    if not urls:
+        return {}
+    placeholders = ", ".join("?" for _ in urls)
+    with get_connection(readonly=True) as conn:
+        # Bare columns with MAX() come from the row holding the max id.
+        latest = conn.execute(
+            f"""
+            SELECT entity, payload_ref, MAX(id) FROM events
+            WHERE source = 'jobs' AND metric = 'job_count' AND entity IN ({placeholders})
+            GROUP BY entity
+            """,
+            urls,
+        ).fetchall()
+        texts = blobs.get_many(conn, [row["payload_ref"] for row in latest])
+    return {
+        row["entity"]: json.loads(texts[row["payload_ref"]])
+        for row in latest
+        if row["payload_ref"] in texts
+    }
+
+
+def _parse_page(body: str, keywords: Sequence[str], previous: Optional[dict] = None) -> dict:
+    dom_checksum = hashlib.sha1(body.encode("utf-8")).hexdigest()
+    if (
+        previous
+        and previous.get("dom_checksum") == dom_checksum
+        and previous.get("keywords") == list(keywords)
+    ):
+        # Same page, same keywords: last run's parse is still exact.
+        return previous
+    titles = extract_titles(body)
+    return {
+        "titles": titles,
+        "keyword_hits": float(_count_keywords(body, keywords)),
+        "keywords": list(keywords),
+        "dom_checksum": dom_checksum,
+        "discovered_postings": titles,
+    }
+
+
+def _keywords_variant(keywords: Sequence[str]) -> str:
+    blob = json.dumps([PARSE_VERSION, list(keywords)]).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()[:16]
+
+
+def _fetch(url: str, keywords, previous: Optional[dict] = None):
+    """Return (status, parsed payload or error text); unchanged pages are not re-parsed."""
     try:
-        resp = requests.get(url, timeout=20)
-        return resp.status_code, resp.text
+        fetched = http_cache.fetch(
+            url,
+            lambda resp: _parse_page(resp.text, keywords, previous),
+            variant=_keywords_variant(keywords),
+            timeout=20,
+        )
     except Exception as exc:
         return None, str(exc)
+    if fetched.status != 200:
+        return fetched.status, f"http {fetched.status}"
+    return fetched.status, fetched.parsed
 
 
-def _count_keywords(html: str, keywords):
-    text = html.lower()
-    return sum(text.count(k.lower()) for k in keywords)
+def _ats_row(entry: Dict, now: str) -> Optional[Dict]:
+    """Posting-level row for Greenhouse/Lever boards; ``None`` falls back to HTML."""
+    board = ats.board_for(entry)
+    if board is None:
+        return None
+    kind = entry["type"]
+    status, postings, api_url = ats.fetch_postings(kind, board)
+    if postings is None:
+        return None
+    diff = ats.record_postings(f"{kind}:{board}", postings, now)
+    keywords = entry.get("keywords", [])
+    matcher = _matcher(tuple(keywords))
+    matching = [
+        title for title in postings.values() if not matcher.keywords or matcher.count(title)
+    ]
+    payload = {
+        "board": diff.board,
+        "open_postings": len(diff.open),
+        "matching_postings": len(matching),
+        "new_postings": len(diff.new),
+        "closed_postings": len(diff.closed),
+        "keywords": list(keywords),
+        "titles": matching[:5],
+        "discovered_postings": [postings[posting_id] for posting_id in diff.new[:5]],
+    }
+    return {
+        "ts": now,
+        "sector": entry["sector"],
+        "entity": entry["url"],
+        "metric": "job_count",
+        "value": float(len(matching)),
+        "payload": payload,
+        "source_url": api_url,
+        "parse_version": ATS_PARSE_VERSION,
+        "checksum": checksum_payload(payload),
+        "license": "N/A",
+        "confidence": _confidence(kind),
+        "http_status": status,
+    }
 
 
+@collector("jobs", order=30)
 def collect():
     rows = []
-    for entry in _load_careers():
+    careers = _load_careers()
+    previous = _previous_payloads(entry["url"] for entry in careers)
+    for entry in careers:
         url = entry["url"]
-        status, body = _fetch(url)
+        ats_row = _ats_row(entry, datetime.now(timezone.utc).isoformat())
+        if ats_row is not None:
+            rows.append(ats_row)
+            continue
+        status, parsed = _fetch(url, entry.get("keywords", []), previous.get(url))
         now = datetime.now(timezone.utc).isoformat()
         if status != 200:
-            payload = {"error": body, "discovered_postings": []}
+            payload = {"error": parsed, "discovered_postings": []}
             value = 0.0
         else:
-            soup = BeautifulSoup(body, "lxml")
-            titles = [el.get_text(strip=True) for el in soup.find_all(["h1", "h2", "a"])][:5]
-            value = float(_count_keywords(body, entry.get("keywords", [])))
-            payload = {
-                "titles": titles,
-                "keyword_hits": value,
-                "dom_checksum": hashlib.sha1(body.encode("utf-8")).hexdigest(),
-                "discovered_postings": titles,
-            }
+            payload = parsed
+            value = parsed["keyword_hits"]
         rows.append(
             {
                 "ts": now,
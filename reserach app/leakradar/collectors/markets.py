@@ -1,18 +1,37 @@
-"""Market data collector."""
+"""Market data collector.
+
+Daily bars are kept in ``market_bars``; each run downloads only the bars
+missing since the last stored date (one batched yfinance call per distinct
+start date) and computes the 7-day metrics for every symbol at once from
+the stored bars. With an AlphaVantage key (and yfinance off) only stale
+symbols are requested, stalest first, within a persistent daily quota.
+Symbols without stored bars get no rows and are reported as deferred.
+"""
 
 from __future__ import annotations
 
 import csv
 import json
-from datetime import datetime, timezone
+import re
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import pandas as pd
 import requests
 import yfinance as yf
 
-from core import config
+from collectors.registry import collector, cursor
+from core import blobs, config, http_client, quota
 from core.db import get_connection
+from core.validate import epoch_day, ts_epoch
+
+# Calendar days requested for a symbol with no stored bars (covers 7 sessions).
+BAR_BOOTSTRAP_DAYS = 15
+METRIC_BARS = 7
+BAR_COLUMNS = ["symbol", "date", "close", "volume"]
+ALPHA_PROVIDER = "alphavantage"
+ALPHA_URL = "https://www.alphavantage.co/query"
 
 
 def _load_tickers() -> List[Dict[str, str]]:
@@ -24,73 +43,275 @@ def _load_tickers() -> List[Dict[str, str]]:
         return [row for row in reader if row.get("symbol")]
 
 
-def _fetch_alphavantage(symbol: str) -> List[Dict]:
+class QuotaExhausted(Exception):
+    """AlphaVantage answered with its daily-limit (or premium-only) note instead of data."""
+
+
+class MinuteThrottled(Exception):
+    """AlphaVantage asked us to slow down; the daily quota is not spent."""
+
+
+# The burst/per-minute notes mention a per-minute or per-second frequency;
+# the daily-limit note only states the requests-per-day allowance.
+ALPHA_MINUTE_NOTE = re.compile(r"per (minute|second)|spreading out", re.IGNORECASE)
+ALPHA_THROTTLE_PAUSE_SECS = 60.0
+
+
+def _fetch_alphavantage(symbol: str) -> Optional[List[Dict]]:
+    """Daily bars for ``symbol``, newest first; ``None`` if AlphaVantage rejects the symbol.
+
+    One unit of the daily quota is spent once a reply arrived. Transport and
+    HTTP errors (including an open circuit or a spent deadline) propagate.
+    """
     params = {
-        "function": "TIME_SERIES_DAILY_ADJUSTED",
+        "function": "TIME_SERIES_DAILY",
         "symbol": symbol,
+        "outputsize": "compact",
         "apikey": config.ALPHAVANTAGE_KEY,
     }
-    try:
-        resp = requests.get("https://www.alphavantage.co/query", params=params, timeout=30)
-        resp.raise_for_status()
-        data = resp.json().get("Time Series (Daily)", {})
-        history = []
-        for date_str, values in data.items():
-            history.append(
-                {
-                    "date": datetime.fromisoformat(date_str),
-                    "close": float(values.get("4. close", 0.0)),
-                    "volume": float(values.get("6. volume", 0.0)),
-                }
-            )
-        return sorted(history, key=lambda x: x["date"], reverse=True)
-    except Exception:
-        return []
+    resp = http_client.get(ALPHA_URL, params=params, timeout=30)
+    quota.consume(ALPHA_PROVIDER)
+    resp.raise_for_status()
+    payload = resp.json()
+    # Throttled/premium responses are 200s carrying a "Note" or "Information" message.
+    if "Note" in payload or "Information" in payload:
+        message = payload.get("Note") or payload.get("Information")
+        if ALPHA_MINUTE_NOTE.search(message):
+            http_client.bucket_for(http_client.host_of(ALPHA_URL)).pause(ALPHA_THROTTLE_PAUSE_SECS)
+            raise MinuteThrottled(message)
+        raise QuotaExhausted(message)
+    if "Error Message" in payload:
+        return None
+    data = payload.get("Time Series (Daily)", {})
+    history = []
+    for date_str, values in data.items():
+        history.append(
+            {
+                "date": datetime.fromisoformat(date_str),
+                "close": float(values.get("4. close", 0.0)),
+                "volume": float(values.get("5. volume", 0.0)),
+            }
+        )
+    return sorted(history, key=lambda x: x["date"], reverse=True)
+
+
+def _stale_symbols(
+    symbols: List[str], last_dates: Dict[str, str], today: date, rejected: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """Symbols missing the last completed session, never-fetched first, then oldest first.
+
+    A symbol AlphaVantage rejected sorts as if it had been refreshed on the
+    day of the rejection, so it does not take the first request of every run.
+    """
+    rejected = rejected or {}
+    expected = (pd.Timestamp(today) - pd.offsets.BDay(1)).date().isoformat()
+    stale = [symbol for symbol in symbols if (last_dates.get(symbol) or "") < expected]
+    return sorted(stale, key=lambda symbol: last_dates.get(symbol) or rejected.get(symbol) or "")
+
+
+def _alpha_bars(
+    symbols: List[str], last_dates: Dict[str, str], today: date
+) -> Tuple[pd.DataFrame, List[str]]:
+    """Refresh the stalest symbols the remaining daily quota allows; returns (bars, deferred symbols).
+
+    Symbols left over stay stale and sort first on the next run, so with N
+    symbols and a quota of Q every symbol is refreshed within ceil(N / Q) runs.
+    A failed request (network error, open circuit, spent deadline) stops the
+    loop; the symbol and everything after it are deferred.
+    """
+    state = cursor("markets")
+    rejected = {
+        key[len("rejected:"):]: day for key, day in state.items().items() if key.startswith("rejected:")
+    }
+    due = _stale_symbols(symbols, last_dates, today, rejected)
+    budget = quota.remaining(ALPHA_PROVIDER, config.ALPHAVANTAGE_DAILY_QUOTA)
+    frames = []
+    refreshed = set()
+    for symbol in due[:budget]:
+        try:
+            try:
+                history = _fetch_alphavantage(symbol)
+            except MinuteThrottled:
+                # The host bucket is paused for the minute; one more try after it.
+                history = _fetch_alphavantage(symbol)
+        except MinuteThrottled:
+            break
+        except QuotaExhausted:
+            quota.exhaust(ALPHA_PROVIDER, config.ALPHAVANTAGE_DAILY_QUOTA)
+            break
+        except (requests.RequestException, ValueError):
+            break
+        if history is None:
+            state.set(f"rejected:{symbol}", today.isoformat())
+            continue
+        bars = _history_bars(symbol, history)
+        bars = bars[bars["date"] >= (last_dates.get(symbol) or "")]
+        if not bars.empty:
+            refreshed.add(symbol)
+            frames.append(bars)
+    fresh = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=BAR_COLUMNS)
+    return fresh, [symbol for symbol in due if symbol not in refreshed]
+
 
+def _history_bars(symbol: str, history: List[Dict]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [(symbol, item["date"].date().isoformat(), item["close"], item["volume"]) for item in history],
+        columns=BAR_COLUMNS,
+    )
 
-def _fetch_yfinance(symbol: str) -> List[Dict]:
+
+def _download_bars(symbols: List[str], start: date) -> pd.DataFrame:
+    """One multi-ticker yfinance download, flattened to (symbol, date, close, volume)."""
     try:
-        hist = yf.Ticker(symbol).history(period="15d", interval="1d")
-        if hist.empty:
-            return []
-        history = []
-        for idx, row in hist.iterrows():
-            history.append(
-                {
-                    "date": idx.to_pydatetime(),
-                    "close": float(row["Close"]),
-                    "volume": float(row.get("Volume", 0.0)),
-                }
-            )
-        return sorted(history, key=lambda x: x["date"], reverse=True)
+        raw = yf.download(
+            symbols,
+            start=start.isoformat(),
+            interval="1d",
+            group_by="column",
+            multi_level_index=True,
+            auto_adjust=False,
+            progress=False,
+            threads=True,
+        )
     except Exception:
-        return []
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    if raw is None or raw.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    # Columns are (field, ticker); stack the ticker level into rows.
+    frame = pd.DataFrame({"close": raw["Close"].stack(), "volume": raw["Volume"].stack()})
+    frame = frame.dropna(subset=["close"]).rename_axis(["date", "symbol"]).reset_index()
+    frame["date"] = pd.to_datetime(frame["date"]).dt.strftime("%Y-%m-%d")
+    frame["volume"] = frame["volume"].fillna(0.0)
+    return frame[BAR_COLUMNS]
+
+
+def _last_bar_dates(conn, symbols: Iterable[str]) -> Dict[str, str]:
+    symbols = list(symbols)
+    placeholders = ", ".join("?" for _ in symbols)
+    return {
+        row[0]: row[1]
+        for row in conn.execute(
+            f"SELECT symbol, MAX(date) FROM market_bars WHERE symbol IN ({placeholders}) GROUP BY symbol",
+            symbols,
+        )
+    }
+
+
+def _missing_bars(symbols: List[str], last_dates: Dict[str, str], today: date) -> pd.DataFrame:
+    """Download what each symbol lacks, batching symbols that share a start date.
+
+    The last stored bar is fetched again because it may have been an
+    intraday partial bar when it was written.
+    """
+    by_start: Dict[date, List[str]] = {}
+    for symbol in symbols:
+        last = last_dates.get(symbol)
+        start = date.fromisoformat(last) if last else today - timedelta(days=BAR_BOOTSTRAP_DAYS)
+        by_start.setdefault(start, []).append(symbol)
+    frames = [_download_bars(group, start) for start, group in sorted(by_start.items())]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
 
 
-def _compute_metrics(history: List[Dict]) -> Dict[str, float]:
-    if not history:
-        return {"price_change_7d": 0.0, "volume_7d": 0.0}
-    latest = history[0]
-    lookback_index = min(6, len(history) - 1)
-    base = history[lookback_index]["close"] or 1e-6
-    price_change = ((latest["close"] - base) / base) * 100.0
-    volume = sum(item["volume"] for item in history[:7])
-    return {"price_change_7d": price_change, "volume_7d": volume}
+def _store_bars(conn, bars: pd.DataFrame) -> int:
+    if bars.empty:
+        return 0
+    conn.executemany(
+        "INSERT OR REPLACE INTO market_bars (symbol, date, close, volume) VALUES (?, ?, ?, ?)",
+        bars[BAR_COLUMNS].itertuples(index=False, name=None),
+    )
+    return len(bars)
 
 
+def _load_bars(conn, symbols: Iterable[str], count: int = METRIC_BARS) -> pd.DataFrame:
+    """Latest ``count`` stored bars per symbol, newest first."""
+    symbols = list(symbols)
+    placeholders = ", ".join("?" for _ in symbols)
+    frame = pd.read_sql_query(
+        f"""
+        SELECT symbol, date, close, volume FROM (
+            SELECT symbol, date, close, volume,
+                   ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) AS rn
+            FROM market_bars WHERE symbol IN ({placeholders})
+        ) WHERE rn <= ? ORDER BY symbol, date DESC
+        """,
+        conn,
+        params=[*symbols, count],
+    )
+    return frame
+
+
+def _compute_metrics(bars: pd.DataFrame) -> pd.DataFrame:
+    """Per-symbol 7-day price change (%) and volume, computed for all symbols at once.
+
+    ``bars`` is newest-first per symbol. The change compares the latest close
+    with the 7th most recent (or the oldest available) close.
+    """
+    if bars.empty:
+        return pd.DataFrame(columns=["price_change_7d", "volume_7d"], index=pd.Index([], name="symbol"))
+    bars = bars.sort_values(["symbol", "date"], ascending=[True, False])
+    rank = bars.groupby("symbol").cumcount()
+    recent = bars[rank < METRIC_BARS]
+    grouped = recent.groupby("symbol")
+    latest = grouped["close"].first()
+    base = grouped["close"].last().replace(0.0, 1e-6).fillna(1e-6)
+    return pd.DataFrame(
+        {
+            "price_change_7d": (latest - base) / base * 100.0,
+            "volume_7d": grouped["volume"].sum(),
+        }
+    )
+
+
+def _payload_texts(bars: pd.DataFrame) -> Dict[str, str]:
+    """Per-symbol JSON of the bars behind the metrics (newest first)."""
+    records: Dict[str, List[Dict]] = {}
+    for symbol, day, close, volume in bars[BAR_COLUMNS].itertuples(index=False, name=None):
+        records.setdefault(symbol, []).append({"date": day, "close": close, "volume": volume})
+    return {symbol: json.dumps(items) for symbol, items in records.items()}
+
+
+@collector("markets", order=80)
 def collect():
     tickers = _load_tickers()
     if not tickers:
         return {"inserted": 0, "quarantined": 0, "skipped": "no_tickers"}
-    rows = []
+    symbols = list(dict.fromkeys(entry["symbol"] for entry in tickers))
     now = datetime.now(timezone.utc).isoformat()
+    epoch = ts_epoch(now)
+    day = epoch_day(epoch)
     use_alpha = bool(config.ALPHAVANTAGE_KEY) and not config.USE_YFINANCE
+    confidence = 0.9 if use_alpha else 0.8
+    today = datetime.now(timezone.utc).date()
+    with get_connection(readonly=True) as conn:
+        last_dates = _last_bar_dates(conn, symbols)
+    deferred: List[str] = []
+    if use_alpha:
+        fresh, deferred = _alpha_bars(symbols, last_dates, today)
+    else:
+        fresh = _missing_bars(symbols, last_dates, today)
+    with get_connection() as conn:
+        _store_bars(conn, fresh)
+        bars = _load_bars(conn, symbols)
+    metrics = _compute_metrics(bars).to_dict("index")
+    symbol_texts = _payload_texts(bars)
+
+    rows = []
+    texts = {}
     for entry in tickers:
         symbol = entry["symbol"]
-        history = _fetch_alphavantage(symbol) if use_alpha else _fetch_yfinance(symbol)
-        metrics = _compute_metrics(history)
-        confidence = 0.9 if use_alpha else 0.8
-        for metric, value in metrics.items():
+        values = metrics.get(symbol)
+        if values is None:
+            # No bars stored yet: nothing to measure, rather than a 0.0 row.
+            deferred.append(symbol)
+            continue
+        # Both metrics share the same 7-bar history; it is stored once.
+        text = symbol_texts[symbol]
+        ref = blobs.payload_ref(text)
+        texts[ref] = text
+        for metric in ("price_change_7d", "volume_7d"):
             rows.append(
                 (
                     now,
@@ -98,19 +319,24 @@ def collect():
                     symbol,
                     entry.get("kind", "ticker"),
                     metric,
-                    float(value),
-                    json.dumps(history[:7], default=str) if history else "{}",
+                    float(values[metric]),
+                    ref,
                     confidence,
+                    epoch,
+                    day,
                 )
             )
-    if not rows:
-        return {"inserted": 0, "quarantined": 0}
     with get_connection() as conn:
+        blobs.put_many(conn, texts)
         conn.executemany(
             """
-            INSERT INTO market_events (ts, sector, symbol, kind, metric, value, payload, confidence)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO market_events (ts, sector, symbol, kind, metric, value, payload_ref, confidence,
+            ts_epoch, event_day)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             rows,
         )
-    return {"inserted": len(rows), "quarantined": 0}
+    result = {"inserted": len(rows), "quarantined": 0}
+    if deferred:
+        result["deferred"] = len(set(deferred))
+    return result
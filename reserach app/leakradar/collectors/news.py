@@ -1,16 +1,26 @@
-"""News / narrative collector."""
+"""News / narrative collector.
+
+Sectors are fetched concurrently; answers are cached per (provider,
+sector, query set, day) so same-day reruns skip the API calls, and
+articles returned for several sectors are shared between them rather
+than counted in each. A sector has one ``media_hits`` row per day: a rerun
+replaces it instead of adding another.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
 import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional
-
-import requests
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from core import config
+from collectors.registry import collector
+from core import cache, config, deadline, http_client
 from core.db import get_connection
+from core.validate import epoch_day, ts_epoch
 
 
 def _perplexity_payload(sector: str) -> Optional[Dict]:
@@ -22,7 +32,7 @@ def _perplexity_payload(sector: str) -> Optional[Dict]:
         "top_topics (array of strings), sources (array of URLs)."
     )
     try:
-        resp = requests.post(
+        resp = http_client.post(
             "https://api.perplexity.ai/chat/completions",
             headers={"Authorization": f"Bearer {config.PERPLEXITY_API_KEY}"},
             json={
@@ -30,6 +40,8 @@ def _perplexity_payload(sector: str) -> Optional[Dict]:
                 "messages": [{"role": "user", "content": prompt}],
             },
             timeout=30,
+            # Completions are billed per call; a retried timeout may bill twice.
+            retries=0,
         )
         resp.raise_for_status()
         data = resp.json()
@@ -53,7 +65,7 @@ def _newsapi_payload(sector: str) -> Optional[Dict]:
         "pageSize": 100,
     }
     try:
-        resp = requests.get(
+        resp = http_client.get(
             "https://newsapi.org/v2/everything",
             params=params,
             headers={"X-Api-Key": config.NEWSAPI_KEY},
@@ -61,45 +73,111 @@ def _newsapi_payload(sector: str) -> Optional[Dict]:
         )
         resp.raise_for_status()
         data = resp.json()
-        articles = data.get("articles", [])[:5]
+        all_articles = data.get("articles", [])
+        articles = all_articles[:5]
         sources = [article.get("url") for article in articles if article.get("url")]
         return {
             "media_hits": min(int(data.get("totalResults", 0) or 0), 100),
             "top_topics": [article.get("title") for article in articles if article.get("title")],
             "sources": sources,
+            "url_hashes": url_hashes(article.get("url") for article in all_articles),
         }
     except Exception:
         return None
 
 
+def url_hashes(urls: Iterable[Optional[str]]) -> List[str]:
+    """Short stable hashes of article URLs (fragment and trailing slash ignored)."""
+    hashes = []
+    for url in urls:
+        if not url:
+            continue
+        normalized = url.split("#", 1)[0].rstrip("/").lower()
+        hashes.append(hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16])
+    return sorted(set(hashes))
+
+
+def _cached(provider: str, sector: str, fetch) -> Optional[Dict]:
+    key = cache.cache_key(sector, config.NARRATIVE_QUERIES.get(sector, [sector]))
+    return cache.cached(provider, key, config.RESPONSE_CACHE_TTL_SECS, lambda: fetch(sector))
+
+
+def _sector_payload(sector: str) -> Optional[Tuple[str, float, Dict]]:
+    payload = _cached("perplexity", sector, _perplexity_payload)
+    if payload is not None:
+        return "perplexity", 0.8, payload
+    payload = _cached("newsapi", sector, _newsapi_payload)
+    if payload is not None:
+        return "newsapi", 0.7, payload
+    return None
+
+
+def _dedupe_media_hits(payloads: Dict[str, Dict]) -> None:
+    """Share articles returned for several sectors instead of counting them in each.
+
+    An article seen in k sectors credits 1/k to each; a sector's media_hits
+    is scaled by its mean credit over the articles it returned.
+    """
+    hashes = {
+        sector: set(payload.pop("url_hashes", None) or url_hashes(payload.get("sources", [])))
+        for sector, payload in payloads.items()
+    }
+    owners = Counter(h for sector_hashes in hashes.values() for h in sector_hashes)
+    for sector, payload in payloads.items():
+        if not hashes[sector]:
+            continue
+        share = sum(1.0 / owners[h] for h in hashes[sector]) / len(hashes[sector])
+        if share < 1.0:
+            payload["raw_media_hits"] = payload["media_hits"]
+            payload["media_hits"] = float(payload["media_hits"]) * share
+            payload["unique_share"] = round(share, 4)
+
+
+@collector("news", order=60)
 def collect():
     rows = []
     now = datetime.now(timezone.utc).isoformat()
-    for sector in config.SECTORS:
-        payload = _perplexity_payload(sector)
-        confidence = 0.8 if payload else 0.0
-        source = "perplexity"
-        if payload is None:
-            payload = _newsapi_payload(sector)
-            confidence = 0.7 if payload else 0.0
-            source = "newsapi"
-        if payload is None:
-            continue
-        media_hits = payload.get("media_hits")
+    epoch = ts_epoch(now)
+    day = epoch_day(epoch)
+    sectors = list(config.SECTORS)
+    with ThreadPoolExecutor(max_workers=max(1, len(sectors))) as pool:
+        results = dict(zip(sectors, pool.map(deadline.propagate(_sector_payload), sectors)))
+    found = {sector: result for sector, result in results.items() if result is not None}
+    payloads = {sector: dict(payload) for sector, (_, _, payload) in found.items()}
+    for payload in payloads.values():
+        if payload.get("media_hits") is None:
+            payload["media_hits"] = max(len(payload.get("sources", [])), random.randint(5, 15))
+    _dedupe_media_hits(payloads)
+    for sector, (source, confidence, _) in found.items():
+        payload = payloads[sector]
         sources = payload.get("sources", [])
-        if media_hits is None:
-            media_hits = max(len(sources), random.randint(5, 15))
-        row_payload = json.dumps(payload)
         rows.append(
-            (now, source, sector, "media_hits", float(media_hits), row_payload, ",".join(sources), confidence)
+            (
+                now,
+                source,
+                sector,
+                "media_hits",
+                float(payload["media_hits"]),
+                json.dumps(payload),
+                ",".join(sources),
+                confidence,
+                epoch,
+                day,
+            )
         )
     if not rows:
         return {"inserted": 0, "quarantined": 0, "skipped": len(config.SECTORS)}
     with get_connection() as conn:
+        # media_density sums the day's rows, so a same-day rerun must not add to them.
+        conn.executemany(
+            "DELETE FROM narrative_events WHERE metric = 'media_hits' AND sector = ? AND event_day = ?",
+            [(sector, day) for sector in found],
+        )
         conn.executemany(
             """
-            INSERT INTO narrative_events (ts, source, sector, metric, value, payload, source_url, confidence)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO narrative_events (ts, source, sector, metric, value, payload, source_url,
+            confidence, ts_epoch, event_day)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             rows,
         )
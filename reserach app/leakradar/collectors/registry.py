@@ -0,0 +1,128 @@
+"""Collector registry and persistent cursors.
+
+Collectors declare themselves with ``@collector(name, order=...)`` on their
+``collect`` function; orchestration runs whatever is registered, in order.
+Each collector gets a ``Cursor`` over ``collector_state`` for what it saw
+last (ids, timestamps, page tokens, byte offsets), so runs fetch deltas.
+arXiv, ClinicalTrials and the grants bulk loader use one (markets only notes
+symbols AlphaVantage rejected); the others keep their incremental state in
+their own tables (``http_cache`` validators, ``ats_postings``,
+``market_bars``, ``response_cache``).
+"""
+
+from __future__ import annotations
+
+import importlib
+import pkgutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from core import config, deadline
+from core.db import get_connection
+
+
+@dataclass(frozen=True)
+class Collector:
+    name: str
+    module: str
+    attr: str
+    order: int = 100
+
+    def run(self) -> Dict:
+        # Resolved at call time so monkeypatched module attributes are honoured.
+        return getattr(importlib.import_module(self.module), self.attr)()
+
+
+_REGISTRY: Dict[str, Collector] = {}
+
+
+def collector(name: str, order: int = 100) -> Callable:
+    """Register a module-level ``collect``-style function; returns it unchanged."""
+
+    def decorate(fn: Callable) -> Callable:
+        _REGISTRY[name] = Collector(name=name, module=fn.__module__, attr=fn.__name__, order=order)
+        return fn
+
+    return decorate
+
+
+def discover() -> None:
+    """Import every module in the collectors package so their decorators run."""
+    package = importlib.import_module("collectors")
+    for info in pkgutil.iter_modules(package.__path__):
+        importlib.import_module(f"collectors.{info.name}")
+
+
+def registered() -> List[Collector]:
+    discover()
+    return sorted(_REGISTRY.values(), key=lambda item: (item.order, item.name))
+
+
+class Cursor:
+    """Key/value state for one collector, persisted in ``collector_state``."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with get_connection(readonly=True) as conn:
+            row = conn.execute(
+                "SELECT value FROM collector_state WHERE collector = ? AND key = ?", (self.name, key)
+            ).fetchone()
+        return row[0] if row else default
+
+    def set(self, key: str, value) -> None:
+        with get_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO collector_state (collector, key, value, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(collector, key) DO UPDATE SET
+                    value = excluded.value, updated_at = excluded.updated_at
+                """,
+                (self.name, key, None if value is None else str(value), datetime.now(timezone.utc).isoformat()),
+            )
+
+    def items(self) -> Dict[str, str]:
+        with get_connection(readonly=True) as conn:
+            return dict(
+                conn.execute("SELECT key, value FROM collector_state WHERE collector = ?", (self.name,)).fetchall()
+            )
+
+
+def cursor(name: str) -> Cursor:
+    return Cursor(name)
+
+
+def run_registered(
+    log=None, run_budget: Optional[float] = None, collector_budget: Optional[float] = None
+) -> Dict[str, Dict]:
+    """Run every registered collector; failures are recorded, not raised.
+
+    Each collector runs under ``collector_budget`` seconds and all of them
+    under ``run_budget`` (defaults from config). Budgets are enforced at HTTP
+    calls, so a collector stuck on a slow host fails fast instead of stalling
+    the run; collectors left when the run budget is spent are skipped.
+    """
+    run_budget = config.RUN_BUDGET_SECS if run_budget is None else run_budget
+    collector_budget = config.COLLECTOR_BUDGET_SECS if collector_budget is None else collector_budget
+    summary = {}
+    with deadline.budget(run_budget):
+        for entry in registered():
+            started = time.monotonic()
+            if deadline.expired():
+                result = {"skipped": "run_budget_exhausted", "inserted": 0, "quarantined": 0}
+            else:
+                try:
+                    with deadline.budget(collector_budget):
+                        result = entry.run()
+                except Exception as exc:
+                    result = {"error": str(exc), "inserted": 0, "quarantined": 0}
+                else:
+                    cursor(entry.name).set("last_success_at", datetime.now(timezone.utc).isoformat())
+                result = dict(result, elapsed_secs=round(time.monotonic() - started, 2))
+            summary[entry.name] = result
+            if log is not None:
+                log.info("collector %s => %s", entry.name, result)
+    return summary
@@ -1,46 +1,131 @@
-"""Social / sentiment collector (SerpAPI optional)."""
+"""Social / sentiment collector (SerpAPI optional).
+
+Queries fan out concurrently within a persistent daily SerpAPI budget.
+Each query's organic URLs are cached for the day and kept in
+``serp_results``, and a sector's mentions are its distinct URLs across
+all of its queries. A sector is emitted at most once per day, once every
+one of its queries has been answered.
+"""
 
 from __future__ import annotations
 
+import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
-import requests
-
-from core import config
+from collectors.registry import collector
+from core import cache, config, deadline, http_client, quota
 from core.db import get_connection
+from core.validate import epoch_day, ts_epoch
 
+PROVIDER = "serpapi"
+SERP_URL = "https://serpapi.com/search.json"
+CACHE_TTL_SECS = 24 * 3600
 
-def _serp_count(query: str) -> int:
-    if not config.SERPAPI_KEY:
-        return 0
+
+def _serp_urls(query: str) -> Optional[List[str]]:
+    """Organic result URLs for ``query``; ``None`` when the call failed."""
     try:
-        resp = requests.get(
-            "https://serpapi.com/search.json",
+        resp = http_client.get(
+            SERP_URL,
             params={"engine": "google", "q": query, "api_key": config.SERPAPI_KEY},
             timeout=20,
         )
         resp.raise_for_status()
         data = resp.json()
-        results = data.get("organic_results", [])
-        return len(results)
     except Exception:
-        return 0
+        return None
+    return [result.get("link") for result in data.get("organic_results", []) if result.get("link")]
 
 
+def _fetch(query: str, day: str) -> Optional[List[str]]:
+    quota.consume(PROVIDER)
+    urls = _serp_urls(query)
+    if urls is None:
+        return None
+    cache.put(PROVIDER, cache.cache_key(query), urls, CACHE_TTL_SECS)
+    with get_connection() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO serp_results (day, query, position, url) VALUES (?, ?, ?, ?)",
+            [(day, query, position, url) for position, url in enumerate(urls)],
+        )
+    return urls
+
+
+def _query_results(queries: List[str], day: str) -> Dict[str, List[str]]:
+    """Cached results plus fresh ones for as many uncached queries as the budget allows."""
+    results: Dict[str, List[str]] = {}
+    pending = []
+    for query in dict.fromkeys(queries):
+        hit = cache.get(PROVIDER, cache.cache_key(query))
+        if hit is not None:
+            results[query] = hit
+        else:
+            pending.append(query)
+    pending = pending[: quota.remaining(PROVIDER, config.SERPAPI_DAILY_QUOTA)]
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(len(pending), config.HTTP_HOST_CONCURRENCY)) as pool:
+            fetched = pool.map(deadline.propagate(lambda query: _fetch(query, day)), pending)
+            for query, urls in zip(pending, fetched):
+                if urls is not None:
+                    results[query] = urls
+    return results
+
+
+@collector("social", order=70)
 def collect():
     if not config.SERPAPI_KEY:
         return {"inserted": 0, "quarantined": 0, "skipped": "serpapi_key_missing"}
     rows = []
     now = datetime.now(timezone.utc).isoformat()
-    for sector, queries in config.NARRATIVE_QUERIES.items():
-        mentions = sum(_serp_count(q) for q in queries)
-        rows.append((now, "serpapi", sector, "social_mentions", float(mentions), "{}", "", 0.6))
-    with get_connection() as conn:
-        conn.executemany(
-            """
-            INSERT INTO narrative_events (ts, source, sector, metric, value, payload, source_url, confidence)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            rows,
+    epoch = ts_epoch(now)
+    day = epoch_day(epoch)
+    with get_connection(readonly=True) as conn:
+        # social_pulse sums the day's rows, so a sector already emitted today is done.
+        emitted = {
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT DISTINCT sector FROM narrative_events
+                WHERE metric = 'social_mentions' AND event_day = ?
+                """,
+                (day,),
+            )
+        }
+    pending = {
+        sector: queries for sector, queries in config.NARRATIVE_QUERIES.items() if sector not in emitted
+    }
+    all_queries = [query for queries in pending.values() for query in queries]
+    results = _query_results(all_queries, day)
+    deferred = 0
+    for sector, queries in pending.items():
+        answered = [query for query in queries if query in results]
+        deferred += len(queries) - len(answered)
+        # A partial count would read as a drop in mentions; answered queries
+        # stay cached for the day, so a later run completes the sector cheaply.
+        if not queries or len(answered) < len(queries):
+            continue
+        urls = {url for query in answered for url in results[query]}
+        payload = {
+            "queries": len(answered),
+            "raw_results": sum(len(results[query]) for query in answered),
+            "unique_urls": len(urls),
+        }
+        rows.append(
+            (now, "serpapi", sector, "social_mentions", float(len(urls)), json.dumps(payload), "", 0.6, epoch, day)
         )
-    return {"inserted": len(rows), "quarantined": 0}
+    if rows:
+        with get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO narrative_events (ts, source, sector, metric, value, payload, source_url,
+                confidence, ts_epoch, event_day)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+    result = {"inserted": len(rows), "quarantined": 0}
+    if deferred:
+        result["deferred"] = deferred
+    return result
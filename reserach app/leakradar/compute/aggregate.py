@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Dict
 
 import pandas as pd
@@ -10,20 +10,27 @@ import pandas as pd
 from core import config
 from core import db
 from core.scoring import compute_scores
-from core.triangulate import compute_consensus, disagreement_by_sector
-
-
-def _load_events(conn) -> pd.DataFrame:
-    query = "SELECT ts, source, sector, entity, metric, value, confidence FROM events"
-    df = pd.read_sql_query(query, conn)
-    if df.empty:
-        return df
-    df["ts"] = pd.to_datetime(df["ts"], utc=True)
+from core.triangulate import compute_consensus_daily, disagreement_by_sector
+
+
+def _load_daily(conn, window_days: int = config.Z_SCORE_WINDOW_DAYS) -> pd.DataFrame:
+    """``events_daily`` rollup rows inside the feature window."""
+    latest = conn.execute("SELECT MAX(day) FROM events_daily").fetchone()[0]
+    since = ""
+    if latest:
+        since = (date.fromisoformat(latest) - timedelta(days=window_days - 1)).isoformat()
+    query = (
+        "SELECT day, sector, metric, source, value_sum, value_count, confidence_sum, confidence_count "
+        "FROM events_daily WHERE day >= ?"
+    )
+    df = pd.read_sql_query(query, conn, params=(since,))
+    df.insert(0, "ts", pd.to_datetime(df.pop("day"), utc=True))
     return df
 
 
-def build_features(events_df: pd.DataFrame) -> pd.DataFrame:
-    if events_df.empty:
+def build_features(daily_df: pd.DataFrame) -> pd.DataFrame:
+    """Build per-day sector features from the ``events_daily`` rollup (see ``_load_daily``)."""
+    if daily_df.empty:
         end = datetime.now(timezone.utc)
         dates = pd.date_range(end=end, periods=config.Z_SCORE_WINDOW_DAYS, freq="D")
         idx = pd.MultiIndex.from_product([dates, config.SECTORS], names=["ts", "sector"])
@@ -41,7 +48,7 @@ def build_features(events_df: pd.DataFrame) -> pd.DataFrame:
             frame[col] = 0.0
         return frame.reset_index()
 
-    end = events_df["ts"].max()
+    end = daily_df["ts"].max()
     start = end - timedelta(days=config.Z_SCORE_WINDOW_DAYS - 1)
     dates = pd.date_range(start=start, end=end, freq="D")
     idx = pd.MultiIndex.from_product([dates, config.SECTORS], names=["ts", "sector"])
@@ -58,10 +65,17 @@ def build_features(events_df: pd.DataFrame) -> pd.DataFrame:
     )
 
     daily = (
-        events_df.groupby(["ts", "sector", "metric"])
-        .agg(value=("value", "sum"), confidence=("confidence", "mean"))
+        daily_df.groupby(["ts", "sector", "metric"])
+        .agg(
+            value=("value_sum", "sum"),
+            confidence_sum=("confidence_sum", "sum"),
+            confidence_count=("confidence_count", "sum"),
+        )
         .reset_index()
     )
+    daily["confidence"] = daily["confidence_sum"] / daily["confidence_count"].where(
+        daily["confidence_count"] > 0
+    )
 
     # Confidence per day/sector
     conf = (
@@ -97,9 +111,10 @@ def build_features(events_df: pd.DataFrame) -> pd.DataFrame:
         frame["jobs_keyword_count"] = jobs_pivot.stack().reindex(idx, fill_value=0.0).values
 
     # GitHub stars delta 30d
-    stars = events_df[events_df["metric"] == "stars"]
+    stars = daily_df[daily_df["metric"] == "stars"]
     if not stars.empty:
-        stars_daily = stars.groupby(["ts", "sector"])["value"].mean().reset_index()
+        stars_daily = stars.groupby(["ts", "sector"])[["value_sum", "value_count"]].sum().reset_index()
+        stars_daily["value"] = stars_daily["value_sum"] / stars_daily["value_count"]
         stars_pivot = stars_daily.pivot_table(
             index="ts", columns="sector", values="value", aggfunc="mean"
         ).reindex(dates, fill_value=0.0)
@@ -107,7 +122,7 @@ def build_features(events_df: pd.DataFrame) -> pd.DataFrame:
         frame["github_stars_30d"] = delta.stack().reindex(idx, fill_value=0.0).values
 
     # Triangulation disagreement
-    consensus = compute_consensus(events_df)
+    consensus = compute_consensus_daily(daily_df)
     disagreement = disagreement_by_sector(consensus)
     disagreement = disagreement.set_index(["ts", "sector"]).reindex(idx, fill_value=0.0)
     frame["consensus_disagreement"] = disagreement["consensus_disagreement"].values
@@ -162,8 +177,8 @@ def persist_scores(conn, scores_df: pd.DataFrame) -> None:
 
 def run_compute() -> Dict[str, int]:
     with db.get_connection() as conn:
-        events_df = _load_events(conn)
-        features = build_features(events_df)
+        daily_df = _load_daily(conn)
+        features = build_features(daily_df)
         persist_features(conn, features)
         scores = compute_scores(features)
         persist_scores(conn, scores)
@@ -0,0 +1,131 @@
+"""Date-partitioned Parquet snapshots of events, features, scores and anomalies.
+
+Offline analysis (the backtest notebook, ad-hoc pandas) reads these instead of
+querying the live SQLite file:
+
+    from compute.export import load_snapshot
+    df = load_snapshot("events", columns=["day", "sector", "metric", "value"], since="2025-11-01")
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import pandas as pd
+
+from core import config
+from core.archive import history_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = ds = pq = None
+
+SNAPSHOT_DIR = Path(config.SNAPSHOT_DIR)
+
+# Every query exposes a ``day`` (YYYY-MM-DD) column used as the hive partition key.
+SNAPSHOT_QUERIES: Dict[str, str] = {
+    "events": (
+        "SELECT event_day AS day, ts_epoch, source, sector, entity, metric, value, confidence, "
+        "checksum, payload_ref FROM events_history "
+        "WHERE ? = '' OR event_day IN (SELECT DISTINCT event_day FROM main.events WHERE fetched_at > ?)"
+    ),
+    "features": "SELECT substr(ts, 1, 10) AS day, * FROM features",
+    "scores": "SELECT substr(ts, 1, 10) AS day, * FROM scores",
+    "anomalies": "SELECT substr(ts, 1, 10) AS day, * FROM anomalies",
+}
+# Raw events are append-only, so only the days that received rows since the last
+# export (by fetched_at, so late rows for old days count) are rewritten, archived
+# rows included; the derived tables are rebuilt by every compute run and are
+# re-exported whole. Event ids are not a usable watermark: once ``compact()``
+# archives the highest ids, SQLite hands them out again.
+INCREMENTAL = {"events"}
+WATERMARK_FILE = "_last_fetched.json"
+
+
+def _read_watermark(path: Path) -> str:
+    try:
+        return str(json.loads((path / WATERMARK_FILE).read_text())["fetched_at"])
+    except (OSError, ValueError, KeyError):
+        return ""
+
+
+def _write_watermark(path: Path, fetched_at: str) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    (path / WATERMARK_FILE).write_text(json.dumps({"fetched_at": fetched_at}))
+
+
+def _write(df: pd.DataFrame, path: Path) -> None:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table,
+        path,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("day", pa.string())]), flavor="hive"),
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+
+
+def export_snapshots(out_dir: Optional[Path] = None) -> Dict[str, Union[int, str]]:
+    """Write/refresh the snapshots; returns rows exported per table."""
+    if pa is None:
+        return {"skipped": "pyarrow_missing"}
+    base = Path(out_dir or SNAPSHOT_DIR)
+    summary: Dict[str, Union[int, str]] = {}
+    with history_connection() as conn:
+        for name, query in SNAPSHOT_QUERIES.items():
+            path = base / name
+            latest = None
+            if name in INCREMENTAL:
+                latest = conn.execute(f"SELECT COALESCE(MAX(fetched_at), '') FROM main.{name}").fetchone()[0]
+                since = _read_watermark(path)
+                if since > latest:
+                    # The database was rebuilt; start over.
+                    since = ""
+                df = pd.read_sql_query(query, conn, params=(since, since))
+            else:
+                df = pd.read_sql_query(query, conn)
+                if path.exists():
+                    shutil.rmtree(path)
+            df = df[df["day"].notna()]
+            if not df.empty:
+                _write(df, path)
+            if latest is not None:
+                _write_watermark(path, latest)
+            summary[name] = int(len(df))
+    return summary
+
+
+def load_snapshot(
+    name: str,
+    columns: Optional[Sequence[str]] = None,
+    since: Optional[Union[str, date]] = None,
+    until: Optional[Union[str, date]] = None,
+    base_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Memory-map a snapshot, reading only ``columns`` and the day partitions in range."""
+    if pq is None:
+        raise ImportError("pyarrow is required to read snapshots (pip install pyarrow)")
+    path = Path(base_dir or SNAPSHOT_DIR) / name
+    if not path.exists():
+        return pd.DataFrame(columns=list(columns or []))
+    filters = []
+    if since is not None:
+        filters.append(("day", ">=", str(since)))
+    if until is not None:
+        filters.append(("day", "<=", str(until)))
+    table = pq.read_table(
+        path,
+        columns=list(columns) if columns else None,
+        filters=filters or None,
+        partitioning=ds.partitioning(pa.schema([("day", pa.string())]), flavor="hive"),
+        memory_map=True,
+    )
+    return table.to_pandas()
@@ -0,0 +1,187 @@
+"""Hot/cold partitioning of the raw event tables.
+
+The operational database keeps ``HOT_RETENTION_DAYS`` of raw rows. Older rows
+are moved into per-month tables (``events_2025_01`` ...) inside a separate
+archive database, and ``history_connection`` exposes ``<table>_history``
+UNION ALL views over hot + archived rows for offline analysis.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Set
+
+from . import config
+from .db import get_connection
+
+ARCHIVE_PATH = config.ARCHIVE_PATH
+PARTITIONED_TABLES = ("events", "narrative_events", "market_events")
+ARCHIVE_SCHEMA = "archive"
+# Mirrors collectors.base.DEDUP_KEY / ux_events_dedup.
+DEDUP_COLUMNS = ("source", "entity", "metric", "checksum", "event_day")
+
+
+def _columns(conn: sqlite3.Connection, table: str, schema: str = "main") -> Dict[str, str]:
+    rows = conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()
+    return {row["name"]: row["type"] for row in rows}
+
+
+def _attached(conn: sqlite3.Connection) -> bool:
+    return any(row["name"] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list"))
+
+
+def _attach(conn: sqlite3.Connection, create: bool) -> bool:
+    path = Path(ARCHIVE_PATH)
+    if not create and not path.exists():
+        return False
+    if not _attached(conn):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(path),))
+    return True
+
+
+def _detach(conn: sqlite3.Connection) -> None:
+    # DETACH is not allowed mid-transaction, and committing here would commit
+    # an enclosing caller's pooled transaction; stay attached until it ends.
+    if not conn.in_transaction and _attached(conn):
+        conn.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+
+
+def partitions(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Archived month tables for ``table`` (archive must be attached)."""
+    rows = conn.execute(
+        f"SELECT name FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table' AND name GLOB ?",
+        (f"{table}_[0-9][0-9][0-9][0-9]_[0-9][0-9]",),
+    ).fetchall()
+    return sorted(row["name"] for row in rows)
+
+
+def _move_month(conn: sqlite3.Connection, table: str, month: str, cutoff: int) -> int:
+    part = f"{table}_{month.replace('-', '_')}"
+    hot_cols = _columns(conn, table)
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.{part} AS SELECT * FROM main.{table} WHERE 0"
+    )
+    # Hot tables gain columns through migrations; keep the partition in step.
+    part_cols = _columns(conn, part, ARCHIVE_SCHEMA)
+    for name, ddl in hot_cols.items():
+        if name not in part_cols:
+            conn.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.{part} ADD COLUMN {name} {ddl}")
+    if table == "events":
+        # Ingest checks partitions for archived duplicates (see ``archived_rows``).
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.ix_{part}_dedup "
+            f"ON {part} ({', '.join(DEDUP_COLUMNS)})"
+        )
+    cols = ", ".join(hot_cols)
+    where = "ts_epoch < ? AND substr(event_day, 1, 7) = ?"
+    conn.execute(
+        f"INSERT INTO {ARCHIVE_SCHEMA}.{part} ({cols}) SELECT {cols} FROM main.{table} WHERE {where}",
+        (cutoff, month),
+    )
+    return conn.execute(f"DELETE FROM main.{table} WHERE {where}", (cutoff, month)).rowcount
+
+
+def archived_rows(rows: Sequence[Dict]) -> Set[int]:
+    """Positions of prepared event rows whose dedup key is already archived.
+
+    Archived rows have left ``ux_events_dedup``, so a re-ingested row from a
+    month that has a partition is looked up there instead.
+    """
+    path = Path(ARCHIVE_PATH)
+    if not rows or not path.exists():
+        return set()
+    found: Set[int] = set()
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        months = {
+            name[len("events_"):].replace("_", "-")
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+                ("events_[0-9][0-9][0-9][0-9]_[0-9][0-9]",),
+            )
+        }
+        where = " AND ".join(f"{col} IS ?" for col in DEDUP_COLUMNS)
+        for pos, row in enumerate(rows):
+            month = (row.get("event_day") or "")[:7]
+            if month not in months:
+                continue
+            part = f"events_{month.replace('-', '_')}"
+            key = [row.get(col) for col in DEDUP_COLUMNS]
+            # A missing entity is stored as '' since migration 19; older archived rows hold NULL.
+            legacy = [
+                None if col == "entity" and value == "" else value for col, value in zip(DEDUP_COLUMNS, key)
+            ]
+            for params in (key, legacy) if legacy != key else (key,):
+                if conn.execute(f"SELECT 1 FROM {part} WHERE {where} LIMIT 1", params).fetchone():
+                    found.add(pos)
+                    break
+    finally:
+        conn.close()
+    return found
+
+
+def compact(retain_days: int = config.HOT_RETENTION_DAYS, vacuum: bool = False) -> Dict[str, int]:
+    """Move raw rows older than ``retain_days`` into monthly archive partitions.
+
+    Returns the number of rows moved per table. ``vacuum=True`` also shrinks
+    the hot file afterwards (slow on large databases, so opt-in). The copy
+    and delete share the caller's transaction on the hot connection, but a
+    commit spanning an attached WAL database is not atomic across the two
+    files: a crash mid-commit can leave rows in both, which
+    ``history_connection`` readers may see twice.
+    """
+    cutoff = int(time.time()) - retain_days * 86400
+    moved: Dict[str, int] = {}
+    with get_connection() as conn:
+        stale = {
+            table: [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT DISTINCT substr(event_day, 1, 7) FROM {table} WHERE ts_epoch < ?",
+                    (cutoff,),
+                )
+                if row[0]
+            ]
+            for table in PARTITIONED_TABLES
+        }
+    if not any(stale.values()):
+        return {table: 0 for table in PARTITIONED_TABLES}
+    try:
+        with get_connection() as conn:
+            _attach(conn, create=True)
+            for table, months in stale.items():
+                moved[table] = sum(_move_month(conn, table, month, cutoff) for month in months)
+    finally:
+        # After the outermost block has committed or rolled back.
+        _detach(conn)
+    if vacuum and any(moved.values()):
+        with get_connection() as conn:
+            conn.execute("VACUUM")
+    return moved
+
+
+@contextmanager
+def history_connection() -> Iterator[sqlite3.Connection]:
+    """Connection with temp ``<table>_history`` views spanning hot and archived rows."""
+    with get_connection() as conn:
+        attached = _attach(conn, create=False)
+        try:
+            for table in PARTITIONED_TABLES:
+                hot_cols = list(_columns(conn, table))
+                selects = [f"SELECT {', '.join(hot_cols)} FROM main.{table}"]
+                for part in partitions(conn, table) if attached else []:
+                    part_cols = _columns(conn, part, ARCHIVE_SCHEMA)
+                    exprs = [name if name in part_cols else f"NULL AS {name}" for name in hot_cols]
+                    selects.append(f"SELECT {', '.join(exprs)} FROM {ARCHIVE_SCHEMA}.{part}")
+                conn.execute(f"DROP VIEW IF EXISTS temp.{table}_history")
+                conn.execute(f"CREATE TEMP VIEW {table}_history AS {' UNION ALL '.join(selects)}")
+            yield conn
+        finally:
+            for table in PARTITIONED_TABLES:
+                conn.execute(f"DROP VIEW IF EXISTS temp.{table}_history")
+            if attached:
+                _detach(conn)
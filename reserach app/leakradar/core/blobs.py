@@ -0,0 +1,93 @@
+"""Content-addressed, compressed payload store.
+
+Event rows carry ``payload_ref`` (sha1 of the canonical JSON text) and the
+body lives once in ``payloads``. zstd is used when ``zstandard`` is
+installed, zlib otherwise; the codec is stored per blob so either can read
+the other's rows as long as the library is present.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+try:  # optional, ~2x faster and smaller than zlib on JSON
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+CODEC = "zstd" if zstandard is not None else "zlib"
+_LOOKUP_CHUNK = 500
+
+
+def payload_ref(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _encode(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    if CODEC == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(raw)
+    return zlib.compress(raw, 6)
+
+
+def _decode(codec: str, body: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("payload stored with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+    return zlib.decompress(body).decode("utf-8")
+
+
+def put_many(conn: sqlite3.Connection, texts: Dict[str, str]) -> int:
+    """Store ``{ref: text}`` bodies that are not stored yet; returns how many were new."""
+    if not texts:
+        return 0
+    refs = list(texts)
+    existing = set()
+    for start in range(0, len(refs), _LOOKUP_CHUNK):
+        chunk = refs[start : start + _LOOKUP_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        existing.update(
+            row[0] for row in conn.execute(f"SELECT ref FROM payloads WHERE ref IN ({placeholders})", chunk)
+        )
+    new = [(ref, CODEC, len(texts[ref]), _encode(texts[ref])) for ref in refs if ref not in existing]
+    conn.executemany(
+        "INSERT OR IGNORE INTO payloads (ref, codec, size, body) VALUES (?, ?, ?, ?)", new
+    )
+    return len(new)
+
+
+def put(conn: sqlite3.Connection, text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    ref = payload_ref(text)
+    put_many(conn, {ref: text})
+    return ref
+
+
+def get_many(conn: sqlite3.Connection, refs: Iterable[str]) -> Dict[str, str]:
+    wanted: List[str] = sorted({ref for ref in refs if ref})
+    found: Dict[str, str] = {}
+    for start in range(0, len(wanted), _LOOKUP_CHUNK):
+        chunk = wanted[start : start + _LOOKUP_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT ref, codec, body FROM payloads WHERE ref IN ({placeholders})", chunk
+        ):
+            found[row[0]] = _decode(row[1], row[2])
+    return found
+
+
+def get(conn: sqlite3.Connection, ref: Optional[str]) -> Optional[str]:
+    if not ref:
+        return None
+    return get_many(conn, [ref]).get(ref)
+
+
+def load_json(conn: sqlite3.Connection, ref: Optional[str]) -> Any:
+    text = get(conn, ref)
+    return json.loads(text) if text else None
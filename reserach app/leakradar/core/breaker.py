@@ -0,0 +1,102 @@
+"""Per-host circuit breakers for ``core.http_client``.
+
+A host that fails ``BREAKER_FAILURE_THRESHOLD`` requests in a row (connection
+errors, timeouts, 5xx after retries) is opened for ``BREAKER_COOLDOWN_SECS``:
+requests to it raise ``CircuitOpen`` without touching the network. After the
+cool-down a single probe is let through, holding a short lease on the breaker
+so concurrent callers keep being refused; success closes the breaker, a
+failure opens it again. State lives in ``circuit_breakers`` so a host that was
+down at the end of one run is still skipped by the next.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import requests
+
+from . import config
+from .db import get_connection
+
+
+# How long an admitted probe holds the half-open breaker before another
+# caller may probe (covers a probe whose process died mid-request).
+PROBE_LEASE_SECS = 60.0
+
+
+class CircuitOpen(requests.RequestException):
+    """Raised instead of calling a host whose breaker is open."""
+
+
+def allow(host: str) -> int:
+    """Raise ``CircuitOpen`` if ``host`` is cooling down; returns its failure count."""
+    with get_connection(readonly=True) as conn:
+        row = conn.execute(
+            "SELECT failures, opened_until FROM circuit_breakers WHERE host = ?", (host,)
+        ).fetchone()
+    if row is None:
+        return 0
+    failures, opened_until = row
+    if not opened_until:
+        return failures
+    now = datetime.now(timezone.utc)
+    if datetime.fromisoformat(opened_until) > now:
+        raise CircuitOpen(f"circuit open for {host} until {opened_until}")
+    # Half-open: whoever moves opened_until forward first is the probe.
+    lease = (now + timedelta(seconds=PROBE_LEASE_SECS)).isoformat()
+    with get_connection() as conn:
+        won = conn.execute(
+            "UPDATE circuit_breakers SET opened_until = ? WHERE host = ? AND opened_until = ?",
+            (lease, host, opened_until),
+        ).rowcount
+    if not won:
+        raise CircuitOpen(f"circuit half-open for {host}; another request is probing it")
+    return failures
+
+
+def record_success(host: str, failures: int) -> None:
+    if not failures:
+        return
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE circuit_breakers SET failures = 0, opened_until = NULL, updated_at = ? WHERE host = ?",
+            (datetime.now(timezone.utc).isoformat(), host),
+        )
+
+
+def record_failure(host: str, error: str) -> None:
+    now = datetime.now(timezone.utc)
+    opened_until = (now + timedelta(seconds=config.BREAKER_COOLDOWN_SECS)).isoformat()
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO circuit_breakers (host, failures, opened_until, last_error, updated_at)
+            VALUES (?, 1, CASE WHEN 1 >= ? THEN ? END, ?, ?)
+            ON CONFLICT(host) DO UPDATE SET
+                failures = circuit_breakers.failures + 1,
+                opened_until = CASE WHEN circuit_breakers.failures + 1 >= ? THEN ? END,
+                last_error = excluded.last_error,
+                updated_at = excluded.updated_at
+            """,
+            (
+                host,
+                config.BREAKER_FAILURE_THRESHOLD,
+                opened_until,
+                error[:500],
+                now.isoformat(),
+                config.BREAKER_FAILURE_THRESHOLD,
+                opened_until,
+            ),
+        )
+
+
+def open_hosts() -> List[Dict]:
+    """Hosts currently being skipped, for run summaries."""
+    now = datetime.now(timezone.utc).isoformat()
+    with get_connection(readonly=True) as conn:
+        rows = conn.execute(
+            "SELECT host, failures, opened_until, last_error FROM circuit_breakers WHERE opened_until > ?",
+            (now,),
+        ).fetchall()
+    return [dict(row) for row in rows]
@@ -0,0 +1,71 @@
+"""Day-scoped response cache for paid or rate-limited APIs.
+
+Entries are keyed by (provider, key, UTC day) and expire after a TTL, so
+an intraday rerun reuses the morning's LLM/search answers while the next
+day always asks again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from .db import get_connection
+
+
+def cache_key(*parts: Any) -> str:
+    blob = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def _day(now: datetime) -> str:
+    return now.date().isoformat()
+
+
+def get(provider: str, key: str, now: Optional[datetime] = None) -> Optional[Any]:
+    now = now or datetime.now(timezone.utc)
+    with get_connection(readonly=True) as conn:
+        row = conn.execute(
+            "SELECT body FROM response_cache WHERE provider = ? AND key = ? AND day = ? AND expires_at > ?",
+            (provider, key, _day(now), now.isoformat()),
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def put(provider: str, key: str, value: Any, ttl_secs: int, now: Optional[datetime] = None) -> None:
+    now = now or datetime.now(timezone.utc)
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO response_cache (provider, key, day, body, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                provider,
+                key,
+                _day(now),
+                json.dumps(value),
+                now.isoformat(),
+                (now + timedelta(seconds=ttl_secs)).isoformat(),
+            ),
+        )
+
+
+def cached(provider: str, key: str, ttl_secs: int, fetch: Callable[[], Optional[Any]]) -> Optional[Any]:
+    """Return today's cached value or call ``fetch``; ``None`` results are not cached."""
+    value = get(provider, key)
+    if value is not None:
+        return value
+    value = fetch()
+    if value is not None:
+        put(provider, key, value, ttl_secs)
+    return value
+
+
+def purge(now: Optional[datetime] = None) -> int:
+    """Drop expired entries; returns how many were removed."""
+    now = now or datetime.now(timezone.utc)
+    with get_connection() as conn:
+        return conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now.isoformat(),)).rowcount
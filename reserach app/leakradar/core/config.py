@@ -18,13 +18,19 @@ DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 DB_PATH = os.getenv("DB_PATH", str(DATA_DIR / "leakradar.sqlite"))
+DB_PROFILE = os.getenv("DB_PROFILE", "default")
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", str(DATA_DIR / "archive.sqlite"))
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", str(DATA_DIR / "snapshots"))
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")
+SERPAPI_DAILY_QUOTA = int(os.getenv("SERPAPI_DAILY_QUOTA", "50"))
 ALPHAVANTAGE_KEY = os.getenv("ALPHAVANTAGE_KEY")
+# Free tier: 25 requests/day (5/minute is paced by HOST_RATE_LIMITS).
+ALPHAVANTAGE_DAILY_QUOTA = int(os.getenv("ALPHAVANTAGE_DAILY_QUOTA", "25"))
 
 
 def _env_bool(name: str, default: bool = False) -> bool:
@@ -37,6 +43,26 @@ def _env_bool(name: str, default: bool = False) -> bool:
 USE_PERPLEXITY = _env_bool("USE_PERPLEXITY", True)
 USE_YFINANCE = _env_bool("USE_YFINANCE", True)
 
+# Concurrent fetch workers for the GitHub collector, and the cap on in-flight
+# requests to any single host shared by every collector thread.
+GITHUB_CONCURRENCY = int(os.getenv("GITHUB_CONCURRENCY", "8"))
+# With a token, repos are read through one aliased GraphQL query per batch.
+GITHUB_GRAPHQL = _env_bool("GITHUB_GRAPHQL", True)
+GITHUB_GRAPHQL_BATCH = int(os.getenv("GITHUB_GRAPHQL_BATCH", "50"))
+HTTP_HOST_CONCURRENCY = int(os.getenv("HTTP_HOST_CONCURRENCY", "8"))
+# Same-day reruns reuse narrative/search API answers younger than this.
+RESPONSE_CACHE_TTL_SECS = int(os.getenv("RESPONSE_CACHE_TTL_SECS", str(6 * 3600)))
+# Wall-clock budgets: each collector, and all collectors together, per run.
+COLLECTOR_BUDGET_SECS = float(os.getenv("COLLECTOR_BUDGET_SECS", "300"))
+RUN_BUDGET_SECS = float(os.getenv("RUN_BUDGET_SECS", "1800"))
+# A host that fails this many requests in a row is skipped for the cool-down.
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_COOLDOWN_SECS = float(os.getenv("BREAKER_COOLDOWN_SECS", "900"))
+# Optional USAspending/NIH-style bulk export (.json/.ndjson/.csv, optionally .gz)
+# streamed by the grants collector instead of the bundled sample.
+GRANTS_BULK_PATH = os.getenv("GRANTS_BULK_PATH")
+GRANTS_BULK_CHUNK = int(os.getenv("GRANTS_BULK_CHUNK", "5000"))
+
 SECTORS: List[str] = ["ai", "biotech", "climate", "creator"]
 METRIC_WEIGHTS: Dict[str, float] = {
     "new_papers_7d": 0.25,
@@ -47,6 +73,8 @@ METRIC_WEIGHTS: Dict[str, float] = {
 }
 
 Z_SCORE_WINDOW_DAYS = 90
+# Raw events older than this move to monthly tables in ARCHIVE_PATH (z window + 90d grants lookback).
+HOT_RETENTION_DAYS = Z_SCORE_WINDOW_DAYS + 90
 ALERT_SCORE = 2.0
 ANOMALY_Z = 2.0
 SEVERE_Z = 3.0
@@ -60,6 +88,12 @@ NARRATIVE_QUERIES = {
     "creator": ["creator economy", "UGC", "OnlyFans"],
 }
 
+# ClinicalTrials.gov condition queries per sector; recruiting trials are
+# counted once per sector across all of its conditions.
+TRIAL_CONDITIONS: Dict[str, List[str]] = {
+    "biotech": ["oncology"],
+}
+
 TICKER_DEFAULTS = BASE_DIR / "tracked" / "tickers.csv"
 NEWS_SOURCES_PATH = BASE_DIR / "tracked" / "news_sources.json"
 
@@ -90,6 +124,18 @@ def hash_config() -> str:
 class RateLimitPolicy:
     polite_sleep_secs: float = 1.0
     retries: int = 3
+    backoff_max_secs: float = 30.0
 
 
 POLICY = RateLimitPolicy()
+
+# Sustained requests/second per host for core.http_client; unlisted hosts get
+# one request per POLICY.polite_sleep_secs.
+HOST_RATE_LIMITS: Dict[str, float] = {
+    "api.github.com": 10.0,
+    "export.arxiv.org": 1 / 3,
+    "clinicaltrials.gov": 5.0,
+    "newsapi.org": 2.0,
+    "serpapi.com": 2.0,
+    "www.alphavantage.co": 5 / 60,
+}
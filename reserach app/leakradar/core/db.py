@@ -2,32 +2,126 @@
 
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
 from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .config import DB_PATH
+from .config import DB_PATH, DB_PROFILE
 
 
-def _connect() -> sqlite3.Connection:
+@dataclass(frozen=True)
+class PerfProfile:
+    """Per-connection PRAGMAs applied when a pooled connection is opened."""
+
+    synchronous: str = "NORMAL"
+    cache_size: int = -64_000  # negative = KiB, i.e. ~64 MB page cache
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout: int = 5_000  # ms
+
+
+PROFILES: Dict[str, PerfProfile] = {
+    "default": PerfProfile(),
+    # Fastest ingest; a crash can lose the last transactions but not corrupt the file.
+    "bulk": PerfProfile(synchronous="OFF", cache_size=-256_000, mmap_size=1024 * 1024 * 1024),
+    "safe": PerfProfile(synchronous="FULL", mmap_size=0, temp_store="DEFAULT"),
+}
+
+_PROFILE: PerfProfile = PROFILES.get(DB_PROFILE, PROFILES["default"])
+_LOCAL = threading.local()
+
+
+@dataclass
+class _Pooled:
+    conn: sqlite3.Connection
+    pid: int
+    depth: int = 0
+
+
+def _apply_profile(conn: sqlite3.Connection, profile: PerfProfile) -> None:
+    conn.execute(f"PRAGMA busy_timeout={int(profile.busy_timeout)};")
+    conn.execute(f"PRAGMA synchronous={profile.synchronous};")
+    conn.execute(f"PRAGMA cache_size={int(profile.cache_size)};")
+    conn.execute(f"PRAGMA mmap_size={int(profile.mmap_size)};")
+    conn.execute(f"PRAGMA temp_store={profile.temp_store};")
+
+
+def _connect(readonly: bool = False) -> sqlite3.Connection:
     path = Path(DB_PATH)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(path)
+    if readonly:
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only=ON;")
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA foreign_keys=ON;")
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA foreign_keys=ON;")
+    _apply_profile(conn, _PROFILE)
     return conn
 
 
+def _pool() -> Dict[Tuple[str, bool], _Pooled]:
+    pool = getattr(_LOCAL, "pool", None)
+    if pool is None:
+        pool = _LOCAL.pool = {}
+    return pool
+
+
+def _checkout(readonly: bool) -> _Pooled:
+    pool = _pool()
+    key = (str(DB_PATH), readonly)
+    pooled = pool.get(key)
+    if pooled is not None and pooled.pid != os.getpid():
+        # Inherited across fork: never reuse the parent's handle.
+        pooled = None
+    if pooled is None:
+        pooled = pool[key] = _Pooled(conn=_connect(readonly), pid=os.getpid())
+    return pooled
+
+
 @contextmanager
-def get_connection() -> Iterator[sqlite3.Connection]:
-    conn = _connect()
+def get_connection(readonly: bool = False) -> Iterator[sqlite3.Connection]:
+    """Yield this thread's pooled connection for ``DB_PATH``.
+
+    Nested ``with`` blocks share one connection; only the outermost block
+    commits (or rolls back on error). ``readonly=True`` opens a separate
+    ``mode=ro`` connection for analytic readers.
+    """
+    pooled = _checkout(readonly)
+    pooled.depth += 1
     try:
-        yield conn
-        conn.commit()
-    finally:
-        conn.close()
+        yield pooled.conn
+    except BaseException:
+        pooled.depth -= 1
+        if pooled.depth == 0:
+            pooled.conn.rollback()
+        raise
+    pooled.depth -= 1
+    if pooled.depth == 0:
+        pooled.conn.commit()
+
+
+def close_connections() -> None:
+    """Close every pooled connection owned by the current thread."""
+    pool = _pool()
+    for pooled in pool.values():
+        if pooled.pid == os.getpid():
+            pooled.conn.close()
+    pool.clear()
+
+
+def set_profile(profile: PerfProfile | str) -> PerfProfile:
+    """Switch the performance profile; reopens this thread's connections lazily."""
+    global _PROFILE
+    _PROFILE = PROFILES[profile] if isinstance(profile, str) else profile
+    close_connections()
+    return _PROFILE
 
 
 def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
@@ -43,212 +137,675 @@ def _create_table(conn: sqlite3.Connection, name: str, columns: Iterable[str]) -
     conn.execute(f"CREATE TABLE IF NOT EXISTS {name} ({ddl});")
 
 
-def init_db() -> None:
-    with get_connection() as conn:
-        _create_table(
-            conn,
-            "events",
-            [
-                "id INTEGER PRIMARY KEY",
-                "ts TEXT",
-                "source TEXT",
-                "sector TEXT",
-                "entity TEXT",
-                "metric TEXT",
-                "value REAL",
-                "payload TEXT",
-                "source_url TEXT",
-                "fetched_at TEXT",
-                "parse_version TEXT",
-                "checksum TEXT",
-                "license TEXT",
-                "confidence REAL",
-            ],
-        )
-        _ensure_columns(
-            conn,
-            "events",
-            {
-                "source_url": "TEXT",
-                "fetched_at": "TEXT",
-                "parse_version": "TEXT",
-                "checksum": "TEXT",
-                "license": "TEXT",
-                "confidence": "REAL",
-            },
-        )
+def _create_index(conn: sqlite3.Connection, name: str, table: str, columns: Iterable[str]) -> None:
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)});")
 
-        _create_table(
-            conn,
-            "events_quarantine",
-            [
-                "id INTEGER PRIMARY KEY",
-                "ts TEXT",
-                "source TEXT",
-                "sector TEXT",
-                "entity TEXT",
-                "metric TEXT",
-                "value REAL",
-                "payload TEXT",
-                "source_url TEXT",
-                "fetched_at TEXT",
-                "parse_version TEXT",
-                "checksum TEXT",
-                "license TEXT",
-                "confidence REAL",
-                "error TEXT",
-            ],
-        )
-        _ensure_columns(
-            conn,
-            "events_quarantine",
-            {
-                "source_url": "TEXT",
-                "fetched_at": "TEXT",
-                "parse_version": "TEXT",
-                "checksum": "TEXT",
-                "license": "TEXT",
-                "confidence": "REAL",
-                "error": "TEXT",
-            },
-        )
 
-        _create_table(
-            conn,
-            "features",
-            [
-                "ts TEXT",
-                "sector TEXT",
-                "new_papers_7d REAL",
-                "new_papers_30d REAL",
-                "recruiting_trials_30d REAL",
-                "jobs_keyword_count REAL",
-                "github_stars_30d REAL",
-                "grants_90d REAL",
-                "consensus_disagreement REAL",
-            ],
+def _baseline_schema(conn: sqlite3.Connection) -> None:
+    _create_table(
+        conn,
+        "events",
+        [
+            "id INTEGER PRIMARY KEY",
+            "ts TEXT",
+            "source TEXT",
+            "sector TEXT",
+            "entity TEXT",
+            "metric TEXT",
+            "value REAL",
+            "payload TEXT",
+            "source_url TEXT",
+            "fetched_at TEXT",
+            "parse_version TEXT",
+            "checksum TEXT",
+            "license TEXT",
+            "confidence REAL",
+            "event_day TEXT",
+        ],
+    )
+    _ensure_columns(
+        conn,
+        "events",
+        {
+            "source_url": "TEXT",
+            "fetched_at": "TEXT",
+            "parse_version": "TEXT",
+            "checksum": "TEXT",
+            "license": "TEXT",
+            "confidence": "REAL",
+            "event_day": "TEXT",
+        },
+    )
+
+    _create_table(
+        conn,
+        "events_quarantine",
+        [
+            "id INTEGER PRIMARY KEY",
+            "ts TEXT",
+            "source TEXT",
+            "sector TEXT",
+            "entity TEXT",
+            "metric TEXT",
+            "value REAL",
+            "payload TEXT",
+            "source_url TEXT",
+            "fetched_at TEXT",
+            "parse_version TEXT",
+            "checksum TEXT",
+            "license TEXT",
+            "confidence REAL",
+            "error TEXT",
+        ],
+    )
+    _ensure_columns(
+        conn,
+        "events_quarantine",
+        {
+            "source_url": "TEXT",
+            "fetched_at": "TEXT",
+            "parse_version": "TEXT",
+            "checksum": "TEXT",
+            "license": "TEXT",
+            "confidence": "REAL",
+            "error": "TEXT",
+        },
+    )
+
+    _create_table(
+        conn,
+        "features",
+        [
+            "ts TEXT",
+            "sector TEXT",
+            "new_papers_7d REAL",
+            "new_papers_30d REAL",
+            "recruiting_trials_30d REAL",
+            "jobs_keyword_count REAL",
+            "github_stars_30d REAL",
+            "grants_90d REAL",
+            "consensus_disagreement REAL",
+        ],
+    )
+
+    _create_table(
+        conn,
+        "scores",
+        [
+            "ts TEXT",
+            "sector TEXT",
+            "score REAL",
+            "components TEXT",
+            "mean_confidence REAL",
+        ],
+    )
+    _ensure_columns(conn, "scores", {"mean_confidence": "REAL"})
+
+    _create_table(
+        conn,
+        "narrative_events",
+        [
+            "id INTEGER PRIMARY KEY",
+            "ts TEXT",
+            "source TEXT",
+            "sector TEXT",
+            "metric TEXT",
+            "value REAL",
+            "payload TEXT",
+            "source_url TEXT",
+            "confidence REAL",
+        ],
+    )
+
+    _create_table(
+        conn,
+        "market_events",
+        [
+            "id INTEGER PRIMARY KEY",
+            "ts TEXT",
+            "sector TEXT",
+            "symbol TEXT",
+            "kind TEXT",
+            "metric TEXT",
+            "value REAL",
+            "payload TEXT",
+            "confidence REAL",
+        ],
+    )
+
+    _create_table(
+        conn,
+        "comparisons",
+        [
+            "ts TEXT",
+            "sector TEXT",
+            "hype_index REAL",
+            "reality_index REAL",
+            "gap REAL",
+        ],
+    )
+
+    _create_table(
+        conn,
+        "briefs",
+        [
+            "ts TEXT",
+            "sector TEXT",
+            "title TEXT",
+            "summary TEXT",
+            "sources TEXT",
+        ],
+    )
+
+    _create_table(
+        conn,
+        "runs",
+        [
+            "run_id TEXT PRIMARY KEY",
+            "started_at TEXT",
+            "finished_at TEXT",
+            "code_sha TEXT",
+            "config_sha TEXT",
+            "status TEXT",
+        ],
+    )
+
+    _create_table(
+        conn,
+        "anomalies",
+        [
+            "ts TEXT",
+            "run_id TEXT",
+            "sector TEXT",
+            "metric TEXT",
+            "zscore REAL",
+            "confidence REAL",
+            "verified_status TEXT",
+        ],
+    )
+    _ensure_columns(conn, "anomalies", {"ts": "TEXT"})
+
+    _create_table(
+        conn,
+        "entities",
+        [
+            "id INTEGER PRIMARY KEY",
+            "kind TEXT",
+            "canonical TEXT",
+            "aliases TEXT",
+        ],
+    )
+
+    _create_table(
+        conn,
+        "notes",
+        [
+            "ts TEXT",
+            "sector TEXT",
+            "text TEXT",
+        ],
+    )
+
+
+def _events_dedup(conn: sqlite3.Connection) -> None:
+    """Backfill ``event_day``, drop exact duplicates and add the unique dedup index."""
+    conn.execute("UPDATE events SET event_day = substr(ts, 1, 10) WHERE event_day IS NULL")
+    conn.execute(
+        """
+        DELETE FROM events WHERE id NOT IN (
+            SELECT MIN(id) FROM events
+            GROUP BY source, entity, metric, checksum, event_day
         )
+        """
+    )
+    conn.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_events_dedup
+        ON events (source, entity, metric, checksum, event_day)
+        """
+    )
+
+
+def _secondary_indexes(conn: sqlite3.Connection) -> None:
+    """Indexes for the hot read paths (health, feeds, comparisons, anomalies)."""
+    # collector_health: GROUP BY source, MAX(fetched_at) answered from the index alone.
+    _create_index(conn, "ix_events_source_fetched", "events", ["source", "fetched_at"])
+    # Streamlit leak feed: ORDER BY ts DESC LIMIT n.
+    _create_index(conn, "ix_events_ts", "events", ["ts"])
+    _create_index(conn, "ix_quarantine_error", "events_quarantine", ["error"])
+    _create_index(conn, "ix_comparisons_ts", "comparisons", ["ts", "sector"])
+    _create_index(conn, "ix_anomalies_run", "anomalies", ["run_id"])
+    _create_index(conn, "ix_anomalies_ts", "anomalies", ["ts"])
+
+
+_EPOCH_BATCH = 5000
+
+
+def _normalize_epochs(conn: sqlite3.Connection, table: str, rollup: bool = False) -> None:
+    """Fill ``ts_epoch`` and set ``event_day`` to its UTC day, parsing ``ts`` in Python.
+
+    SQLite's ``strftime('%s')`` only understands a subset of ISO 8601, and the
+    old ``substr(ts, 1, 10)`` day is the writer's local date; this uses the same
+    parser as ingest. An ``events`` row whose corrected day collides with an
+    existing row on the dedup key is a duplicate and is dropped. With
+    ``rollup`` the moved rows are shifted between ``events_daily`` days too.
+    """
+    from .validate import epoch_day, ts_epoch
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"""
+            SELECT id, ts, ts_epoch, event_day FROM {table}
+            WHERE id > ? AND (
+                ts_epoch IS NULL OR event_day IS NULL OR event_day != date(ts_epoch, 'unixepoch')
+            )
+            ORDER BY id LIMIT {_EPOCH_BATCH}
+            """,
+            (last_id,),
+        ).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        for row in rows:
+            epoch = row["ts_epoch"] if row["ts_epoch"] is not None else ts_epoch(row["ts"] or "")
+            if epoch is None:
+                continue
+            day = epoch_day(epoch)
+            if rollup and day != row["event_day"]:
+                _shift_rollup(conn, row["id"], row["event_day"], day)
+            try:
+                conn.execute(
+                    f"UPDATE {table} SET ts_epoch = ?, event_day = ? WHERE id = ?", (epoch, day, row["id"])
+                )
+            except sqlite3.IntegrityError:
+                if rollup:
+                    _shift_rollup(conn, row["id"], day, None)
+                conn.execute(f"DELETE FROM {table} WHERE id = ?", (row["id"],))
+
 
-        _create_table(
-            conn,
-            "scores",
-            [
-                "ts TEXT",
-                "sector TEXT",
-                "score REAL",
-                "components TEXT",
-                "mean_confidence REAL",
-            ],
+def _shift_rollup(
+    conn: sqlite3.Connection, event_id: int, old_day: Optional[str], new_day: Optional[str]
+) -> None:
+    """Move one event's contribution in ``events_daily`` from ``old_day`` to ``new_day``."""
+    event = conn.execute(
+        "SELECT sector, metric, source, COALESCE(value, 0), confidence FROM events WHERE id = ?", (event_id,)
+    ).fetchone()
+    sector, metric, source, value, confidence = tuple(event)
+    has_conf = int(confidence is not None)
+    confidence = confidence or 0.0
+    if old_day is not None:
+        conn.execute(
+            """
+            UPDATE events_daily SET
+                value_sum = value_sum - ?, value_count = value_count - 1,
+                confidence_sum = confidence_sum - ?, confidence_count = confidence_count - ?
+            WHERE day = ? AND sector IS ? AND metric IS ? AND source IS ?
+            """,
+            (value, confidence, has_conf, old_day, sector, metric, source),
         )
-        _ensure_columns(conn, "scores", {"mean_confidence": "REAL"})
-
-        _create_table(
-            conn,
-            "narrative_events",
-            [
-                "id INTEGER PRIMARY KEY",
-                "ts TEXT",
-                "source TEXT",
-                "sector TEXT",
-                "metric TEXT",
-                "value REAL",
-                "payload TEXT",
-                "source_url TEXT",
-                "confidence REAL",
-            ],
+        conn.execute("DELETE FROM events_daily WHERE value_count <= 0")
+    if new_day is not None:
+        conn.execute(
+            """
+            INSERT INTO events_daily (
+                day, sector, metric, source, value_sum, value_count, confidence_sum, confidence_count
+            ) VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT (day, sector, metric, source) DO UPDATE SET
+                value_sum = value_sum + excluded.value_sum,
+                value_count = value_count + 1,
+                confidence_sum = confidence_sum + excluded.confidence_sum,
+                confidence_count = confidence_count + excluded.confidence_count
+            """,
+            (new_day, sector, metric, source, value, confidence, has_conf),
         )
 
-        _create_table(
-            conn,
-            "market_events",
-            [
-                "id INTEGER PRIMARY KEY",
-                "ts TEXT",
-                "sector TEXT",
-                "symbol TEXT",
-                "kind TEXT",
-                "metric TEXT",
-                "value REAL",
-                "payload TEXT",
-                "confidence REAL",
-            ],
-        )
 
-        _create_table(
-            conn,
-            "comparisons",
-            [
-                "ts TEXT",
-                "sector TEXT",
-                "hype_index REAL",
-                "reality_index REAL",
-                "gap REAL",
-            ],
-        )
+def _epoch_timestamps(conn: sqlite3.Connection) -> None:
+    """Integer epoch + UTC day columns on the event tables, backfilled from ``ts``."""
+    _ensure_columns(conn, "events", {"ts_epoch": "INTEGER"})
+    for table in ("narrative_events", "market_events"):
+        _ensure_columns(conn, table, {"ts_epoch": "INTEGER", "event_day": "TEXT"})
+    for table in ("events", "narrative_events", "market_events"):
+        _normalize_epochs(conn, table)
+        _create_index(conn, f"ix_{table}_epoch", table, ["ts_epoch"])
 
-        _create_table(
-            conn,
-            "briefs",
-            [
-                "ts TEXT",
-                "sector TEXT",
-                "title TEXT",
-                "summary TEXT",
-                "sources TEXT",
-            ],
-        )
 
-        _create_table(
-            conn,
-            "runs",
-            [
-                "run_id TEXT PRIMARY KEY",
-                "started_at TEXT",
-                "finished_at TEXT",
-                "code_sha TEXT",
-                "config_sha TEXT",
-                "status TEXT",
-            ],
-        )
+def _epoch_repair(conn: sqlite3.Connection) -> None:
+    """Redo the ``epoch_timestamps`` backfill for databases migrated with SQL parsing."""
+    for table in ("events", "narrative_events", "market_events"):
+        _normalize_epochs(conn, table, rollup=table == "events")
 
-        _create_table(
-            conn,
-            "anomalies",
-            [
-                "ts TEXT",
-                "run_id TEXT",
-                "sector TEXT",
-                "metric TEXT",
-                "zscore REAL",
-                "confidence REAL",
-                "verified_status TEXT",
-            ],
-        )
-        _ensure_columns(conn, "anomalies", {"ts": "TEXT"})
-
-        _create_table(
-            conn,
-            "entities",
-            [
-                "id INTEGER PRIMARY KEY",
-                "kind TEXT",
-                "canonical TEXT",
-                "aliases TEXT",
-            ],
+
+ROLLUP_SELECT = """
+    SELECT event_day, sector, metric, source, SUM(value), COUNT(*), SUM(confidence), COUNT(confidence)
+    FROM events
+    WHERE event_day IS NOT NULL AND id > ?
+    GROUP BY event_day, sector, metric, source
+"""
+
+ROLLUP_UPSERT = f"""
+    INSERT INTO events_daily (
+        day, sector, metric, source, value_sum, value_count, confidence_sum, confidence_count
+    )
+    {ROLLUP_SELECT}
+    ON CONFLICT (day, sector, metric, source) DO UPDATE SET
+        value_sum = value_sum + excluded.value_sum,
+        value_count = value_count + excluded.value_count,
+        confidence_sum = confidence_sum + excluded.confidence_sum,
+        confidence_count = confidence_count + excluded.confidence_count
+"""
+
+
+def _events_daily(conn: sqlite3.Connection) -> None:
+    """Per day/sector/metric/source rollup kept current by the ingest paths."""
+    _create_table(
+        conn,
+        "events_daily",
+        [
+            "day TEXT NOT NULL",
+            "sector TEXT",
+            "metric TEXT",
+            "source TEXT",
+            "value_sum REAL",
+            "value_count INTEGER",
+            "confidence_sum REAL",
+            "confidence_count INTEGER",
+            "PRIMARY KEY (day, sector, metric, source)",
+        ],
+    )
+    conn.execute("DELETE FROM events_daily")
+    conn.execute(ROLLUP_UPSERT, (0,))
+
+
+def _payload_store(conn: sqlite3.Connection) -> None:
+    """Move inline event/market payloads into the compressed ``payloads`` table."""
+    from . import blobs
+
+    _create_table(
+        conn,
+        "payloads",
+        ["ref TEXT PRIMARY KEY", "codec TEXT", "size INTEGER", "body BLOB"],
+    )
+    for table in ("events", "market_events"):
+        _ensure_columns(conn, table, {"payload_ref": "TEXT"})
+        while True:
+            rows = conn.execute(
+                f"SELECT id, payload FROM {table} WHERE payload IS NOT NULL LIMIT 5000"
+            ).fetchall()
+            if not rows:
+                break
+            texts = {blobs.payload_ref(row["payload"]): row["payload"] for row in rows}
+            blobs.put_many(conn, texts)
+            conn.executemany(
+                f"UPDATE {table} SET payload_ref = ?, payload = NULL WHERE id = ?",
+                [(blobs.payload_ref(row["payload"]), row["id"]) for row in rows],
+            )
+
+
+def _http_cache(conn: sqlite3.Connection) -> None:
+    """Validators and parsed bodies for conditional GETs (see ``core/http_cache.py``)."""
+    _create_table(
+        conn,
+        "http_cache",
+        [
+            "url TEXT PRIMARY KEY",
+            "etag TEXT",
+            "last_modified TEXT",
+            "status INTEGER",
+            "parsed TEXT",
+            "fetched_at TEXT",
+            "validated_at TEXT",
+        ],
+    )
+
+
+def _ats_postings(conn: sqlite3.Connection) -> None:
+    """Posting ids seen per Greenhouse/Lever board (see ``collectors/ats.py``)."""
+    _create_table(
+        conn,
+        "ats_postings",
+        [
+            "board TEXT NOT NULL",
+            "posting_id TEXT NOT NULL",
+            "title TEXT",
+            "first_seen TEXT",
+            "last_seen TEXT",
+            "open INTEGER DEFAULT 1",
+            "PRIMARY KEY (board, posting_id)",
+        ],
+    )
+
+
+def _market_bars(conn: sqlite3.Connection) -> None:
+    """Daily close/volume per symbol, filled incrementally by ``collectors/markets.py``."""
+    _create_table(
+        conn,
+        "market_bars",
+        [
+            "symbol TEXT NOT NULL",
+            "date TEXT NOT NULL",
+            "close REAL",
+            "volume REAL",
+            "PRIMARY KEY (symbol, date)",
+        ],
+    )
+
+
+def _api_quota(conn: sqlite3.Connection) -> None:
+    """Requests spent per provider and UTC day (see ``core/quota.py``)."""
+    _create_table(
+        conn,
+        "api_quota",
+        ["provider TEXT NOT NULL", "day TEXT NOT NULL", "used INTEGER DEFAULT 0", "PRIMARY KEY (provider, day)"],
+    )
+
+
+def _arxiv_papers(conn: sqlite3.Connection) -> None:
+    """Harvested arXiv ids; one row per paper however many categories list it."""
+    _create_table(
+        conn,
+        "arxiv_papers",
+        [
+            "arxiv_id TEXT PRIMARY KEY",
+            "published TEXT",
+            "published_day TEXT",
+            "categories TEXT",
+            "title TEXT",
+            "first_seen TEXT",
+        ],
+    )
+    _create_index(conn, "ix_arxiv_papers_day", "arxiv_papers", ["published_day"])
+    _create_index(conn, "ix_arxiv_papers_published", "arxiv_papers", ["published"])
+
+
+def _ct_trials(conn: sqlite3.Connection) -> None:
+    """ClinicalTrials.gov studies seen per sector/condition query."""
+    _create_table(
+        conn,
+        "ct_trials",
+        [
+            "nct_id TEXT NOT NULL",
+            "sector TEXT NOT NULL",
+            "condition TEXT NOT NULL",
+            "status TEXT",
+            "last_update TEXT",
+            "title TEXT",
+            "PRIMARY KEY (nct_id, sector, condition)",
+        ],
+    )
+    _create_index(conn, "ix_ct_trials_sector_status", "ct_trials", ["sector", "status"])
+
+
+def _response_cache(conn: sqlite3.Connection) -> None:
+    """Per-day API response cache with expiry (see ``core/cache.py``)."""
+    _create_table(
+        conn,
+        "response_cache",
+        [
+            "provider TEXT NOT NULL",
+            "key TEXT NOT NULL",
+            "day TEXT NOT NULL",
+            "body TEXT",
+            "created_at TEXT",
+            "expires_at TEXT",
+            "PRIMARY KEY (provider, key, day)",
+        ],
+    )
+
+
+def _serp_results(conn: sqlite3.Connection) -> None:
+    """Organic result URLs per search query and day (see ``collectors/social.py``)."""
+    _create_table(
+        conn,
+        "serp_results",
+        [
+            "day TEXT NOT NULL",
+            "query TEXT NOT NULL",
+            "position INTEGER NOT NULL",
+            "url TEXT",
+            "PRIMARY KEY (day, query, position)",
+        ],
+    )
+
+
+def _collector_state(conn: sqlite3.Connection) -> None:
+    """Per-collector cursors (see ``collectors/registry.py``)."""
+    _create_table(
+        conn,
+        "collector_state",
+        [
+            "collector TEXT NOT NULL",
+            "key TEXT NOT NULL",
+            "value TEXT",
+            "updated_at TEXT",
+            "PRIMARY KEY (collector, key)",
+        ],
+    )
+
+
+def _circuit_breakers(conn: sqlite3.Connection) -> None:
+    """Per-host failure counts and open-until times for ``core.http_client``."""
+    _create_table(
+        conn,
+        "circuit_breakers",
+        [
+            "host TEXT PRIMARY KEY",
+            "failures INTEGER NOT NULL DEFAULT 0",
+            "opened_until TEXT",
+            "last_error TEXT",
+            "updated_at TEXT",
+        ],
+    )
+
+def _events_fetched_index(conn: sqlite3.Connection) -> None:
+    """Snapshot export: days that received rows since the last export, from the index alone."""
+    _create_index(conn, "ix_events_fetched_day", "events", ["fetched_at", "event_day"])
+
+
+def _dedup_nulls(conn: sqlite3.Connection) -> None:
+    """Store a missing entity as '' so ``ux_events_dedup`` treats such rows as equal.
+
+    NULLs are distinct in a UNIQUE index, so rows without an entity were
+    never deduplicated; the extra copies are dropped and taken out of
+    ``events_daily`` first. Rows without a checksum have no identity to
+    compare and are left alone (new ones get a content checksum).
+    """
+    dupes = conn.execute(
+        """
+        SELECT id, event_day FROM events WHERE checksum IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM events WHERE checksum IS NOT NULL
+            GROUP BY source, IFNULL(entity, ''), metric, checksum, event_day
         )
+        """
+    ).fetchall()
+    for event_id, day in dupes:
+        _shift_rollup(conn, event_id, day, None)
+        conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+    conn.execute("UPDATE events SET entity = '' WHERE entity IS NULL")
+
+
+# Append-only: each entry runs once per database, in order.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "baseline", _baseline_schema),
+    (2, "events_dedup", _events_dedup),
+    (3, "secondary_indexes", _secondary_indexes),
+    (4, "epoch_timestamps", _epoch_timestamps),
+    (5, "events_daily", _events_daily),
+    (6, "payload_store", _payload_store),
+    (7, "http_cache", _http_cache),
+    (8, "ats_postings", _ats_postings),
+    (9, "market_bars", _market_bars),
+    (10, "api_quota", _api_quota),
+    (11, "arxiv_papers", _arxiv_papers),
+    (12, "ct_trials", _ct_trials),
+    (13, "response_cache", _response_cache),
+    (14, "serp_results", _serp_results),
+    (15, "collector_state", _collector_state),
+    (16, "circuit_breakers", _circuit_breakers),
+    (17, "epoch_repair", _epoch_repair),
+    (18, "events_fetched_index", _events_fetched_index),
+    (19, "dedup_nulls", _dedup_nulls),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Current schema version, read from ``PRAGMA user_version``."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version:
+        return version
+    # Databases migrated before user_version was maintained only have the ledger.
+    has_ledger = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+    ).fetchone()
+    if not has_ledger:
+        return 0
+    return conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()[0] or 0
 
-        _create_table(
-            conn,
-            "notes",
-            [
-                "ts TEXT",
-                "sector TEXT",
-                "text TEXT",
-            ],
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to ``target`` (default: latest); returns applied versions."""
+    current = schema_version(conn)
+    target = LATEST_VERSION if target is None else target
+    if current >= target:
+        return []
+    _create_table(
+        conn,
+        "schema_migrations",
+        ["version INTEGER PRIMARY KEY", "name TEXT", "applied_at TEXT"],
+    )
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        step(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+            (version, name, datetime.now(timezone.utc).isoformat()),
         )
+        applied.append(version)
+    conn.execute(f"PRAGMA user_version = {int(target)}")
+    return applied
+
+
+def init_db() -> None:
+    """Bring the schema up to date; a current database costs a single PRAGMA read."""
+    with get_connection() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] == LATEST_VERSION:
+            return
+        migrate(conn)
 
 
 __all__ = [
+    "LATEST_VERSION",
+    "MIGRATIONS",
+    "PROFILES",
+    "PerfProfile",
+    "close_connections",
     "get_connection",
     "init_db",
+    "migrate",
+    "schema_version",
+    "set_profile",
 ]
@@ -0,0 +1,71 @@
+"""Cooperative wall-clock budgets.
+
+``budget(seconds)`` sets a deadline for the enclosed block; nested budgets
+can only tighten it. The deadline lives in a context variable, so HTTP calls
+made anywhere below (``core.http_client``) clamp their timeouts to it and fail
+fast with ``DeadlineExceeded`` once it has passed. Worker threads do not
+inherit context variables: wrap pool callables with ``propagate``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import requests
+
+
+class DeadlineExceeded(requests.RequestException):
+    """Raised instead of starting work once the current budget is spent."""
+
+
+_EXPIRES: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline_expires", default=None)
+
+
+@contextmanager
+def budget(seconds: Optional[float]) -> Iterator[None]:
+    """Bound the enclosed block to ``seconds`` (``None`` or <= 0: no new bound)."""
+    current = _EXPIRES.get()
+    expires = current
+    if seconds is not None and seconds > 0:
+        candidate = time.monotonic() + seconds
+        expires = candidate if current is None else min(current, candidate)
+    token = _EXPIRES.set(expires)
+    try:
+        yield
+    finally:
+        _EXPIRES.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or ``None`` when unbounded."""
+    expires = _EXPIRES.get()
+    if expires is None:
+        return None
+    return max(expires - time.monotonic(), 0.0)
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check(what: str = "request") -> None:
+    if expired():
+        raise DeadlineExceeded(f"time budget exhausted before {what}")
+
+
+def propagate(fn: Callable) -> Callable:
+    """Wrap ``fn`` so calls in another thread see the caller's deadline."""
+    expires = _EXPIRES.get()
+
+    def run(*args, **kwargs):
+        token = _EXPIRES.set(expires)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _EXPIRES.reset(token)
+
+    return run
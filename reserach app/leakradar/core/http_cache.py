@@ -0,0 +1,101 @@
+"""Conditional GETs backed by the ``http_cache`` table.
+
+The ETag / Last-Modified of each successful response is stored next to the
+caller's parsed result. The next fetch sends If-None-Match /
+If-Modified-Since, and a 304 hands back the stored result without
+downloading or re-parsing the body (GitHub does not bill 304s against the
+rate limit either).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from . import http_client
+from .db import get_connection
+
+
+@dataclass
+class CachedFetch:
+    status: Optional[int]
+    parsed: Any = None
+    not_modified: bool = False
+
+
+def cache_key(url: str, params: Optional[Dict] = None, variant: Optional[str] = None) -> str:
+    key = requests.Request("GET", url, params=params).prepare().url
+    return f"{key}#{variant}" if variant else key
+
+
+def lookup(key: str):
+    with get_connection(readonly=True) as conn:
+        return conn.execute(
+            "SELECT etag, last_modified, status, parsed FROM http_cache WHERE url = ?", (key,)
+        ).fetchone()
+
+
+def _store(key: str, response, parsed: Any, now: str) -> None:
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO http_cache
+            (url, etag, last_modified, status, parsed, fetched_at, validated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                response.status_code,
+                json.dumps(parsed),
+                now,
+                now,
+            ),
+        )
+
+
+def _touch(key: str, now: str) -> None:
+    with get_connection() as conn:
+        conn.execute("UPDATE http_cache SET validated_at = ? WHERE url = ?", (now, key))
+
+
+def fetch(
+    url: str,
+    parse: Callable[[requests.Response], Any],
+    params: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    variant: Optional[str] = None,
+    **kwargs,
+) -> CachedFetch:
+    """GET ``url`` conditionally and return ``parse(response)`` or the cached result.
+
+    ``parse`` only runs on a fresh 200 and must return something JSON
+    serialisable. Other statuses come back with ``parsed=None`` and leave the
+    cache untouched. ``variant`` names whatever else ``parse`` depends on (a
+    parse version, a keyword list): a 304 only reuses a result stored under
+    the same variant.
+    """
+    key = cache_key(url, params, variant)
+    entry = lookup(key)
+    send_headers = dict(headers or {})
+    if entry is not None:
+        if entry["etag"]:
+            send_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            send_headers["If-Modified-Since"] = entry["last_modified"]
+    response = http_client.get(url, params=params, headers=send_headers, **kwargs)
+    now = datetime.now(timezone.utc).isoformat()
+    if response.status_code == 304 and entry is not None:
+        _touch(key, now)
+        return CachedFetch(entry["status"], json.loads(entry["parsed"]), not_modified=True)
+    if response.status_code != 200:
+        return CachedFetch(response.status_code)
+    parsed = parse(response)
+    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+        _store(key, response, parsed, now)
+    return CachedFetch(response.status_code, parsed)
@@ -0,0 +1,243 @@
+"""Shared HTTP client for collectors.
+
+Every outbound call goes through ``request``: keep-alive sessions with pooled
+connections, a token bucket and in-flight cap per host, and retries with
+exponential backoff on 429/5xx that honour ``Retry-After``. Calls respect the
+current ``core.deadline`` budget and skip hosts whose circuit breaker is open.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from . import breaker, config, deadline
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Final statuses that count against a host's breaker; 429 means "slow down", not "down".
+FAILURE_STATUSES = RETRY_STATUSES - {429}
+USER_AGENT = "LeakRadar/1.0 (+https://github.com/keke2221/leakradar)"
+
+
+class TokenBucket:
+    """Blocking token bucket; ``capacity`` tokens refill at ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[float]:
+        """Take one token, sleeping until it is available; returns seconds waited.
+
+        Returns ``None`` straight away, without sleeping, if the token would
+        not be available within ``timeout`` seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+                if timeout is not None and waited + delay > timeout:
+                    return None
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds`` (server asked us to back off)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RetryableStatus(Exception):
+    def __init__(self, response: requests.Response):
+        super().__init__(f"HTTP {response.status_code} from {response.url}")
+        self.response = response
+
+
+_BUCKETS: Dict[str, TokenBucket] = {}
+_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_HOSTS_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+
+def _host_rate(host: str) -> float:
+    rate = config.HOST_RATE_LIMITS.get(host)
+    if rate is None:
+        rate = 1.0 / config.POLICY.polite_sleep_secs if config.POLICY.polite_sleep_secs > 0 else 1000.0
+    return rate
+
+
+def bucket_for(host: str) -> TokenBucket:
+    with _HOSTS_LOCK:
+        bucket = _BUCKETS.get(host)
+        if bucket is None:
+            bucket = _BUCKETS[host] = TokenBucket(_host_rate(host))
+        return bucket
+
+
+def slot_for(host: str) -> threading.BoundedSemaphore:
+    with _HOSTS_LOCK:
+        slot = _SLOTS.get(host)
+        if slot is None:
+            slot = _SLOTS[host] = threading.BoundedSemaphore(config.HTTP_HOST_CONCURRENCY)
+        return slot
+
+
+def reset() -> None:
+    """Forget per-host state (tests, or after changing config at runtime)."""
+    with _HOSTS_LOCK:
+        _BUCKETS.clear()
+        _SLOTS.clear()
+
+
+def session() -> requests.Session:
+    """Keep-alive session for the current thread."""
+    sess = getattr(_LOCAL, "session", None)
+    if sess is None:
+        sess = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(config.HTTP_HOST_CONCURRENCY, 1))
+        sess.mount("https://", adapter)
+        sess.mount("http://", adapter)
+        sess.headers["User-Agent"] = USER_AGENT
+        _LOCAL.session = sess
+    return sess
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+_BACKOFF = wait_exponential(multiplier=0.5, max=config.POLICY.backoff_max_secs)
+
+
+def _wait(state) -> float:
+    exc = state.outcome.exception()
+    delay = None
+    if isinstance(exc, RetryableStatus):
+        delay = retry_after(exc.response)
+        if delay is not None:
+            delay = min(delay, config.POLICY.backoff_max_secs)
+    if delay is None:
+        delay = _BACKOFF(state)
+    left = deadline.remaining()
+    # Never sleep past the budget; the next attempt then fails fast.
+    return delay if left is None else min(delay, left)
+
+
+def _clamp_timeout(timeout):
+    left = deadline.remaining()
+    if left is None or timeout is None:
+        return timeout
+    left = max(left, 0.001)
+    if isinstance(timeout, tuple):
+        return tuple(left if part is None else min(part, left) for part in timeout)
+    return min(timeout, left)
+
+
+def _give_up(state):
+    exc = state.outcome.exception()
+    if isinstance(exc, RetryableStatus):
+        # Out of retries: hand the last response back so callers see the status.
+        return exc.response
+    raise exc
+
+
+def _send(method: str, url: str, host: str, kwargs) -> requests.Response:
+    what = f"{method} {url}"
+    deadline.check(what)
+    bucket = bucket_for(host)
+    # Waiting on the host's pacing counts against the budget too.
+    if bucket.acquire(deadline.remaining()) is None:
+        raise deadline.DeadlineExceeded(f"time budget exhausted waiting for a {host} token: {what}")
+    slot = slot_for(host)
+    if not slot.acquire(timeout=deadline.remaining()):
+        raise deadline.DeadlineExceeded(f"time budget exhausted waiting for a {host} slot: {what}")
+    try:
+        deadline.check(what)
+        kwargs = dict(kwargs, timeout=_clamp_timeout(kwargs.get("timeout")))
+        response = session().request(method, url, **kwargs)
+    finally:
+        slot.release()
+    if response.status_code in RETRY_STATUSES:
+        delay = retry_after(response)
+        if delay:
+            bucket.pause(min(delay, config.POLICY.backoff_max_secs))
+        raise RetryableStatus(response)
+    return response
+
+
+def request(method: str, url: str, retries: Optional[int] = None, **kwargs) -> requests.Response:
+    """Rate-limited ``requests``-style call with retry on throttling/server errors.
+
+    Connection errors and timeouts are retried too and re-raised once retries
+    are exhausted; a final 429/5xx response is returned rather than raised.
+    Raises ``breaker.CircuitOpen`` for a host that is cooling down and
+    ``deadline.DeadlineExceeded`` once the current budget is spent.
+    """
+    kwargs.setdefault("timeout", 30)
+    host = host_of(url)
+    failures = breaker.allow(host)
+    attempts = (config.POLICY.retries if retries is None else retries) + 1
+    retrying = Retrying(
+        stop=stop_after_attempt(attempts),
+        wait=_wait,
+        retry=retry_if_exception_type((RetryableStatus, requests.ConnectionError, requests.Timeout)),
+        retry_error_callback=_give_up,
+    )
+    try:
+        response = retrying(_send, method, url, host, kwargs)
+    except (requests.ConnectionError, requests.Timeout) as exc:
+        # A timeout cut short by our own budget says nothing about the host.
+        if not deadline.expired():
+            breaker.record_failure(host, str(exc))
+        raise
+    if response.status_code in FAILURE_STATUSES:
+        breaker.record_failure(host, f"HTTP {response.status_code}")
+    else:
+        breaker.record_success(host, failures)
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
@@ -7,9 +7,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List, Optional
 
-import requests
-
-from . import config
+from . import config, http_client
 from .db import get_connection
 from .news import latest_topics
 
@@ -24,27 +22,29 @@ class Brief:
 
 
 def _load_comparisons():
+    """Comparison rows for the latest ts (both writers emit uniform isoformat ts)."""
     with get_connection() as conn:
-        df = conn.execute("SELECT ts, sector, hype_index, reality_index, gap FROM comparisons").fetchall()
+        df = conn.execute(
+            """
+            SELECT ts, sector, hype_index, reality_index, gap FROM comparisons
+            WHERE ts = (SELECT MAX(ts) FROM comparisons)
+            """
+        ).fetchall()
     if not df:
         return []
-    rows = []
-    for row in df:
-        ts = datetime.fromisoformat(row["ts"])
-        rows.append((ts, row["sector"], row["hype_index"], row["reality_index"], row["gap"]))
-    return rows
+    ts = datetime.fromisoformat(df[0]["ts"])
+    return [(ts, row["sector"], row["hype_index"], row["reality_index"], row["gap"]) for row in df]
 
 
 def _top_components() -> Dict[str, List[str]]:
     with get_connection() as conn:
-        rows = conn.execute("SELECT ts, sector, components FROM scores").fetchall()
+        rows = conn.execute(
+            "SELECT sector, components FROM scores WHERE ts = (SELECT MAX(ts) FROM scores)"
+        ).fetchall()
     if not rows:
         return {}
-    latest_ts = max(datetime.fromisoformat(r["ts"]) for r in rows)
     picks: Dict[str, List[str]] = {}
     for row in rows:
-        if datetime.fromisoformat(row["ts"]) != latest_ts:
-            continue
         try:
             comps = json.loads(row["components"])
         except json.JSONDecodeError:
@@ -69,7 +69,7 @@ def _call_perplexity(prompt: str) -> Optional[str]:
     if not (config.PERPLEXITY_API_KEY and config.USE_PERPLEXITY):
         return None
     try:
-        resp = requests.post(
+        resp = http_client.post(
             "https://api.perplexity.ai/chat/completions",
             headers={"Authorization": f"Bearer {config.PERPLEXITY_API_KEY}"},
             json={
@@ -77,6 +77,8 @@ def _call_perplexity(prompt: str) -> Optional[str]:
                 "messages": [{"role": "system", "content": "You are a concise market analyst."}, {"role": "user", "content": prompt}],
             },
             timeout=30,
+            # Completions are billed per call; a retried timeout may bill twice.
+            retries=0,
         )
         resp.raise_for_status()
         data = resp.json()
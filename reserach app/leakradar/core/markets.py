@@ -13,19 +13,17 @@ from .db import get_connection
 
 def _read_market(conn) -> pd.DataFrame:
     df = pd.read_sql_query(
-        "SELECT ts, sector, symbol, kind, metric, value, payload, confidence FROM market_events",
+        "SELECT ts_epoch, sector, symbol, kind, metric, value, payload_ref, confidence FROM market_events",
         conn,
     )
-    if df.empty:
-        return df
-    df["ts"] = pd.to_datetime(df["ts"], utc=True)
+    df.insert(0, "ts", pd.to_datetime(df.pop("ts_epoch"), unit="s", utc=True))
     return df
 
 
 def _load_market_df(conn=None) -> pd.DataFrame:
     if conn is not None:
         return _read_market(conn)
-    with get_connection() as conn_obj:
+    with get_connection(readonly=True) as conn_obj:
         return _read_market(conn_obj)
 
 
@@ -12,32 +12,35 @@ from . import config
 from .db import get_connection
 
 
-def _read_narratives(conn) -> pd.DataFrame:
-    df = pd.read_sql_query(
-        "SELECT ts, source, sector, metric, value, payload, source_url, confidence FROM narrative_events",
-        conn,
+def _read_narratives(conn, since: Optional[datetime] = None) -> pd.DataFrame:
+    query = (
+        "SELECT ts_epoch, source, sector, metric, value, payload, source_url, confidence "
+        "FROM narrative_events"
     )
-    if df.empty:
-        return df
-    df["ts"] = pd.to_datetime(df["ts"], utc=True)
+    params: tuple = ()
+    if since is not None:
+        query += " WHERE ts_epoch >= ?"
+        params = (int(since.timestamp()),)
+    df = pd.read_sql_query(query, conn, params=params)
+    df.insert(0, "ts", pd.to_datetime(df.pop("ts_epoch"), unit="s", utc=True))
     return df
 
 
-def _load_events_df(conn=None) -> pd.DataFrame:
+def _load_events_df(conn=None, since: Optional[datetime] = None) -> pd.DataFrame:
     if conn is not None:
-        return _read_narratives(conn)
-    with get_connection() as conn_obj:
-        return _read_narratives(conn_obj)
+        return _read_narratives(conn, since)
+    with get_connection(readonly=True) as conn_obj:
+        return _read_narratives(conn_obj, since)
 
 
 def media_density(window_days: int = 30) -> pd.DataFrame:
     """Return per-sector media hit z-scores over the given window."""
-    df = _load_events_df()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
+    df = _load_events_df(since=cutoff)
     if df.empty:
         return pd.DataFrame(columns=["ts", "sector", "media_hits", "media_z"])
     df = df[df["metric"] == "media_hits"].copy()
     df["ts"] = df["ts"].dt.floor("D")
-    cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
     df = df[df["ts"] >= cutoff]
     grouped = df.groupby(["ts", "sector"])["value"].sum().reset_index(name="media_hits")
     frames = []
@@ -53,14 +56,14 @@ def media_density(window_days: int = 30) -> pd.DataFrame:
 
 
 def social_pulse(window_days: int = 30) -> pd.DataFrame:
-    df = _load_events_df()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
+    df = _load_events_df(since=cutoff)
     if df.empty:
         return pd.DataFrame(columns=["ts", "sector", "social_mentions", "social_z"])
     df = df[df["metric"] == "social_mentions"].copy()
     if df.empty:
         return pd.DataFrame(columns=["ts", "sector", "social_mentions", "social_z"])
     df["ts"] = df["ts"].dt.floor("D")
-    cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
     df = df[df["ts"] >= cutoff]
     grouped = df.groupby(["ts", "sector"])["value"].sum().reset_index(name="social_mentions")
     frames = []
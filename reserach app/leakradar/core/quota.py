@@ -0,0 +1,52 @@
+"""Persistent per-provider daily request quotas.
+
+Usage is counted in ``api_quota`` per provider and UTC day, so the budget
+holds across runs and processes. Per-minute pacing is left to the host
+token buckets in ``core/http_client.py``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from .db import get_connection
+
+
+def _day(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).date().isoformat()
+
+
+def used(provider: str, now: Optional[datetime] = None) -> int:
+    with get_connection(readonly=True) as conn:
+        row = conn.execute(
+            "SELECT used FROM api_quota WHERE provider = ? AND day = ?", (provider, _day(now))
+        ).fetchone()
+    return row[0] if row else 0
+
+
+def remaining(provider: str, daily_limit: int, now: Optional[datetime] = None) -> int:
+    return max(daily_limit - used(provider, now), 0)
+
+
+def consume(provider: str, count: int = 1, now: Optional[datetime] = None) -> None:
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO api_quota (provider, day, used) VALUES (?, ?, ?)
+            ON CONFLICT(provider, day) DO UPDATE SET used = used + excluded.used
+            """,
+            (provider, _day(now), count),
+        )
+
+
+def exhaust(provider: str, daily_limit: int, now: Optional[datetime] = None) -> None:
+    """Mark today's budget as spent (the provider told us so)."""
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO api_quota (provider, day, used) VALUES (?, ?, ?)
+            ON CONFLICT(provider, day) DO UPDATE SET used = MAX(used, excluded.used)
+            """,
+            (provider, _day(now), daily_limit),
+        )
@@ -17,22 +17,7 @@ def _trimmed_mean(values: pd.Series) -> float:
     return float(trimmed.mean())
 
 
-def compute_consensus(events: pd.DataFrame) -> pd.DataFrame:
-    """Return consensus value per day/sector/metric with disagreement."""
-    if events.empty:
-        return pd.DataFrame(
-            columns=["ts", "sector", "metric", "consensus_value", "disagreement", "source_count"]
-        )
-
-    events = events.copy()
-    events["ts"] = pd.to_datetime(events["ts"], utc=True).dt.floor("D")
-
-    grouped = (
-        events.groupby(["ts", "sector", "metric", "source"])
-        .agg({"value": "mean"})
-        .reset_index()
-    )
-
+def _consensus_from_source_means(grouped: pd.DataFrame) -> pd.DataFrame:
     records = []
     for (ts, sector, metric), metric_df in grouped.groupby(["ts", "sector", "metric"]):
         values = metric_df["value"]
@@ -53,10 +38,46 @@ def compute_consensus(events: pd.DataFrame) -> pd.DataFrame:
                 "source_count": source_count,
             }
         )
-
+    if not records:
+        return _empty_consensus()
     return pd.DataFrame.from_records(records)
 
 
+def _empty_consensus() -> pd.DataFrame:
+    return pd.DataFrame(
+        columns=["ts", "sector", "metric", "consensus_value", "disagreement", "source_count"]
+    )
+
+
+def compute_consensus(events: pd.DataFrame) -> pd.DataFrame:
+    """Return consensus value per day/sector/metric with disagreement."""
+    if events.empty:
+        return _empty_consensus()
+
+    events = events.copy()
+    events["ts"] = pd.to_datetime(events["ts"], utc=True).dt.floor("D")
+
+    grouped = (
+        events.groupby(["ts", "sector", "metric", "source"])
+        .agg({"value": "mean"})
+        .reset_index()
+    )
+    return _consensus_from_source_means(grouped)
+
+
+def compute_consensus_daily(daily: pd.DataFrame) -> pd.DataFrame:
+    """``compute_consensus`` over the ``events_daily`` rollup (value_sum/value_count per source)."""
+    if daily.empty:
+        return _empty_consensus()
+    grouped = (
+        daily.groupby(["ts", "sector", "metric", "source"])[["value_sum", "value_count"]]
+        .sum()
+        .reset_index()
+    )
+    grouped["value"] = grouped["value_sum"] / grouped["value_count"]
+    return _consensus_from_source_means(grouped)
+
+
 def disagreement_by_sector(consensus_df: pd.DataFrame) -> pd.DataFrame:
     """Aggregate disagreement per day+sector."""
     if consensus_df.empty:
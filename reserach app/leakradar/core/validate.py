@@ -24,15 +24,33 @@ def _parse_ts(value: str) -> Optional[datetime]:
         return None
 
 
-def validate_event(row: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-    """Return (ok, error) for an event row."""
+def ts_epoch(value: Any) -> Optional[int]:
+    """Integer epoch seconds for an ISO string or datetime; naive values are UTC."""
+    ts = _parse_ts(value) if isinstance(value, str) else value
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+
+def epoch_day(epoch: int) -> str:
+    """UTC day bucket (YYYY-MM-DD) for an epoch timestamp."""
+    return datetime.fromtimestamp(epoch, timezone.utc).date().isoformat()
+
+
+def validate_event(row: Dict[str, Any], now: Optional[datetime] = None) -> Tuple[bool, Optional[str]]:
+    """Return (ok, error) for an event row.
+
+    Bulk callers pass ``now`` once per batch instead of reading the clock per row.
+    """
     ts_str = row.get("ts")
     if not ts_str:
         return False, "missing ts"
     ts = _parse_ts(ts_str)
     if not ts:
         return False, "invalid ts"
-    if ts < datetime.now(timezone.utc) - timedelta(days=365):
+    if ts < (now or datetime.now(timezone.utc)) - timedelta(days=365):
         return False, "ts too old"
 
     metric = row.get("metric")
@@ -10,18 +10,11 @@ from random import randint
 
 import pandas as pd
 
-from collectors import (
-    arxiv,
-    clinicaltrials,
-    github,
-    grants,
-    jobs,
-    markets as markets_collector,
-    news as news_collector,
-    social as social_collector,
-)
+from collectors.registry import run_registered
 from compute.aggregate import run_compute
-from core import config
+from compute.export import export_snapshots
+from core import breaker, cache, config
+from core.archive import compact
 from core.backtest import run_backtest
 from core.compare import build_indices
 from core.db import get_connection, init_db
@@ -68,25 +61,10 @@ def _record_run(run_id: str, status: str, started_at: str, finished_at: str | No
 
 
 def _run_collectors():
-    summary = {}
-    collector_modules = [
-        arxiv,
-        clinicaltrials,
-        jobs,
-        github,
-        grants,
-        news_collector,
-        social_collector,
-        markets_collector,
-    ]
-    for module in collector_modules:
-        name = module.__name__.split(".")[-1]
-        try:
-            result = module.collect()
-        except Exception as exc:
-            result = {"error": str(exc), "inserted": 0, "quarantined": 0}
-        summary[name] = result
-        LOG.info("collector %s => %s", name, result)
+    summary = run_registered(LOG)
+    skipped_hosts = breaker.open_hosts()
+    if skipped_hosts:
+        LOG.info("circuit open: %s", ", ".join(item["host"] for item in skipped_hosts))
     return summary
 
 
@@ -187,6 +165,11 @@ def main():
         LOG.info("anomalies: %s", anomalies.to_dict(orient="records") if not anomalies.empty else "none")
         _send_alerts(anomalies, scores_df[scores_df["ts"] == scores_df["ts"].max()])
 
+    LOG.info("snapshots exported: %s", export_snapshots())
+    compacted = compact()
+    LOG.info("compacted to archive: %s", compacted)
+    LOG.info("expired response cache entries purged: %s", cache.purge())
+
     inserted_total = sum(v.get("inserted", 0) for v in collectors_summary.values())
     quarantined_total = sum(v.get("quarantined", 0) for v in collectors_summary.values())
     high_scores = []
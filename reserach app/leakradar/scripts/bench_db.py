@@ -0,0 +1,123 @@
+"""Query latency on a large synthetic events table, before and after the index migration.
+
+Builds a throwaway database at schema version 2 (no secondary indexes), times
+the hot read paths, applies the remaining migrations and times them again:
+
+    python -m scripts.bench_db --rows 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from core import config, db
+from core.monitor import HEALTH_QUERY
+
+SOURCES = ["arxiv", "clinicaltrials", "jobs", "github", "grants"]
+METRICS = ["new_papers", "recruiting_trials", "job_count", "stars", "grants"]
+
+QUERIES = {
+    "health_group_by": ("SELECT source, MAX(fetched_at) FROM events GROUP BY source", ()),
+    "collector_health": (HEALTH_QUERY, ()),
+    "leak_feed": ("SELECT * FROM events ORDER BY ts DESC LIMIT 500", ()),
+    "quarantine_breakdown": ("SELECT error, COUNT(*) FROM events_quarantine GROUP BY error", ()),
+    "comparisons_by_ts": ("SELECT * FROM comparisons WHERE ts = ?", ("{latest}",)),
+    "anomalies_by_run": ("SELECT * FROM anomalies WHERE run_id = ?", ("run-42",)),
+    "anomalies_feed": ("SELECT rowid, * FROM anomalies ORDER BY ts DESC LIMIT 100", ()),
+}
+
+
+def _populate(conn, rows: int) -> str:
+    rng = random.Random(7)
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    step = timedelta(days=365) / max(rows, 1)
+
+    def events():
+        for i in range(rows):
+            ts = (start + step * i).isoformat()
+            yield (
+                ts,
+                SOURCES[i % len(SOURCES)],
+                config.SECTORS[i % len(config.SECTORS)],
+                f"entity-{i % 5000}",
+                METRICS[i % len(METRICS)],
+                rng.random() * 100,
+                ts,
+                f"{i:040x}",
+                ts[:10],
+                0.8,
+            )
+
+    conn.executemany(
+        """
+        INSERT INTO events (ts, source, sector, entity, metric, value, fetched_at, checksum,
+        event_day, confidence) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        events(),
+    )
+    conn.executemany(
+        "INSERT INTO events_quarantine (ts, source, metric, value, error) VALUES (?, ?, ?, ?, ?)",
+        ((start.isoformat(), "jobs", "job_count", 0.0, f"http {400 + i % 5}") for i in range(rows // 20)),
+    )
+    days = [(start + timedelta(days=d)).isoformat() for d in range(365)]
+    conn.executemany(
+        "INSERT INTO comparisons (ts, sector, hype_index, reality_index, gap) VALUES (?, ?, 50, 50, 0)",
+        ((ts, sector) for ts in days * 20 for sector in config.SECTORS),
+    )
+    conn.executemany(
+        "INSERT INTO anomalies (ts, run_id, sector, metric, zscore, confidence) VALUES (?, ?, ?, ?, 2.5, 0.8)",
+        (
+            (days[i % len(days)], f"run-{i % 5000}", config.SECTORS[i % 4], METRICS[i % 5])
+            for i in range(rows // 10)
+        ),
+    )
+    return days[-1]
+
+
+def _time_queries(conn, latest: str, repeat: int):
+    timings = {}
+    for name, (sql, params) in QUERIES.items():
+        params = tuple(p.format(latest=latest) for p in params)
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = str(Path(tmp) / "bench.sqlite")
+        with db.get_connection() as conn:
+            db.migrate(conn, target=2)
+            latest = _populate(conn, args.rows)
+        with db.get_connection() as conn:
+            before = _time_queries(conn, latest, args.repeat)
+            started = time.perf_counter()
+            db.migrate(conn)
+            build_secs = time.perf_counter() - started
+            conn.execute("ANALYZE")
+            after = _time_queries(conn, latest, args.repeat)
+
+    print(f"events: {args.rows:,} rows | index build: {build_secs:.1f}s")
+    print(f"{'query':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<22}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+    return {"before": before, "after": after}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Time the GitHub collector sequentially vs. with the concurrent fetch pool.
+
+Serves canned repo/releases JSON from a local threaded HTTP stub with an
+artificial per-request delay, so no network or token is needed:
+
+    python -m scripts.bench_github --repos 40 --delay 0.1 --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from collectors import github
+from core import config, db
+
+
+def _handler(delay: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            parts = self.path.split("?", 1)[0].strip("/").split("/")
+            if parts[-1] == "releases":
+                body = [{"id": i} for i in range(3)]
+            else:
+                body = {"full_name": f"{parts[1]}/{parts[2]}", "stargazers_count": len(parts[2])}
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _comparable(rows):
+    return [{k: v for k, v in row.items() if k != "ts"} for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repos", type=int, default=40)
+    parser.add_argument("--delay", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(args.delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    github.API_BASE = f"http://127.0.0.1:{server.server_address[1]}"
+    # The stub is not rate limited; measure fetch latency, not the bucket.
+    config.HOST_RATE_LIMITS["127.0.0.1"] = 10_000.0
+    repos = [{"owner": "bench", "repo": f"repo-{i}", "sector": "ai"} for i in range(args.repos)]
+    github._load_repos = lambda: repos
+
+    tmp = tempfile.TemporaryDirectory()
+    # Conditional-request cache writes go to a throwaway database.
+    db.DB_PATH = str(Path(tmp.name) / "bench.sqlite")
+    db.init_db()
+    try:
+        started = time.perf_counter()
+        sequential = github.fetch_rows(concurrency=1, use_graphql=False)
+        seq_secs = time.perf_counter() - started
+
+        started = time.perf_counter()
+        concurrent = github.fetch_rows(concurrency=args.concurrency, use_graphql=False)
+        conc_secs = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        db.close_connections()
+        tmp.cleanup()
+
+    print(f"repos={args.repos} delay={args.delay}s")
+    print(f"sequential   : {seq_secs:8.3f}s")
+    print(f"concurrent x{args.concurrency}: {conc_secs:8.3f}s  ({seq_secs / conc_secs:.1f}x)")
+    print(f"identical rows: {_comparable(sequential) == _comparable(concurrent)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare row-by-row persist_rows against the bulk ingest_rows path.
+
+Runs against a throwaway SQLite file so the live database is never touched:
+
+    python -m scripts.bench_ingest --rows 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from collectors.base import checksum_payload, ingest_rows, persist_rows
+from core import config, db
+
+
+def _synthetic_rows(count: int):
+    now = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for i in range(count):
+        payload = {"id": f"grant-{i}", "amount": float(i % 1000)}
+        rows.append(
+            {
+                "ts": now,
+                "sector": config.SECTORS[i % len(config.SECTORS)],
+                "entity": f"program-{i % 50}",
+                "metric": "grants" if i % 97 else "bogus",
+                "value": float(i % 1000),
+                "payload": payload,
+                "source_url": f"https://example.com/grants/{i}",
+                "parse_version": "bench_v1",
+                "checksum": checksum_payload(payload),
+                "license": "CC0",
+                "confidence": 0.6,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = _synthetic_rows(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Each path gets a fresh file so the second run is not all duplicates.
+        db.DB_PATH = str(Path(tmp) / "rowwise.sqlite")
+        db.init_db()
+        started = time.perf_counter()
+        persist_rows("bench", rows)
+        rowwise = time.perf_counter() - started
+
+        db.DB_PATH = str(Path(tmp) / "bulk.sqlite")
+        db.init_db()
+        report = ingest_rows("bench", rows, chunk_size=args.chunk_size)
+
+    print(f"rows: {args.rows}")
+    print(f"persist_rows: {rowwise:.2f}s ({args.rows / rowwise:,.0f} rows/s)")
+    print(f"ingest_rows:  {report.elapsed_secs:.2f}s ({report.rows_per_sec:,.0f} rows/s)")
+    return report.as_dict()
+
+
+if __name__ == "__main__":
+    main()
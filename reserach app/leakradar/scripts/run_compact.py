@@ -0,0 +1,22 @@
+"""Move raw events past the hot window into the monthly archive."""
+
+from __future__ import annotations
+
+import argparse
+
+from core import config
+from core.archive import compact
+from core.db import init_db
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--retain-days", type=int, default=config.HOT_RETENTION_DAYS)
+    parser.add_argument("--vacuum", action="store_true", help="shrink the hot file afterwards")
+    args = parser.parse_args(argv)
+    init_db()
+    return compact(retain_days=args.retain_days, vacuum=args.vacuum)
+
+
+if __name__ == "__main__":
+    print(main())
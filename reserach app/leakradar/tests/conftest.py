@@ -0,0 +1,13 @@
+import pytest
+
+from core import db
+
+
+@pytest.fixture(autouse=True)
+def tmp_db(monkeypatch, tmp_path):
+    """Point every test at a throwaway SQLite file instead of data/leakradar.sqlite."""
+    path = tmp_path / "leakradar.sqlite"
+    monkeypatch.setattr(db, "DB_PATH", str(path))
+    db.init_db()
+    yield path
+    db.close_connections()
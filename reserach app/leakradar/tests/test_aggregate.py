@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from collectors.base import ingest_rows, persist_rows
+from compute.aggregate import _load_daily, build_features
+from core import db
+
+
+def _event(days_ago, metric, value, source_checksum, confidence=0.8):
+    ts = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {
+        "ts": ts.isoformat(),
+        "sector": "ai",
+        "entity": "e",
+        "metric": metric,
+        "value": value,
+        "payload": {},
+        "checksum": source_checksum,
+        "confidence": confidence,
+    }
+
+
+def test_rollup_tracks_inserts_but_not_duplicates():
+    rows = [_event(0, "grants", 10.0, "a"), _event(0, "grants", 5.0, "b", 0.4)]
+    ingest_rows("grants", rows)
+    persist_rows("grants", rows)
+    persist_rows("grants", [_event(1, "grants", 2.0, "c")])
+    with db.get_connection() as conn:
+        daily = _load_daily(conn)
+    today = daily[daily["ts"] == daily["ts"].max()].iloc[0]
+    assert today["value_sum"] == 15.0
+    assert today["value_count"] == 2
+    assert today["confidence_sum"] == pytest.approx(1.2)
+    assert len(daily) == 2
+
+
+def test_build_features_reads_rollup_by_day():
+    ingest_rows("grants", [_event(d, "grants", 1.0, f"g{d}") for d in range(3)])
+    ingest_rows("arxiv", [_event(0, "new_papers", 4.0, "p1")])
+    ingest_rows("rss", [_event(0, "new_papers", 6.0, "p2")])
+    with db.get_connection() as conn:
+        features = build_features(_load_daily(conn))
+    latest = features[(features["ts"] == features["ts"].max()) & (features["sector"] == "ai")].iloc[0]
+    assert latest["grants_90d"] == 3.0
+    assert latest["new_papers_7d"] == 10.0
+    assert latest["consensus_disagreement"] > 0
+    assert pd.api.types.is_datetime64_any_dtype(features["ts"])
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from collectors.base import ingest_rows, persist_rows
+from core import archive, db
+
+
+def _event(days_ago, checksum):
+    ts = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {"ts": ts.isoformat(), "sector": "ai", "entity": "e", "metric": "grants", "value": 1.0, "checksum": checksum}
+
+
+def test_compact_moves_old_rows_to_monthly_partitions(monkeypatch, tmp_path):
+    monkeypatch.setattr(archive, "ARCHIVE_PATH", str(tmp_path / "archive.sqlite"))
+    ingest_rows("grants", [_event(d, f"c{d}") for d in (0, 10, 200, 260)])
+
+    moved = archive.compact(retain_days=100)
+
+    assert moved["events"] == 2
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 2
+        # The rollup keeps full history for feature building.
+        assert conn.execute("SELECT SUM(value_count) FROM events_daily").fetchone()[0] == 4
+    with archive.history_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events_history").fetchone()[0] == 4
+        assert len(archive.partitions(conn, "events")) == 2
+    assert archive.compact(retain_days=100)["events"] == 0
+
+
+def test_reingesting_archived_rows_is_skipped(monkeypatch, tmp_path):
+    monkeypatch.setattr(archive, "ARCHIVE_PATH", str(tmp_path / "archive.sqlite"))
+    rows = [_event(200, "old"), _event(0, "new")]
+    ingest_rows("grants", rows)
+    assert archive.compact(retain_days=100)["events"] == 1
+
+    assert ingest_rows("grants", rows).skipped == 2
+    assert persist_rows("grants", rows).skipped == 2
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 1
+        assert conn.execute("SELECT SUM(value_count) FROM events_daily").fetchone()[0] == 2
+
+
+def test_compact_inside_outer_transaction_leaves_commit_to_caller(monkeypatch, tmp_path):
+    monkeypatch.setattr(archive, "ARCHIVE_PATH", str(tmp_path / "archive.sqlite"))
+    ingest_rows("grants", [_event(200, "old")])
+    try:
+        with db.get_connection() as conn:
+            conn.execute("INSERT INTO notes (ts, sector, text) VALUES ('t', 'ai', 'x')")
+            archive.compact(retain_days=100)
+            raise RuntimeError("caller fails")
+    except RuntimeError:
+        pass
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 1
+    assert archive.compact(retain_days=100)["events"] == 1
+    with archive.history_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events_history").fetchone()[0] == 1
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+from collectors import arxiv
+from core import db
+
+
+def _entry(paper_id, published, cats):
+    return {
+        "id": f"http://arxiv.org/abs/{paper_id}v1",
+        "title": f"Paper {paper_id}",
+        "link": f"http://arxiv.org/abs/{paper_id}v1",
+        "published_parsed": list(published.timetuple()[:6]),
+        "categories": cats,
+    }
+
+
+def test_harvest_pages_and_counts_cross_listed_papers_once(monkeypatch):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    yesterday = now - timedelta(days=1)
+    pages = [
+        [_entry("2601.00001", yesterday, ["cs.AI", "cs.LG"]), _entry("2601.00002", yesterday, ["cs.CL"])],
+        [_entry("2601.00001", yesterday, ["cs.AI", "cs.LG"]), _entry("2601.00003", now, ["cs.LG"])],
+        [],
+    ]
+    urls = []
+
+    def fake_parse(url):
+        urls.append(url)
+        return {"entries": pages.pop(0) if pages else []}
+
+    monkeypatch.setattr(arxiv, "PAGE_SIZE", 2)
+    monkeypatch.setattr(arxiv, "_parse_feed", fake_parse)
+    captured = {}
+
+    def fake_persist(source, rows):
+        captured["rows"] = rows
+        return len(rows), 0
+
+    monkeypatch.setattr(arxiv, "persist_rows", fake_persist)
+    arxiv.collect()
+
+    assert [parse_qs(urlsplit(url).query)["start"] for url in urls] == [["0"], ["2"], ["4"]]
+    values = {row["ts"][:10]: row["value"] for row in captured["rows"]}
+    assert values == {yesterday.date().isoformat(): 2.0, now.date().isoformat(): 1.0}
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM arxiv_papers").fetchone()[0] == 3
+
+    # The next run looks back from the newest stored paper for late announcements.
+    urls.clear()
+    assert arxiv.collect()["skipped"] == "no_new_papers"
+    query = parse_qs(urlsplit(urls[0]).query)["search_query"][0]
+    since = now - timedelta(days=arxiv.LOOKBACK_DAYS)
+    assert f"submittedDate:[{since:%Y%m%d%H%M} TO" in query
+
+
+def test_late_announced_paper_is_harvested_without_moving_watermark_back(monkeypatch):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    arxiv.cursor("arxiv").set("last_published", now.isoformat())
+    late = _entry("2601.00009", now - timedelta(days=2), ["cs.AI"])
+    monkeypatch.setattr(arxiv, "_parse_feed", lambda url: {"entries": [late]})
+    assert arxiv.collect()["inserted"] == 1
+    assert arxiv.cursor("arxiv").get("last_published") == now.isoformat()
+
+
+def test_reruns_on_the_same_day_sum_to_unique_papers(monkeypatch):
+    day = datetime.now(timezone.utc).replace(hour=1, minute=0, second=0, microsecond=0)
+    runs = [
+        [_entry("2601.00001", day, ["cs.AI"]), _entry("2601.00002", day, ["cs.LG"])],
+        [_entry("2601.00002", day, ["cs.LG"]), _entry("2601.00003", day, ["cs.CL"])],
+    ]
+    batches = iter(runs)
+    monkeypatch.setattr(arxiv, "_parse_feed", lambda url: {"entries": next(batches, [])})
+    arxiv.collect()
+    arxiv.collect()
+    with db.get_connection() as conn:
+        value_sum, value_count = conn.execute(
+            "SELECT value_sum, value_count FROM events_daily WHERE source = 'arxiv' AND day = ?",
+            (day.date().isoformat(),),
+        ).fetchone()
+    assert (value_sum, value_count) == (3.0, 2)
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from collectors import ats, jobs
+from core import http_client
+
+
+def _board(jobs_list):
+    return SimpleNamespace(status_code=200, headers={}, json=lambda: {"jobs": jobs_list})
+
+
+def test_board_for_reads_explicit_board_or_url():
+    assert ats.board_for({"type": "greenhouse", "url": "https://boards.greenhouse.io/acme"}) == "acme"
+    assert ats.board_for({"type": "lever", "url": "https://jobs.lever.co/acme-bio/"}) == "acme-bio"
+    assert ats.board_for({"type": "lever", "board": "x", "url": "https://example.com"}) == "x"
+    assert ats.board_for({"type": "greenhouse", "url": "https://example.com/?sector=ai"}) is None
+    assert ats.board_for({"type": "html", "url": "https://boards.greenhouse.io/acme"}) is None
+
+
+def test_record_postings_diffs_against_previous_run():
+    first = ats.record_postings("greenhouse:acme", {"1": "ML Engineer", "2": "Recruiter"}, "2026-01-01")
+    assert first.new == ["1", "2"] and first.closed == []
+    second = ats.record_postings("greenhouse:acme", {"2": "Recruiter", "3": "Research Scientist"}, "2026-01-02")
+    assert second.new == ["3"]
+    assert second.closed == ["1"]
+    assert set(second.open) == {"2", "3"}
+    assert ats.record_postings("greenhouse:acme", {"2": "Recruiter", "3": "Research Scientist"}).new == []
+
+
+def test_jobs_uses_greenhouse_board_and_falls_back_to_html(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append((url, params))
+        if "greenhouse" in url:
+            return _board([{"id": 11, "title": "Research Engineer"}, {"id": 12, "title": "Office Manager"}])
+        return SimpleNamespace(status_code=200, headers={}, text="<h1>Infra jobs</h1>")
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+    monkeypatch.setattr(
+        jobs,
+        "_load_careers",
+        lambda: [
+            {"url": "https://boards.greenhouse.io/acme", "sector": "ai", "keywords": ["research"], "type": "greenhouse"},
+            {"url": "https://example.com/?sector=ai", "sector": "ai", "keywords": ["infra"], "type": "greenhouse"},
+        ],
+    )
+    captured = {}
+
+    def fake_persist(source, rows):
+        captured["rows"] = rows
+        return len(rows), 0
+
+    monkeypatch.setattr(jobs, "persist_rows", fake_persist)
+    jobs.collect()
+
+    board_row, html_row = captured["rows"]
+    assert calls[0][0] == "https://boards-api.greenhouse.io/v1/boards/acme/jobs"
+    assert board_row["value"] == 1.0
+    assert board_row["parse_version"] == jobs.ATS_PARSE_VERSION
+    assert board_row["payload"]["open_postings"] == 2
+    assert board_row["payload"]["new_postings"] == 2
+    assert html_row["parse_version"] == jobs.PARSE_VERSION
+    assert html_row["value"] == 1.0
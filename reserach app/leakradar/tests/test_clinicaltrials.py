@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import requests
+
+from collectors import clinicaltrials
+from core import validate
+
+
+def _study(nct_id, status, updated):
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct_id, "briefTitle": f"Trial {nct_id}"},
+            "statusModule": {"overallStatus": status, "lastUpdatePostDateStruct": {"date": updated}},
+        }
+    }
+
+
+def _page(studies, token=None):
+    data = {"studies": studies}
+    if token:
+        data["nextPageToken"] = token
+    return SimpleNamespace(status_code=200, json=lambda: data)
+
+
+def test_pages_then_pulls_only_changed_studies(monkeypatch):
+    monkeypatch.setattr(clinicaltrials.config, "TRIAL_CONDITIONS", {"biotech": ["oncology", "gene therapy"]})
+    responses = {
+        ("oncology", None): _page([_study("NCT1", "RECRUITING", "2026-09-01")], token="p2"),
+        ("oncology", "p2"): _page([_study("NCT2", "RECRUITING", "2026-09-03")]),
+        # NCT2 is listed under both conditions but counted once.
+        ("gene therapy", None): _page([_study("NCT2", "RECRUITING", "2026-09-03"), _study("NCT3", "RECRUITING", "2026-09-02")]),
+    }
+    seen = []
+
+    def fake_get(url, params=None, **kwargs):
+        seen.append(dict(params))
+        return responses[(params["query.cond"], params.get("pageToken"))]
+
+    monkeypatch.setattr(clinicaltrials.http_client, "get", fake_get)
+    captured = {}
+
+    def fake_persist(source, rows):
+        captured["rows"] = rows
+        return len(rows), 0
+
+    monkeypatch.setattr(clinicaltrials, "persist_rows", fake_persist)
+    clinicaltrials.collect()
+    assert captured["rows"][0]["value"] == 3.0
+    assert all(params["filter.overallStatus"] == "RECRUITING" for params in seen)
+
+    seen.clear()
+    responses = {
+        ("oncology", None): _page([_study("NCT1", "COMPLETED", "2026-10-01")]),
+        ("gene therapy", None): _page([]),
+    }
+    clinicaltrials.collect()
+    assert seen[0]["filter.advanced"] == "AREA[LastUpdatePostDate]RANGE[2026-09-03,MAX]"
+    assert seen[1]["filter.advanced"] == "AREA[LastUpdatePostDate]RANGE[2026-09-03,MAX]"
+    assert "filter.overallStatus" not in seen[0]
+    assert captured["rows"][0]["value"] == 2.0
+    assert captured["rows"][0]["payload"]["changed"] == 1
+
+
+def test_failed_page_is_recorded_as_http_error(monkeypatch):
+    monkeypatch.setattr(clinicaltrials.config, "TRIAL_CONDITIONS", {"biotech": ["oncology"]})
+    monkeypatch.setattr(clinicaltrials.http_client, "get", lambda url, **kwargs: SimpleNamespace(status_code=503))
+    row = clinicaltrials._sector_row("biotech", ["oncology"], "2026-10-17T00:00:00+00:00")
+    assert row["http_status"] == 503
+    assert row["payload"]["error"] == "http 503"
+
+
+def test_unanswered_query_is_quarantined(monkeypatch):
+    def offline(url, **kwargs):
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(clinicaltrials.http_client, "get", offline)
+    row = clinicaltrials._sector_row("biotech", ["oncology"], "2026-10-17T00:00:00+00:00")
+    assert row["http_status"] == clinicaltrials.NO_RESPONSE
+    assert validate.validate_event(row) == (False, "http 0")
+
+
+def test_dropped_conditions_stop_counting(monkeypatch):
+    def fake_get(url, params=None, **kwargs):
+        return _page([_study(f"NCT-{params['query.cond']}", "RECRUITING", "2026-09-01")])
+
+    monkeypatch.setattr(clinicaltrials.http_client, "get", fake_get)
+    now = "2026-10-17T00:00:00+00:00"
+    assert clinicaltrials._sector_row("biotech", ["oncology", "gene therapy"], now)["value"] == 2.0
+    assert clinicaltrials._sector_row("biotech", ["oncology"], now)["value"] == 1.0
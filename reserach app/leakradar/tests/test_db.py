@@ -0,0 +1,140 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core import db
+from core.monitor import collector_health
+
+
+def test_init_db_records_migrations_and_indexes():
+    db.init_db()
+    with db.get_connection() as conn:
+        assert db.schema_version(conn) == db.LATEST_VERSION
+        indexes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert db.migrate(conn) == []
+    assert {"ux_events_dedup", "ix_events_source_fetched", "ix_events_ts", "ix_anomalies_run"} <= indexes
+
+
+def test_collector_health_reports_latest_fetch_per_source():
+    now = datetime.now(timezone.utc)
+    old = (now - timedelta(days=3)).isoformat()
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO events (ts, source, metric, value, fetched_at) VALUES (?, ?, 'stars', 1, ?)",
+            [(old, "github", old), (old, "github", now.isoformat()), (old, "arxiv", old)],
+        )
+        statuses = {status.source: status for status in collector_health(conn)}
+    assert set(statuses) == {"arxiv", "github"}
+    assert not statuses["github"].stale
+    assert statuses["arxiv"].stale
+
+
+def test_init_db_skips_ddl_when_user_version_is_current(monkeypatch):
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == db.LATEST_VERSION
+
+    def fail(conn, target=None):
+        raise AssertionError("migrate should not run on a current database")
+
+    monkeypatch.setattr(db, "migrate", fail)
+    db.init_db()
+
+
+def test_get_connection_reuses_connection_and_nests():
+    with db.get_connection() as outer:
+        with db.get_connection() as inner:
+            assert inner is outer
+    with db.get_connection() as again:
+        assert again is outer
+
+
+def test_nested_error_rolls_back_outermost_transaction():
+    try:
+        with db.get_connection() as conn:
+            conn.execute("INSERT INTO notes (ts, sector, text) VALUES ('t', 'ai', 'x')")
+            with db.get_connection():
+                raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0
+
+
+def test_readonly_connection_rejects_writes():
+    with db.get_connection(readonly=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO notes (ts, sector, text) VALUES ('t', 'ai', 'x')")
+
+
+def _legacy_db(tmp_path, target):
+    conn = sqlite3.connect(tmp_path / "legacy.sqlite")
+    conn.row_factory = sqlite3.Row
+    db.migrate(conn, target=target)
+    return conn
+
+
+MIXED_TS = {
+    "basic": ("20240501T100000Z", "2024-05-01"),
+    "compact_offset": ("2024-05-01T10:00:00+0000", "2024-05-01"),
+    # Local date is May 1st, the UTC day is May 2nd.
+    "west_of_utc": ("2024-05-01T23:30:00-05:00", "2024-05-02"),
+    "naive": ("2024-05-01 10:00:00", "2024-05-01"),
+}
+
+
+def test_epoch_backfill_parses_mixed_timestamps(tmp_path):
+    conn = _legacy_db(tmp_path, target=3)
+    conn.executemany(
+        """
+        INSERT INTO events (ts, source, sector, entity, metric, value, checksum, event_day)
+        VALUES (?, 's', 'ai', ?, 'stars', 1, 'c', ?)
+        """,
+        [(ts, name, ts[:10]) for name, (ts, _) in MIXED_TS.items()],
+    )
+    db.migrate(conn)
+    rows = {row["entity"]: row for row in conn.execute("SELECT entity, ts_epoch, event_day FROM events")}
+    for name, (_, day) in MIXED_TS.items():
+        assert rows[name]["ts_epoch"] is not None
+        assert rows[name]["event_day"] == day
+    days = dict(conn.execute("SELECT day, value_count FROM events_daily").fetchall())
+    assert days == {"2024-05-01": 3, "2024-05-02": 1}
+
+
+def test_epoch_repair_fixes_databases_backfilled_in_sql(tmp_path):
+    repair = next(version for version, name, _ in db.MIGRATIONS if name == "epoch_repair")
+    conn = _legacy_db(tmp_path, target=repair - 1)
+    conn.executemany(
+        """
+        INSERT INTO events (ts, source, sector, entity, metric, value, checksum, event_day, ts_epoch)
+        VALUES (?, 's', 'ai', ?, 'stars', 2, 'c', ?, CAST(strftime('%s', ?) AS INTEGER))
+        """,
+        [(ts, name, ts[:10], ts) for name, (ts, _) in MIXED_TS.items()]
+        # Same key as "west_of_utc" once its day is corrected: a duplicate.
+        + [("2024-05-02T04:30:00+00:00", "west_of_utc", "2024-05-02", "2024-05-02T04:30:00+00:00")],
+    )
+    conn.execute(db.ROLLUP_UPSERT, (0,))
+    db.migrate(conn)
+    assert conn.execute("SELECT COUNT(*) FROM events WHERE ts_epoch IS NULL").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 4
+    rows = conn.execute("SELECT day, value_sum, value_count FROM events_daily").fetchall()
+    days = {day: (value_sum, count) for day, value_sum, count in rows}
+    assert days == {"2024-05-01": (6.0, 3), "2024-05-02": (2.0, 1)}
+
+
+def test_dedup_nulls_merges_rows_with_missing_key_columns(tmp_path):
+    repair = next(version for version, name, _ in db.MIGRATIONS if name == "dedup_nulls")
+    conn = _legacy_db(tmp_path, target=repair - 1)
+    conn.executemany(
+        """
+        INSERT INTO events (ts, source, sector, entity, metric, value, checksum, event_day)
+        VALUES ('2024-05-01T10:00:00+00:00', 's', 'ai', ?, 'grants', 5, ?, '2024-05-01')
+        """,
+        [(None, "c"), (None, "c"), ("", "c"), ("e", None), ("e", None)],
+    )
+    conn.execute(db.ROLLUP_UPSERT, (0,))
+    db.migrate(conn)
+    keys = conn.execute("SELECT entity, checksum FROM events ORDER BY id").fetchall()
+    assert [tuple(key) for key in keys] == [("", "c"), ("e", None), ("e", None)]
+    assert tuple(conn.execute("SELECT value_sum, value_count FROM events_daily").fetchone()) == (15.0, 3)
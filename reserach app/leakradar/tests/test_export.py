@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+from collectors.base import ingest_rows
+from compute.export import export_snapshots, load_snapshot
+from core import archive
+
+
+def _event(days_ago, checksum):
+    ts = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {"ts": ts.isoformat(), "sector": "ai", "entity": "e", "metric": "stars", "value": float(days_ago), "checksum": checksum}
+
+
+def test_export_and_load_with_partition_pruning(tmp_path):
+    ingest_rows("github", [_event(d, f"c{d}") for d in range(5)])
+    summary = export_snapshots(tmp_path)
+    assert summary["events"] == 5
+
+    since = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
+    recent = load_snapshot("events", columns=["value"], since=since, base_dir=tmp_path)
+    assert sorted(recent["value"]) == [0.0, 1.0]
+
+    # Nothing new since the last export: partitions are kept, not duplicated.
+    export_snapshots(tmp_path)
+    assert len(load_snapshot("events", base_dir=tmp_path)) == 5
+
+
+def test_late_rows_and_archived_rows_are_exported(monkeypatch, tmp_path):
+    monkeypatch.setattr(archive, "ARCHIVE_PATH", str(tmp_path / "archive.sqlite"))
+    ingest_rows("github", [_event(d, f"c{d}") for d in (0, 3, 200)])
+    archive.compact(retain_days=100)
+    out = tmp_path / "snapshots"
+    # Archived rows are part of the first export.
+    assert export_snapshots(out)["events"] == 3
+
+    # A late row for an older day rewrites that day's partition with both rows.
+    ingest_rows("github", [_event(3, "late")])
+    assert export_snapshots(out)["events"] == 2
+    assert len(load_snapshot("events", base_dir=out)) == 4
+    assert export_snapshots(out)["events"] == 0
+
+
+def test_rows_reusing_archived_ids_are_exported(monkeypatch, tmp_path):
+    monkeypatch.setattr(archive, "ARCHIVE_PATH", str(tmp_path / "archive.sqlite"))
+    ingest_rows("github", [_event(d, f"c{d}") for d in (0, 1)])
+    # The highest ids belong to old rows, which compact() moves to the archive.
+    ingest_rows("github", [_event(200 + d, f"old{d}") for d in range(3)])
+    out = tmp_path / "snapshots"
+    assert export_snapshots(out)["events"] == 5
+    archive.compact(retain_days=100)
+
+    ingest_rows("github", [_event(0, f"new{i}") for i in range(3)])
+    assert export_snapshots(out)["events"] == 4
+    assert len(load_snapshot("events", base_dir=out)) == 8
@@ -0,0 +1,85 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from collectors import github
+
+
+def _fake_fetch(active, peak, lock):
+    def fetch(owner, repo_name, headers):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        # Later repos answer first so out-of-order completion is exercised.
+        time.sleep(0.01 * (10 - int(repo_name.split("-")[1])))
+        with lock:
+            active[0] -= 1
+        url = f"{github.API_BASE}/repos/{owner}/{repo_name}"
+        data = {"full_name": f"{owner}/{repo_name}", "stargazers_count": int(repo_name.split("-")[1])}
+        return {"url": url, "ts": "2026-01-01T00:00:00+00:00", "status": 200, "data": data, "releases_count": 2.0}
+
+    return fetch
+
+
+def test_concurrent_fetch_matches_sequential(monkeypatch):
+    repos = [{"owner": "acme", "repo": f"repo-{i}", "sector": "ai"} for i in range(10)]
+    monkeypatch.setattr(github, "_load_repos", lambda: repos)
+    active, peak, lock = [0], [0], threading.Lock()
+    monkeypatch.setattr(github, "_fetch_repo", _fake_fetch(active, peak, lock))
+
+    sequential = github.fetch_rows(concurrency=1)
+    assert peak[0] == 1
+    concurrent = github.fetch_rows(concurrency=4)
+
+    assert concurrent == sequential
+    assert [row["entity"] for row in concurrent[::2]] == [f"acme/repo-{i}" for i in range(10)]
+    assert 1 < peak[0] <= 4
+
+
+def _node(name, stars, releases):
+    return {
+        "nameWithOwner": name,
+        "stargazerCount": stars,
+        "forkCount": 3,
+        "licenseInfo": {"name": "MIT License"},
+        "issues": {"totalCount": 4},
+        "pullRequests": {"totalCount": 1},
+        "releases": {"totalCount": releases},
+    }
+
+
+def test_graphql_batch_reads_all_repos_in_one_request(monkeypatch):
+    repos = [{"owner": "acme", "repo": f"repo-{i}", "sector": "ai"} for i in range(3)]
+    monkeypatch.setattr(github, "_load_repos", lambda: repos)
+    calls = []
+
+    def fake_post(url, json=None, **kwargs):
+        calls.append(json)
+        data = {"r0": _node("acme/repo-0", 10, 250), "r1": None, "r2": _node("acme/repo-2", 30, 2)}
+        return SimpleNamespace(status_code=200, json=lambda: {"data": data, "errors": [{"type": "NOT_FOUND"}]})
+
+    monkeypatch.setattr(github.http_client, "post", fake_post)
+    monkeypatch.setattr(github, "_fetch_repo", lambda *args: pytest.fail("REST should not be used"))
+    rows = github.fetch_rows(use_graphql=True)
+
+    assert len(calls) == 1
+    assert calls[0]["variables"] == {"o0": "acme", "n0": "repo-0", "o1": "acme", "n1": "repo-1", "o2": "acme", "n2": "repo-2"}
+    assert "r2: repository(owner: $o2, name: $n2)" in calls[0]["query"]
+    assert [row["value"] for row in rows] == [10.0, 250.0, 0.0, 0.0, 30.0, 2.0]
+    assert rows[0]["payload"]["open_issues"] == 5
+    assert rows[0]["license"] == "MIT License"
+    assert rows[2]["http_status"] == 404
+    assert {row["parse_version"] for row in rows} == {github.GRAPHQL_PARSE_VERSION}
+
+
+def test_graphql_failure_falls_back_to_rest(monkeypatch):
+    repos = [{"owner": "acme", "repo": "repo-1", "sector": "ai"}]
+    monkeypatch.setattr(github, "_load_repos", lambda: repos)
+    monkeypatch.setattr(github.http_client, "post", lambda url, **kwargs: SimpleNamespace(status_code=502))
+    active, peak, lock = [0], [0], threading.Lock()
+    monkeypatch.setattr(github, "_fetch_repo", _fake_fetch(active, peak, lock))
+    rows = github.fetch_rows(use_graphql=True)
+    assert [row["parse_version"] for row in rows] == [github.PARSE_VERSION] * 2
+    assert rows[0]["value"] == 1.0
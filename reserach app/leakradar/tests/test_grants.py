@@ -0,0 +1,113 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from collectors import bulk, grants
+from core import db
+
+GRANTS = [
+    {"id": f"g{i}", "program": "NIH", "sector": "biotech", "amount": 1000 + i, "title": f"Zellforschung {i} – ü"}
+    for i in range(7)
+]
+
+
+def _ids(records):
+    return [record["id"] for record, _ in records]
+
+
+@pytest.mark.parametrize("name", ["grants.json", "grants.json.gz", "grants.ndjson", "grants.jsonl.gz"])
+def test_json_readers_stream_and_resume_by_offset(monkeypatch, tmp_path, name):
+    monkeypatch.setattr(bulk, "READ_CHUNK", 7)
+    path = tmp_path / name
+    if ".ndjson" in name or ".jsonl" in name:
+        text = "\n".join(json.dumps(g, ensure_ascii=False) for g in GRANTS) + "\n"
+    else:
+        text = "\ufeff[\n" + ",\n".join(json.dumps(g, ensure_ascii=False) for g in GRANTS) + "\n]\n"
+    data = text.encode("utf-8")
+    path.write_bytes(gzip.compress(data) if name.endswith(".gz") else data)
+
+    records = list(bulk.iter_records(path))
+    assert [record for record, _ in records] == GRANTS
+    resumed = list(bulk.iter_records(path, records[2][1]))
+    assert _ids(resumed) == [g["id"] for g in GRANTS[3:]]
+    assert list(bulk.iter_records(path, records[-1][1])) == []
+
+
+def test_csv_reader_handles_quoted_newlines(tmp_path):
+    path = tmp_path / "awards.csv"
+    path.write_text(
+        '\ufeffaward_id,cfda_title,federal_action_obligation\n'
+        'A1,"Energy, Research",10.5\n'
+        'A2,"Multi\nline",20\n'
+        "A3,Plain,30\n",
+        encoding="utf-8",
+    )
+    records = list(bulk.iter_records(path))
+    assert [r["award_id"] for r, _ in records] == ["A1", "A2", "A3"]
+    assert records[1][0]["cfda_title"] == "Multi\nline"
+    assert [r["award_id"] for r, _ in bulk.iter_records(path, records[1][1])] == ["A3"]
+    row = grants._grant_row(records[0][0], "2024-01-01T00:00:00+00:00")
+    assert row["entity"] == "Energy, Research" and row["value"] == 10.5
+
+
+def test_bulk_load_persists_in_chunks_and_resumes(monkeypatch, tmp_path):
+    path = tmp_path / "grants.ndjson"
+    path.write_text("".join(json.dumps(g) + "\n" for g in GRANTS), encoding="utf-8")
+    real_ingest = grants.ingest_rows
+    calls = []
+
+    def flaky_ingest(source, rows, chunk_size):
+        calls.append(len(rows))
+        if len(calls) == 3:
+            raise RuntimeError("disk full")
+        return real_ingest(source, rows, chunk_size=chunk_size)
+
+    monkeypatch.setattr(grants, "ingest_rows", flaky_ingest)
+    with pytest.raises(RuntimeError):
+        grants.load_bulk(path, chunk_size=3)
+    assert calls == [3, 3, 1]
+
+    monkeypatch.setattr(grants, "ingest_rows", real_ingest)
+    result = grants.load_bulk(path, chunk_size=3)
+    assert result["records"] == 1 and result["inserted"] == 1
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events WHERE source = 'grants'").fetchone()[0] == 7
+    assert grants.load_bulk(path, chunk_size=3)["skipped"] == "no_new_records"
+
+    # A replaced file starts over.
+    path.write_text(json.dumps(GRANTS[0]) + "\n", encoding="utf-8")
+    assert grants.load_bulk(path, chunk_size=3)["records"] == 1
+
+
+def test_bulk_reload_does_not_double_count(tmp_path):
+    day = (datetime.now(timezone.utc) - timedelta(days=3)).date().isoformat()
+    awards = [dict(g, award_id=f"A{i}", action_date=day) for i, g in enumerate(GRANTS[:3])]
+    path = tmp_path / "grants.ndjson"
+    path.write_text("".join(json.dumps(a) + "\n" for a in awards), encoding="utf-8")
+
+    def totals():
+        with db.get_connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM events WHERE source = 'grants'").fetchone()[0]
+            daily = conn.execute("SELECT day, SUM(value_count) FROM events_daily GROUP BY day").fetchall()
+        return count, [tuple(row) for row in daily]
+
+    assert grants.load_bulk(path)["inserted"] == 3
+    assert totals() == (3, [(day, 3)])
+
+    # Touched or appended files keep their offset.
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert grants.load_bulk(path)["skipped"] == "no_new_records"
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(dict(GRANTS[3], award_id="A3", action_date=day)) + "\n")
+    assert grants.load_bulk(path)["records"] == 1
+    assert totals() == (4, [(day, 4)])
+
+    # A rewritten file is read again, but its records dedup on award id and action date.
+    path.write_text("".join(json.dumps(a) + "\n" for a in reversed(awards)), encoding="utf-8")
+    result = grants.load_bulk(path)
+    assert result["records"] == 3 and result["inserted"] == 0
+    assert totals() == (4, [(day, 4)])
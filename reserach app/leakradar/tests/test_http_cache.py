@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from core import db, http_cache
+
+
+def test_not_modified_reuses_parsed_result(monkeypatch):
+    sent = []
+    responses = [
+        SimpleNamespace(status_code=200, headers={"ETag": '"v1"'}, body={"stars": 7}),
+        SimpleNamespace(status_code=304, headers={}, body=None),
+    ]
+
+    def fake_get(url, params=None, headers=None, **kwargs):
+        sent.append(headers)
+        return responses.pop(0)
+
+    parses = []
+
+    def parse(resp):
+        parses.append(resp)
+        return resp.body
+
+    monkeypatch.setattr(http_cache.http_client, "get", fake_get)
+    first = http_cache.fetch("https://api.github.com/repos/a/b", parse)
+    second = http_cache.fetch("https://api.github.com/repos/a/b", parse)
+
+    assert first.parsed == second.parsed == {"stars": 7}
+    assert second.status == 200 and second.not_modified
+    assert len(parses) == 1
+    assert "If-None-Match" not in sent[0]
+    assert sent[1]["If-None-Match"] == '"v1"'
+    with db.get_connection() as conn:
+        row = conn.execute("SELECT fetched_at, validated_at FROM http_cache").fetchone()
+    assert row["validated_at"] >= row["fetched_at"]
+
+
+def test_errors_and_uncacheable_responses_are_not_stored(monkeypatch):
+    responses = [
+        SimpleNamespace(status_code=500, headers={"ETag": '"x"'}),
+        SimpleNamespace(status_code=200, headers={}),
+    ]
+    monkeypatch.setattr(http_cache.http_client, "get", lambda url, **kwargs: responses.pop(0))
+    assert http_cache.fetch("https://example.com/a", lambda resp: 1).parsed is None
+    assert http_cache.fetch("https://example.com/a", lambda resp: 1).parsed == 1
+    assert http_cache.lookup(http_cache.cache_key("https://example.com/a")) is None
+
+
+def test_variant_change_refetches_instead_of_reusing_stale_parse(monkeypatch):
+    sent = []
+
+    def fake_get(url, params=None, headers=None, **kwargs):
+        sent.append(headers)
+        status = 304 if "If-None-Match" in headers else 200
+        return SimpleNamespace(status_code=status, headers={"ETag": '"v1"'}, text="ml ml ai")
+
+    monkeypatch.setattr(http_cache.http_client, "get", fake_get)
+    url = "https://example.com/careers"
+    ml = http_cache.fetch(url, lambda resp: resp.text.count("ml"), variant="ml")
+    again = http_cache.fetch(url, lambda resp: resp.text.count("ml"), variant="ml")
+    ai = http_cache.fetch(url, lambda resp: resp.text.count("ai"), variant="ai")
+    assert (ml.parsed, again.parsed, ai.parsed) == (2, 2, 1)
+    assert again.not_modified and not ai.not_modified
+    assert "If-None-Match" not in sent[2]
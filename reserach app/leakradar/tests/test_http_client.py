@@ -0,0 +1,187 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core import breaker, deadline, http_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_hosts():
+    http_client.reset()
+    yield
+    http_client.reset()
+
+
+def _response(status, headers=None, url="https://api.example.com/x"):
+    return SimpleNamespace(status_code=status, headers=headers or {}, url=url)
+
+
+class FakeSession:
+    def __init__(self, statuses, delay=0.0):
+        self.statuses = list(statuses)
+        self.calls = 0
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            status, headers = self.statuses.pop(0) if self.statuses else (200, {})
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return _response(status, headers, url)
+
+
+def _use(monkeypatch, fake, rate=1000.0):
+    monkeypatch.setattr(http_client, "session", lambda: fake)
+    monkeypatch.setitem(http_client.config.HOST_RATE_LIMITS, "api.example.com", rate)
+
+
+def test_retries_throttled_requests_honouring_retry_after(monkeypatch):
+    fake = FakeSession([(429, {"Retry-After": "0.2"}), (503, {}), (200, {})])
+    _use(monkeypatch, fake)
+    monkeypatch.setattr(http_client, "_BACKOFF", lambda state: 0.0)
+    started = time.monotonic()
+    resp = http_client.get("https://api.example.com/x")
+    assert resp.status_code == 200
+    assert fake.calls == 3
+    assert time.monotonic() - started >= 0.2
+
+
+def test_gives_back_last_response_when_retries_exhausted(monkeypatch):
+    fake = FakeSession([(500, {})] * 5)
+    _use(monkeypatch, fake)
+    monkeypatch.setattr(http_client, "_BACKOFF", lambda state: 0.0)
+    resp = http_client.get("https://api.example.com/x", retries=2)
+    assert resp.status_code == 500
+    assert fake.calls == 3
+
+
+def test_token_bucket_paces_requests_per_host(monkeypatch):
+    fake = FakeSession([])
+    _use(monkeypatch, fake, rate=20.0)
+    http_client._BUCKETS["api.example.com"] = http_client.TokenBucket(20.0, capacity=1)
+    started = time.monotonic()
+    for _ in range(5):
+        http_client.get("https://api.example.com/x")
+    assert time.monotonic() - started >= 0.19
+
+
+def test_host_slot_caps_in_flight_requests(monkeypatch):
+    fake = FakeSession([], delay=0.02)
+    _use(monkeypatch, fake)
+    monkeypatch.setattr(http_client.config, "HTTP_HOST_CONCURRENCY", 2)
+    threads = [threading.Thread(target=http_client.get, args=("https://api.example.com/x",)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fake.calls == 6
+    assert fake.peak == 2
+
+
+def test_retry_after_parses_seconds_and_dates():
+    assert http_client.retry_after(_response(429, {"Retry-After": "3"})) == 3.0
+    assert http_client.retry_after(_response(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert http_client.retry_after(_response(429)) is None
+
+
+def test_breaker_opens_after_repeated_failures_and_persists(monkeypatch):
+    fake = FakeSession([(503, {})] * 3)
+    _use(monkeypatch, fake)
+    monkeypatch.setattr(http_client.config, "BREAKER_FAILURE_THRESHOLD", 3)
+    for _ in range(3):
+        assert http_client.get("https://api.example.com/x", retries=0).status_code == 503
+    with pytest.raises(breaker.CircuitOpen):
+        http_client.get("https://api.example.com/x")
+    assert fake.calls == 3
+    # Stored in the database, so a fresh process state still skips the host.
+    http_client.reset()
+    assert [item["host"] for item in breaker.open_hosts()] == ["api.example.com"]
+
+    monkeypatch.setattr(http_client.config, "BREAKER_COOLDOWN_SECS", 0)
+    breaker.record_failure("api.example.com", "still down")
+    assert http_client.get("https://api.example.com/x").status_code == 200
+    assert breaker.allow("api.example.com") == 0
+
+
+def test_deadline_clamps_timeouts_and_fails_fast(monkeypatch):
+    seen = []
+
+    class Recorder(FakeSession):
+        def request(self, method, url, **kwargs):
+            seen.append(kwargs["timeout"])
+            return super().request(method, url, **kwargs)
+
+    fake = Recorder([])
+    _use(monkeypatch, fake)
+    with deadline.budget(5):
+        http_client.get("https://api.example.com/x", timeout=30)
+        assert 0 < seen[0] <= 5
+        # Nested budgets only tighten.
+        with deadline.budget(60):
+            assert deadline.remaining() <= 5
+    with deadline.budget(0.01):
+        time.sleep(0.02)
+        with pytest.raises(deadline.DeadlineExceeded):
+            http_client.get("https://api.example.com/x")
+    assert fake.calls == 1
+    assert breaker.allow("api.example.com") == 0
+
+
+def test_deadline_bounds_waiting_for_tokens_and_slots(monkeypatch):
+    fake = FakeSession([])
+    _use(monkeypatch, fake)
+    http_client._BUCKETS["api.example.com"] = http_client.TokenBucket(0.1, capacity=1)
+    http_client.get("https://api.example.com/x")
+    started = time.monotonic()
+    with deadline.budget(0.05):
+        with pytest.raises(deadline.DeadlineExceeded):
+            http_client.get("https://api.example.com/x")
+    # Fails as soon as the next token is known to come too late.
+    assert time.monotonic() - started < 0.05
+
+    http_client.reset()
+    monkeypatch.setattr(http_client.config, "HTTP_HOST_CONCURRENCY", 1)
+    slot = http_client.slot_for("api.example.com")
+    slot.acquire()
+    try:
+        with deadline.budget(0.05):
+            with pytest.raises(deadline.DeadlineExceeded):
+                http_client.get("https://api.example.com/x")
+    finally:
+        slot.release()
+    assert fake.calls == 1
+    assert breaker.allow("api.example.com") == 0
+
+
+def test_half_open_breaker_admits_one_probe(monkeypatch):
+    monkeypatch.setattr(breaker.config, "BREAKER_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(breaker.config, "BREAKER_COOLDOWN_SECS", 0)
+    breaker.record_failure("api.example.com", "down")
+    assert breaker.allow("api.example.com") == 1
+    with pytest.raises(breaker.CircuitOpen):
+        breaker.allow("api.example.com")
+    # A failed probe reopens the breaker, after which one probe gets through again.
+    breaker.record_failure("api.example.com", "still down")
+    assert breaker.allow("api.example.com") == 2
+    breaker.record_success("api.example.com", 2)
+    assert breaker.allow("api.example.com") == 0
+
+
+def test_deadline_propagates_to_worker_threads():
+    seen = []
+    with deadline.budget(5):
+        worker = deadline.propagate(lambda: seen.append(deadline.remaining()))
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen[0] is not None and seen[0] <= 5
+    assert deadline.remaining() is None
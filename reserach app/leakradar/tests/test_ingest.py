@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+
+from collectors import grants
+from collectors.base import checksum_payload, ingest_rows, persist_rows
+from core import blobs, db
+
+
+def _row(value, metric="grants"):
+    return {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "sector": "ai",
+        "entity": "NIH",
+        "metric": metric,
+        "value": value,
+        "payload": {"amount": value},
+        "confidence": 0.6,
+    }
+
+
+def _count(table):
+    with db.get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_ingest_rows_splits_accepted_and_quarantined():
+    rows = [_row(float(i)) for i in range(25)] + [_row(-1.0), _row(1.0, metric="bogus")]
+    report = ingest_rows("grants", rows, chunk_size=10)
+    assert report.inserted == 25
+    assert report.quarantined == 2
+    assert report.rows_per_sec > 0
+    assert _count("events") == 25
+    assert _count("events_quarantine") == 2
+
+
+def test_ingest_rows_matches_persist_rows():
+    rows = [_row(float(i)) for i in range(5)] + [_row(-1.0)]
+    inserted, quarantined = persist_rows("grants", rows)
+    # Another entity, so the second write is not deduplicated against the first.
+    report = ingest_rows("grants", [dict(row, entity="NSF") for row in rows])
+    assert (report.inserted, report.quarantined) == (inserted, quarantined)
+
+
+def test_duplicate_checksums_are_skipped_same_day():
+    rows = [dict(_row(5.0), checksum="abc")]
+    first = ingest_rows("grants", rows)
+    second = ingest_rows("grants", rows)
+    inserted, quarantined = persist_rows("grants", rows)
+    assert (first.inserted, first.skipped) == (1, 0)
+    assert (second.inserted, second.skipped) == (0, 1)
+    assert (inserted, quarantined) == (0, 0)
+    assert _count("events") == 1
+
+
+def test_rows_without_entity_are_deduplicated():
+    now = datetime.now(timezone.utc).isoformat()
+    row = grants._grant_row({"award_id": "A1", "federal_action_obligation": "5", "action_date": now}, now)
+    assert row["entity"] is None
+    assert ingest_rows("grants", [row]).inserted == 1
+    assert ingest_rows("grants", [row]).skipped == 1
+    # Without a checksum, rows dedup on their content.
+    anonymous = [dict(row, checksum=None), dict(row, checksum=None, value=6.0)]
+    assert persist_rows("grants", anonymous).inserted == 2
+    assert persist_rows("grants", anonymous).skipped == 2
+    assert _count("events") == 3
+
+
+def test_identical_payloads_are_stored_once_compressed():
+    rows = [dict(_row(1.0), checksum=f"c{i}", payload={"same": True}) for i in range(3)]
+    ingest_rows("grants", rows)
+    with db.get_connection() as conn:
+        refs = {r[0] for r in conn.execute("SELECT payload_ref FROM events")}
+        assert conn.execute("SELECT COUNT(*) FROM payloads").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM events WHERE payload IS NOT NULL").fetchone()[0] == 0
+        (ref,) = refs
+        assert blobs.load_json(conn, ref) == {"same": True}
+    assert ref == checksum_payload({"same": True})
@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from collectors import extract, jobs
+from collectors.base import persist_rows
+
+PAGE = (
+    "<html><body><h1>Careers &amp; culture</h1><nav><a href='/'> Home </a>"
+    "<a>Open <b>roles</b></a></nav><h2><a>ML Research Engineer</a></h2>"
+    "<p>Research infra, research ops.</p><a>Apply</a></body></html>"
+)
+
+
+def test_keyword_matcher_matches_per_keyword_count():
+    rng = random.Random(7)
+    for _ in range(200):
+        keywords = ["".join(rng.choice("abA") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice("abA ") for _ in range(150))
+        expected = sum(text.lower().count(k.lower()) for k in keywords)
+        automaton = extract.KeywordMatcher(keywords)
+        automaton._compile()
+        assert extract.KeywordMatcher(keywords).count(text) == expected
+        assert automaton.count(text) == expected
+
+
+def test_extract_titles_streams_first_title_elements():
+    assert extract.extract_titles(PAGE) == [
+        "Careers & culture",
+        "Home",
+        "Openroles",
+        "ML Research Engineer",
+        "ML Research Engineer",
+    ]
+    assert extract.extract_titles(PAGE, limit=2) == ["Careers & culture", "Home"]
+
+
+def test_unchanged_page_reuses_previous_parse(monkeypatch):
+    url = "https://example.com/careers"
+    first = jobs._parse_page(PAGE, ["research", "infra"])
+    assert first["keyword_hits"] == 4.0
+    persist_rows(
+        "jobs",
+        [{"ts": datetime.now(timezone.utc).isoformat(), "sector": "ai", "entity": url, "metric": "job_count",
+          "value": first["keyword_hits"], "payload": first, "confidence": 0.6}],
+    )
+    previous = jobs._previous_payloads([url])[url]
+    assert previous == first
+
+    monkeypatch.setattr(jobs, "extract_titles", lambda html: pytest.fail("page should not be re-parsed"))
+    assert jobs._parse_page(PAGE, ["research", "infra"], previous) == first
+    monkeypatch.setattr(jobs, "extract_titles", lambda html: ["changed"])
+    assert jobs._parse_page(PAGE, ["research"], previous)["keyword_hits"] == 3.0
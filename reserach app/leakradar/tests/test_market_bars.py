@@ -0,0 +1,164 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from collectors import markets
+from core import breaker, db
+
+
+def _raw(symbols, days, close=lambda s, i: 100.0 + i):
+    index = pd.DatetimeIndex([pd.Timestamp(day) for day in days], name="Date")
+    columns = pd.MultiIndex.from_product([["Close", "Volume"], symbols], names=["Price", "Ticker"])
+    data = [
+        [close(symbol, i) for symbol in symbols] + [1000.0 for _ in symbols]
+        for i in range(len(days))
+    ]
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+def test_collect_downloads_missing_bars_in_one_batch(monkeypatch):
+    tickers = [
+        {"symbol": "AAA", "sector": "ai", "kind": "ticker"},
+        {"symbol": "BBB", "sector": "ai", "kind": "ticker"},
+    ]
+    monkeypatch.setattr(markets, "_load_tickers", lambda: tickers)
+    monkeypatch.setattr(markets.config, "USE_YFINANCE", True)
+    today = datetime.now(timezone.utc).date()
+    days = [today - timedelta(days=offset) for offset in range(9, -1, -1)]
+    calls = []
+
+    def fake_download(symbols, start, **kwargs):
+        calls.append((list(symbols), start))
+        wanted = [day for day in days if day.isoformat() >= start]
+        return _raw(symbols, wanted)
+
+    monkeypatch.setattr(markets.yf, "download", fake_download)
+    assert markets.collect()["inserted"] == 4
+    assert len(calls) == 1 and calls[0][0] == ["AAA", "BBB"]
+
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM market_bars").fetchone()[0] == 20
+        metrics = {
+            (row["symbol"], row["metric"]): row["value"]
+            for row in conn.execute("SELECT symbol, metric, value FROM market_events")
+        }
+    # Latest close 109 vs 7th most recent 103.
+    assert metrics[("AAA", "price_change_7d")] == pytest.approx((109.0 - 103.0) / 103.0 * 100.0)
+    assert metrics[("BBB", "volume_7d")] == 7000.0
+
+    markets.collect()
+    # Second run only asks for bars from the last stored date on.
+    assert calls[1] == (["AAA", "BBB"], today.isoformat())
+
+
+def test_compute_metrics_matches_per_symbol_formula():
+    bars = pd.DataFrame(
+        [("X", f"2026-01-0{i}", float(i), 10.0) for i in range(1, 4)] + [("Y", "2026-01-01", 4.0, 5.0)],
+        columns=markets.BAR_COLUMNS,
+    )
+    metrics = markets._compute_metrics(bars)
+    assert metrics.loc["X", "price_change_7d"] == pytest.approx(200.0)
+    assert metrics.loc["X", "volume_7d"] == 30.0
+    assert metrics.loc["Y", "price_change_7d"] == 0.0
+
+
+def _series(day):
+    return {"Time Series (Daily)": {day.isoformat(): {"4. close": "10.0", "5. volume": "100"}}}
+
+
+def test_alphavantage_refreshes_stalest_symbols_within_quota(monkeypatch):
+    today = date(2026, 10, 15)  # Thursday
+    monkeypatch.setattr(markets.config, "ALPHAVANTAGE_DAILY_QUOTA", 2)
+    requested = []
+
+    def fake_get(url, params=None, **kwargs):
+        requested.append(params["symbol"])
+        assert params["outputsize"] == "compact"
+        return _response(_series(today - timedelta(days=1)))
+
+    monkeypatch.setattr(markets.http_client, "get", fake_get)
+    last_dates = {"AAA": "2026-10-14", "BBB": "2026-10-01", "CCC": None, "DDD": "2026-10-09"}
+    bars, deferred = markets._alpha_bars(list(last_dates), last_dates, today)
+    # AAA already has the last session; CCC was never fetched, BBB is oldest.
+    assert requested == ["CCC", "BBB"]
+    assert deferred == ["DDD"]
+    assert set(bars["symbol"]) == {"CCC", "BBB"}
+
+    bars, deferred = markets._alpha_bars(list(last_dates), last_dates, today)
+    assert requested == ["CCC", "BBB"]
+    assert len(deferred) == 3
+
+
+def test_alphavantage_rate_limit_note_exhausts_quota(monkeypatch):
+    monkeypatch.setattr(markets.config, "ALPHAVANTAGE_DAILY_QUOTA", 25)
+    note = {"Information": "Our standard API rate limit is 25 requests per day."}
+    monkeypatch.setattr(markets.http_client, "get", lambda url, **kwargs: _response(note))
+    bars, deferred = markets._alpha_bars(["AAA", "BBB"], {}, date(2026, 10, 15))
+    assert bars.empty and deferred == ["AAA", "BBB"]
+    assert markets.quota.remaining(markets.ALPHA_PROVIDER, 25) == 0
+
+
+def _response(data):
+    return SimpleNamespace(status_code=200, json=lambda: data, raise_for_status=lambda: None)
+
+
+def test_alphavantage_minute_note_pauses_instead_of_exhausting(monkeypatch):
+    monkeypatch.setattr(markets.config, "ALPHAVANTAGE_DAILY_QUOTA", 25)
+    note = {"Note": "Our standard API call frequency is 5 calls per minute and 500 calls per day."}
+    series = {"Time Series (Daily)": {"2026-10-14": {"4. close": "10", "5. volume": "5"}}}
+    replies = [note, series, note, note]
+    paused = []
+    monkeypatch.setattr(markets.http_client, "get", lambda url, **kwargs: _response(replies.pop(0)))
+    monkeypatch.setattr(
+        markets.http_client, "bucket_for", lambda host: SimpleNamespace(pause=paused.append)
+    )
+    bars, deferred = markets._alpha_bars(["AAA", "BBB"], {}, date(2026, 10, 15))
+    assert list(bars["symbol"]) == ["AAA"] and deferred == ["BBB"]
+    assert paused == [markets.ALPHA_THROTTLE_PAUSE_SECS] * 3
+    assert markets.quota.remaining(markets.ALPHA_PROVIDER, 25) == 21
+
+
+def test_alphavantage_failures_spend_no_quota_and_defer(monkeypatch):
+    today = date(2026, 10, 15)
+    monkeypatch.setattr(markets.config, "ALPHAVANTAGE_DAILY_QUOTA", 25)
+    symbols = [f"S{i:02d}" for i in range(30)]
+
+    def circuit_open(url, **kwargs):
+        raise breaker.CircuitOpen("circuit open for www.alphavantage.co")
+
+    monkeypatch.setattr(markets.http_client, "get", circuit_open)
+    bars, deferred = markets._alpha_bars(symbols, {}, today)
+    assert bars.empty and deferred == symbols
+    assert markets.quota.remaining(markets.ALPHA_PROVIDER, 25) == 25
+
+    requested = []
+
+    def reply(url, params=None, **kwargs):
+        requested.append(params["symbol"])
+        if params["symbol"] == "BAD":
+            return _response({"Error Message": "Invalid API call."})
+        return _response(_series(today - timedelta(days=1)))
+
+    monkeypatch.setattr(markets.http_client, "get", reply)
+    last_dates = {"BAD": None, "OLD": "2026-10-01"}
+    bars, deferred = markets._alpha_bars(["BAD", "OLD"], last_dates, today)
+    assert requested == ["BAD", "OLD"] and deferred == ["BAD"]
+    # A rejected symbol no longer goes first.
+    requested.clear()
+    markets._alpha_bars(["BAD", "OLD"], last_dates, today)
+    assert requested == ["OLD", "BAD"]
+
+
+def test_collect_skips_symbols_without_bars(monkeypatch):
+    tickers = [{"symbol": "AAA", "sector": "ai"}, {"symbol": "ZZZ", "sector": "ai"}]
+    monkeypatch.setattr(markets, "_load_tickers", lambda: tickers)
+    monkeypatch.setattr(markets.config, "USE_YFINANCE", True)
+    today = datetime.now(timezone.utc).date()
+    days = [today - timedelta(days=offset) for offset in range(3, -1, -1)]
+    monkeypatch.setattr(markets.yf, "download", lambda symbols, start, **kwargs: _raw(["AAA"], days))
+    result = markets.collect()
+    assert result == {"inserted": 2, "quarantined": 0, "deferred": 1}
+    with db.get_connection() as conn:
+        assert {row[0] for row in conn.execute("SELECT symbol FROM market_events")} == {"AAA"}
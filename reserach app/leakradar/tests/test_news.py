@@ -1,6 +1,7 @@
 from types import SimpleNamespace
 
 from collectors import news
+from core import cache
 
 
 def test_newsapi_payload_returns_media_hits(monkeypatch):
@@ -16,7 +17,64 @@ def test_newsapi_payload_returns_media_hits(monkeypatch):
         }
         return SimpleNamespace(json=lambda: data, raise_for_status=lambda: None)
 
-    monkeypatch.setattr(news.requests, "get", fake_get)
+    monkeypatch.setattr(news.http_client, "get", fake_get)
     payload = news._newsapi_payload("ai")
     assert isinstance(payload["media_hits"], int)
     assert payload["media_hits"] == 42
+
+
+def test_perplexity_calls_are_not_retried(monkeypatch):
+    monkeypatch.setattr(news.config, "PERPLEXITY_API_KEY", "test-key", raising=False)
+    calls = []
+
+    def fake_post(url, **kwargs):
+        calls.append(kwargs)
+        content = '{"media_hits": 3, "top_topics": ["gpus"], "sources": []}'
+        data = {"choices": [{"message": {"content": content}}]}
+        return SimpleNamespace(json=lambda: data, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(news.http_client, "post", fake_post)
+    assert news._perplexity_payload("ai")["media_hits"] == 3
+    assert calls[0]["retries"] == 0
+
+
+def test_collect_caches_per_day_and_shares_overlapping_articles(monkeypatch):
+    monkeypatch.setattr(news.config, "NEWSAPI_KEY", "test-key", raising=False)
+    monkeypatch.setattr(news.config, "PERPLEXITY_API_KEY", None, raising=False)
+    monkeypatch.setattr(news.config, "SECTORS", ["ai", "biotech"])
+    shared = "https://example.com/shared"
+    articles = {
+        "ai": [shared, "https://example.com/a1"],
+        "biotech": [shared + "/", "https://example.com/b1", "https://example.com/b2", "https://example.com/b3"],
+    }
+    calls = []
+
+    def fake_newsapi(sector):
+        calls.append(sector)
+        return {
+            "media_hits": 40,
+            "top_topics": [],
+            "sources": articles[sector][:1],
+            "url_hashes": news.url_hashes(articles[sector]),
+        }
+
+    monkeypatch.setattr(news, "_newsapi_payload", fake_newsapi)
+    assert news.collect()["inserted"] == 2
+    assert news.collect()["inserted"] == 2
+    assert sorted(calls) == ["ai", "biotech"]
+
+    with news.get_connection() as conn:
+        # The rerun replaced the day's rows instead of doubling media_hits.
+        rows = conn.execute("SELECT sector, value, payload FROM narrative_events ORDER BY id").fetchall()
+    assert len(rows) == 2
+    values = {row["sector"]: row["value"] for row in rows}
+    # ai: (0.5 + 1) / 2 of 40; biotech: (0.5 + 1 + 1 + 1) / 4 of 40.
+    assert values == {"ai": 30.0, "biotech": 35.0}
+    assert "url_hashes" not in rows[0]["payload"]
+
+
+def test_purge_drops_only_expired_responses():
+    cache.put("perplexity", "old", {"a": 1}, ttl_secs=-1)
+    cache.put("perplexity", "fresh", {"a": 2}, ttl_secs=3600)
+    assert cache.purge() == 1
+    assert cache.get("perplexity", "fresh") == {"a": 2}
@@ -0,0 +1,64 @@
+import time
+from datetime import datetime, timezone
+
+from collectors import arxiv, grants, registry
+
+
+def test_collectors_register_in_order():
+    names = [entry.name for entry in registry.registered()]
+    assert names[:2] == ["arxiv", "clinicaltrials"]
+    assert set(names) >= {"github", "grants", "jobs", "markets", "news", "social"}
+    # The decorator hands back the plain function.
+    assert registry.registered()[0].attr == arxiv.collect.__name__ == "collect"
+
+
+def test_cursor_round_trip():
+    state = registry.cursor("demo")
+    assert state.get("offset") is None
+    assert state.get("offset", "0") == "0"
+    state.set("offset", 42)
+    state.set("offset", 43)
+    state.set("token", "abc")
+    assert registry.cursor("demo").items() == {"offset": "43", "token": "abc"}
+    assert registry.cursor("other").items() == {}
+
+
+def test_run_registered_records_failures(monkeypatch):
+    def boom():
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(registry, "_REGISTRY", {})
+    registry.collector("grants", order=1)(grants.collect)
+    monkeypatch.setattr(registry, "discover", lambda: None)
+    monkeypatch.setattr(grants, "collect", boom)
+    summary = registry.run_registered()
+    assert summary["grants"].pop("elapsed_secs") >= 0
+    assert summary == {"grants": {"error": "upstream down", "inserted": 0, "quarantined": 0}}
+    assert registry.cursor("grants").get("last_success_at") is None
+
+    monkeypatch.setattr(grants, "collect", lambda: {"inserted": 1, "quarantined": 0})
+    assert registry.run_registered()["grants"]["inserted"] == 1
+    assert registry.cursor("grants").get("last_success_at")
+
+
+def test_arxiv_watermark_prefers_cursor():
+    now = datetime(2024, 5, 10, tzinfo=timezone.utc)
+    assert arxiv._watermark(now) == datetime(2024, 5, 8, tzinfo=timezone.utc)
+    registry.cursor("arxiv").set("last_published", "2024-05-09T12:00:00+00:00")
+    assert arxiv._watermark(now) == datetime(2024, 5, 9, 12, tzinfo=timezone.utc)
+
+
+def test_run_budget_skips_remaining_collectors(monkeypatch):
+    def slow():
+        time.sleep(0.05)
+        return {"inserted": 0, "quarantined": 0}
+
+    monkeypatch.setattr(registry, "_REGISTRY", {})
+    monkeypatch.setattr(registry, "discover", lambda: None)
+    registry.collector("arxiv", order=1)(arxiv.collect)
+    registry.collector("grants", order=2)(grants.collect)
+    monkeypatch.setattr(arxiv, "collect", slow)
+    monkeypatch.setattr(grants, "collect", lambda: {"inserted": 1, "quarantined": 0})
+    summary = registry.run_registered(run_budget=0.01)
+    assert "error" not in summary["arxiv"]
+    assert summary["grants"] == {"skipped": "run_budget_exhausted", "inserted": 0, "quarantined": 0}
@@ -0,0 +1,50 @@
+from collectors import social
+from core import db
+
+
+def test_queries_are_cached_deduped_and_budgeted(monkeypatch):
+    monkeypatch.setattr(social.config, "SERPAPI_KEY", "key", raising=False)
+    monkeypatch.setattr(social.config, "SERPAPI_DAILY_QUOTA", 3)
+    monkeypatch.setattr(
+        social.config,
+        "NARRATIVE_QUERIES",
+        {"ai": ["AI", "LLM"], "climate": ["grid", "carbon"]},
+    )
+    pages = {
+        "AI": ["https://a.com/1", "https://a.com/2"],
+        "LLM": ["https://a.com/2", "https://a.com/3"],
+        "grid": ["https://c.com/1"],
+        "carbon": ["https://c.com/2"],
+    }
+    calls = []
+
+    def fake_urls(query):
+        calls.append(query)
+        return pages[query]
+
+    monkeypatch.setattr(social, "_serp_urls", fake_urls)
+    first = social.collect()
+    assert first["deferred"] == 1
+    assert sorted(calls) == ["AI", "LLM", "grid"]
+
+    with db.get_connection() as conn:
+        values = dict(conn.execute("SELECT sector, value FROM narrative_events").fetchall())
+        stored = conn.execute("SELECT COUNT(*) FROM serp_results").fetchone()[0]
+    # a.com/2 is returned for both AI queries but counted once; climate is
+    # missing a query, so no understated count is emitted for it.
+    assert values == {"ai": 3.0}
+    assert stored == 5
+
+    # ai was emitted already today; the budget is spent for climate.
+    second = social.collect()
+    assert len(calls) == 3
+    assert second["inserted"] == 0 and second["deferred"] == 1
+
+    monkeypatch.setattr(social.config, "SERPAPI_DAILY_QUOTA", 4)
+    third = social.collect()
+    assert calls[-1] == "carbon" and third["inserted"] == 1 and "deferred" not in third
+    assert social.collect() == {"inserted": 0, "quarantined": 0}
+    with db.get_connection() as conn:
+        rows = conn.execute("SELECT sector, value FROM narrative_events ORDER BY id").fetchall()
+    # One row per sector and day, so social_pulse does not double on reruns.
+    assert [tuple(row) for row in rows] == [("ai", 3.0), ("climate", 2.0)]